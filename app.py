@@ -0,0 +1,2001 @@
+"""Desktop interface: the main window and its pages.
+
+Imported only when the GUI starts, so the command line never loads Tk.
+Pages are built the first time they are shown; the dashboard comes first.
+"""
+
+import json
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import customtkinter as ctk
+
+from backup import (
+    apply_restore,
+    backup_dir,
+    create_backup,
+    list_backups,
+    open_source,
+    prepare_restore,
+    read_header,
+    verify_backup,
+)
+from charts import LedgerChart, dense_series
+from companies import MAIN_COMPANY
+from db import checkpoint, data_version, normalize_date
+from journal import list_snapshots, redo, reset_database, restore_as_action, take_snapshot, undo
+from money import Money, format_amount
+from profiling import Profiler, format_report
+from recurring import materialize_due
+from repository import CustomerRepository, LedgerFilter, LedgerRepository, PaymentRepository, RecurringRepository
+from search import SearchPager, search_customers
+from statements import AGING_LABELS, account, accounts, statement
+from worker import TkBridge
+
+
+CHECKPOINT_INTERVAL_MS = 5 * 60 * 1000
+# Due recurring entries are written at startup, after a company switch and then hourly.
+RECURRING_INTERVAL_MS = 60 * 60 * 1000
+# Automatic incremental backups: shortly after startup, then every six hours while the app is open.
+BACKUP_DELAY_MS = 2 * 60 * 1000
+BACKUP_INTERVAL_MS = 6 * 60 * 60 * 1000
+# Names offered in the customer pickers; others can still be typed.
+CUSTOMER_CHOICES_LIMIT = 500
+KIND_LABELS = {"income": "Gelir", "expense": "Gider"}
+LABEL_KINDS = {label: kind for kind, label in KIND_LABELS.items()}
+ALL_KINDS_LABEL = "Tümü"
+DASHBOARD_PERIODS = ("Bu Ay", "Bu Yıl", "Özel")
+CHART_GRAINS = {"Günlük": "day", "Haftalık": "week", "Aylık": "month"}
+NEW_COMPANY_LABEL = "+ Yeni şirket…"
+ONCE_LABEL = "Tek sefer"
+FREQUENCY_LABELS = {"daily": "Günlük", "weekly": "Haftalık", "monthly": "Aylık", "yearly": "Yıllık"}
+LABEL_FREQUENCIES = {label: frequency for frequency, label in FREQUENCY_LABELS.items()}
+DOC_LABELS = {"invoice": "Fatura", "expense": "Gider", "payment": "Tahsilat"}
+# Bulk edit: fields left at KEEP_LABEL (or blank) are not changed.
+KEEP_LABEL = "Değiştirme"
+NO_CUSTOMER_LABEL = "(Müşterisiz)"
+
+
+def _period_range(period, today, custom=(None, None)):
+    """Inclusive (first, last) ISO dates for a dashboard period; custom bounds may be None."""
+    if period == "Bu Ay":
+        first = today.replace(day=1)
+        last = (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    elif period == "Bu Yıl":
+        first, last = today.replace(month=1, day=1), today.replace(month=12, day=31)
+    else:
+        return tuple(normalize_date(d) if d else None for d in custom)
+    return first.isoformat(), last.isoformat()
+
+
+def _reopen_backup_source(conn, path):
+    conn.close()
+    return open_source(path)
+
+
+def _load_backups(conn):
+    """``(label, path)`` of this database's backups, newest first."""
+    rows = []
+    for path in list_backups(backup_dir(conn)):
+        header = read_header(path)
+        kind = "tam" if header["kind"] == "full" else "artımlı"
+        lock = " 🔒" if header["encrypted"] else ""
+        created = header["created"].replace("T", " ")
+        rows.append((f"{created} · {kind} · {path.stat().st_size / 1e6:,.1f} MB{lock}", path))
+    return rows
+
+
+def _dashboard_totals(conn, date_from, date_to):
+    ledger = LedgerRepository(conn)
+    return ledger.totals(), ledger.totals_between(date_from, date_to)
+
+
+def _chart_grain_label(date_from, date_to):
+    """Default chart grain for a period: daily up to a quarter, weekly up to three years."""
+    if not (date_from and date_to):
+        return "Aylık"
+    days = (date.fromisoformat(date_to) - date.fromisoformat(date_from)).days
+    return "Günlük" if days <= 92 else "Haftalık" if days <= 3 * 366 else "Aylık"
+
+
+def _dashboard_series(conn, grain, date_from, date_to, known_version):
+    """Return ``(version, series)``; series is None if the data is still at ``known_version``."""
+    version = data_version(conn)
+    if version == known_version:
+        return version, None
+    opening, rows = LedgerRepository(conn).series(grain, date_from, date_to)
+    first = date.fromisoformat(date_from) if date_from else None
+    last = date.fromisoformat(date_to) if date_to else None
+    return version, (opening, dense_series(grain, rows, first, last))
+
+
+def _consolidated_totals(_conn, companies, date_from, date_to):
+    """(company count, income, expense, not migrated) over every company; None when there is only one.
+
+    Companies whose file is not migrated yet are counted apart and left out of the sums.
+    """
+    totals = companies.totals(date_from, date_to)
+    if len(totals) < 2:
+        return None
+    read = [t for t in totals if t[1] is not None]
+    return len(read), sum(t[1] for t in read), sum(t[2] for t in read), len(totals) - len(read)
+
+
+def _customer_id(conn, name):
+    """Id of the customer picked by ``name`` (None when blank)."""
+    if not name:
+        return None
+    customer_id = CustomerRepository(conn).find(name)
+    if customer_id is None:
+        raise ValueError(f"Müşteri bulunamadı: {name}")
+    return customer_id
+
+
+def _add_entry(conn, kind, date, desc, amount, customer):
+    return LedgerRepository(conn).add(kind, date, desc, amount, _customer_id(conn, customer))
+
+
+def _add_recurring(conn, kind, start, desc, amount, customer, frequency, interval, end):
+    """Store a recurring rule and write its occurrences already due; returns how many were written."""
+    RecurringRepository(conn).add(
+        kind, desc, amount, frequency, start, interval=interval, end_date=end or None,
+        customer_id=_customer_id(conn, customer),
+    )
+    return materialize_due(conn)
+
+
+def _open_ledger(conn, query, filters, customer):
+    filters.customer_id = _customer_id(conn, customer)
+    if query.strip():
+        pager = SearchPager(conn, query, filters=filters)
+    else:
+        pager = LedgerRepository(conn).pager(filters=filters)
+    return pager, pager.next_page(), filters
+
+
+def _ledger_values(row):
+    row_id, date, desc, kind, amount, customer = row
+    return row_id, date, desc, KIND_LABELS[kind], format_amount(amount), customer or ""
+
+
+def _edit_entries(conn, ids, changes, customer=None):
+    """Apply a bulk edit; returns the changed rows so the table can update in place."""
+    if customer is not None:
+        changes["customer_id"] = None if customer == NO_CUSTOMER_LABEL else _customer_id(conn, customer)
+    ledger = LedgerRepository(conn)
+    ledger.update_many(ids, **changes)
+    return ledger.get_many(ids)
+
+
+def _filtered_totals(conn, filters):
+    return LedgerRepository(conn).filtered_totals(filters)
+
+
+def _rule_values(row):
+    rule_id, desc, kind, amount, customer, frequency, interval, _start, end, next_date, active = row
+    every = FREQUENCY_LABELS[frequency] if interval == 1 else f"{interval} x {FREQUENCY_LABELS[frequency]}"
+    if end and next_date > end:
+        status = "Bitti"
+    else:
+        status = "Etkin" if active else "Durduruldu"
+    return (
+        rule_id, desc, KIND_LABELS[kind], format_amount(amount), customer or "", every, next_date, end or "", status
+    )
+
+
+def _customer_names(conn):
+    return [name for _id, name in CustomerRepository(conn).names(CUSTOMER_CHOICES_LIMIT)]
+
+
+def _customer_page(conn, pager):
+    """The pager's next customer rows with their account ``(debit, credit, aging)`` appended."""
+    rows = pager.next_page()
+    # Only the customers on the page are aged.
+    summaries = accounts(conn, customer_ids=[row[0] for row in rows])
+    return [(*row, summaries.get(row[0], (0, 0, (0, 0, 0, 0)))) for row in rows]
+
+
+def _open_customers(conn, query):
+    if query.strip():
+        pager = SearchPager(conn, query, search=search_customers)
+    else:
+        pager = CustomerRepository(conn).pager()
+    return pager, _customer_page(conn, pager)
+
+
+def _load_statement(conn, customer_id, date_from, date_to):
+    return account(conn, customer_id), statement(conn, customer_id, date_from or None, date_to or None)
+
+
+def _dump_profile(conn, profiler):
+    """Write the profiler's report next to the database; returns its path."""
+    database = Path(conn.execute("PRAGMA database_list").fetchone()[2])
+    path = database.with_name(f"{database.stem}-profil-{datetime.now():%Y%m%d-%H%M%S}.json")
+    profiler.dump(path, conn)
+    return path
+
+
+def _search_bar(parent, on_search, placeholder):
+    bar = ctk.CTkFrame(parent, fg_color="transparent")
+    entry = ctk.CTkEntry(bar, placeholder_text=placeholder, width=260)
+    entry.pack(side="left", padx=(0, 8))
+    entry.bind("<Return>", lambda _event: on_search())
+    ctk.CTkButton(bar, text="Ara", command=on_search, width=60, height=28).pack(side="left")
+    return bar, entry
+
+
+class BulkEditDialog(ctk.CTkToplevel):
+    """Asks for the values to set on every selected row.
+
+    ``fields`` are ``(key, label, choices)``; ``choices`` is None for free
+    text. ``on_apply`` receives only the fields the user filled in.
+    """
+
+    def __init__(self, parent, title, fields, on_apply):
+        super().__init__(parent)
+        self.title(title)
+        self.resizable(False, False)
+        self.transient(parent.winfo_toplevel())
+        self.grid_columnconfigure(1, weight=1)
+        self.on_apply = on_apply
+        self.inputs = {}
+        for row, (key, label, choices) in enumerate(fields):
+            ctk.CTkLabel(self, text=label, font=ctk.CTkFont(size=12, weight="bold")).grid(
+                row=row, column=0, padx=12, pady=(12 if row == 0 else 4, 4), sticky="w"
+            )
+            if choices is None:
+                widget = ctk.CTkEntry(self, placeholder_text=KEEP_LABEL, width=240)
+            else:
+                widget = ctk.CTkComboBox(self, values=[KEEP_LABEL, *choices], width=240)
+                widget.set(KEEP_LABEL)
+            widget.grid(row=row, column=1, padx=12, pady=(12 if row == 0 else 4, 4), sticky="ew")
+            self.inputs[key] = widget
+        ctk.CTkButton(self, text="Uygula", command=self.apply, height=32, fg_color="#10b981").grid(
+            row=len(fields), column=0, columnspan=2, padx=12, pady=12, sticky="ew"
+        )
+        self.bind("<Return>", lambda _event: self.apply())
+        self.bind("<Escape>", lambda _event: self.destroy())
+        # The window must be mapped before it can grab input.
+        self.after(100, self.grab_set)
+
+    def apply(self):
+        values = {}
+        for key, widget in self.inputs.items():
+            text = widget.get().strip()
+            if text and text != KEEP_LABEL:
+                values[key] = text
+        self.destroy()
+        if values:
+            self.on_apply(values)
+
+
+class StatementWindow(ctk.CTkToplevel):
+    """Account statement of one customer: balance, aging, entries and payments.
+
+    ``on_change`` is called after a payment is added or deleted.
+    """
+
+    def __init__(self, parent, db, customer_id, name, on_change=None):
+        super().__init__(parent)
+        self.db = db
+        self.customer_id = customer_id
+        self.on_change = on_change
+        self.title(f"Hesap Ekstresi — {name}")
+        self.geometry("900x600")
+        self.transient(parent.winfo_toplevel())
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(2, weight=1)
+
+        cards = ctk.CTkFrame(self, fg_color="#2d3748", corner_radius=12)
+        cards.grid(row=0, column=0, sticky="ew", padx=12, pady=(12, 8))
+        self.summary = ctk.CTkLabel(cards, text="", font=ctk.CTkFont(size=14, weight="bold"))
+        self.summary.pack(anchor="w", padx=12, pady=(10, 4))
+        self.aging = ctk.CTkLabel(cards, text="", text_color="#9ca3af")
+        self.aging.pack(anchor="w", padx=12, pady=(0, 10))
+
+        filter_bar = ctk.CTkFrame(self, fg_color="transparent")
+        filter_bar.grid(row=1, column=0, sticky="ew", padx=12, pady=(0, 8))
+        self.date_from = ctk.CTkEntry(filter_bar, placeholder_text="Başlangıç", width=110)
+        self.date_to = ctk.CTkEntry(filter_bar, placeholder_text="Bitiş", width=110)
+        for entry in (self.date_from, self.date_to):
+            entry.pack(side="left", padx=(0, 6))
+            entry.bind("<Return>", lambda _event: self.refresh())
+        ctk.CTkButton(filter_bar, text="Göster", command=self.refresh, width=70, height=28).pack(side="left")
+
+        from tkinter import ttk
+
+        # The table style is set up by the page that opens the window.
+        columns = {
+            "date": ("Tarih", 100, "center"),
+            "doc": ("Belge", 80, "center"),
+            "desc": ("Açıklama", 280, "w"),
+            "debit": ("Borç (₺)", 120, "e"),
+            "credit": ("Alacak (₺)", 120, "e"),
+            "balance": ("Bakiye (₺)", 130, "e"),
+        }
+        table = ctk.CTkFrame(self, fg_color="#2d3748", corner_radius=12)
+        table.grid(row=2, column=0, sticky="nsew", padx=12, pady=(0, 8))
+        table.grid_rowconfigure(0, weight=1)
+        table.grid_columnconfigure(0, weight=1)
+        self.tree = ttk.Treeview(table, columns=tuple(columns), show="headings", selectmode="extended")
+        for column, (heading, width, anchor) in columns.items():
+            self.tree.column(column, width=width, anchor=anchor)
+            self.tree.heading(column, text=heading)
+        scrollbar = ttk.Scrollbar(table, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscroll=scrollbar.set)
+        self.tree.grid(row=0, column=0, sticky="nsew", padx=(12, 0), pady=12)
+        scrollbar.grid(row=0, column=1, sticky="ns", padx=(0, 12), pady=12)
+        self.tree.bind("<Delete>", lambda _event: self.delete_payments())
+
+        payment_bar = ctk.CTkFrame(self, fg_color="transparent")
+        payment_bar.grid(row=3, column=0, sticky="ew", padx=12, pady=(0, 12))
+        self.pay_date = ctk.CTkEntry(payment_bar, width=110)
+        self.pay_date.insert(0, date.today().isoformat())
+        self.pay_amount = ctk.CTkEntry(payment_bar, placeholder_text="Tutar ₺", width=110)
+        self.pay_note = ctk.CTkEntry(payment_bar, placeholder_text="Not", width=200)
+        for widget in (self.pay_date, self.pay_amount, self.pay_note):
+            widget.pack(side="left", padx=(0, 6))
+        ctk.CTkButton(
+            payment_bar, text="Tahsilat Ekle", command=self.add_payment, height=30, fg_color="#10b981", width=110
+        ).pack(side="left", padx=(0, 6))
+        ctk.CTkButton(
+            payment_bar, text="Tahsilatı Sil", command=self.delete_payments, height=30, fg_color="#ef4444",
+            width=110,
+        ).pack(side="left")
+        self.message = ctk.CTkLabel(payment_bar, text="", text_color="#f87171")
+        self.message.pack(side="left", padx=12)
+
+        self.bind("<Escape>", lambda _event: self.destroy())
+        self.refresh()
+
+    def refresh(self):
+        self.db.run(
+            _load_statement, self.customer_id, self.date_from.get().strip(), self.date_to.get().strip(),
+            on_done=self._show,
+            on_error=lambda e: self.message.configure(text=f"Hata: {e}"),
+            key=f"statement.{self.customer_id}",
+        )
+
+    def _show(self, result):
+        if not self.winfo_exists():
+            return
+        (debit, credit, aging), (opening, lines) = result
+        self.summary.configure(
+            text=f"Borç {format_amount(debit)}   Alacak {format_amount(credit)}   "
+            f"Bakiye {format_amount(debit - credit, currency=True)}"
+        )
+        self.aging.configure(
+            text="Açık faturalar:   " + "   ".join(
+                f"{label}: {format_amount(amount)}" for label, amount in zip(AGING_LABELS, aging)
+            )
+        )
+        self.tree.delete(*self.tree.get_children())
+        if self.date_from.get().strip():
+            self.tree.insert("", "end", values=("", "", "Devir", "", "", format_amount(opening)))
+        for day, doc, row_id, desc, debit, credit, balance in lines:
+            self.tree.insert(
+                "", "end", iid=f"{doc}:{row_id}",
+                values=(
+                    day, DOC_LABELS[doc], desc or "", format_amount(debit) if debit else "",
+                    format_amount(credit) if credit else "", format_amount(balance),
+                ),
+            )
+        self.message.configure(text="")
+
+    def add_payment(self):
+        try:
+            amount = Money.parse(self.pay_amount.get()).minor
+            if amount <= 0:
+                raise ValueError("Tutar sıfırdan büyük olmalı")
+        except ValueError as e:
+            self.message.configure(text=f"Hata: {e}")
+            return
+        day, note = self.pay_date.get(), self.pay_note.get().strip()
+        self.db.run(
+            lambda conn: PaymentRepository(conn).add(self.customer_id, day, amount, note),
+            on_done=lambda _id: self._changed(clear=True),
+            on_error=lambda e: self.message.configure(text=f"Hata: {e}"),
+        )
+
+    def delete_payments(self):
+        ids = [int(item.split(":")[1]) for item in self.tree.selection() if item.startswith("payment:")]
+        if not ids:
+            self.message.configure(text="Silmek için tahsilat seçiniz")
+            return
+        self.db.run(
+            lambda conn: PaymentRepository(conn).delete_many(ids),
+            on_done=lambda _count: self._changed(),
+            on_error=lambda e: self.message.configure(text=f"Hata: {e}"),
+        )
+
+    def _changed(self, clear=False):
+        if not self.winfo_exists():
+            return
+        if clear:
+            self.pay_amount.delete(0, "end")
+            self.pay_note.delete(0, "end")
+        self.refresh()
+        if self.on_change:
+            self.on_change()
+
+
+class MainApp(ctk.CTk):
+    def __init__(self, executor, startup_marks=None, startup_probe=None, profiler=None, companies=None,
+                 company=MAIN_COMPANY, backup_executor=None):
+        super().__init__()
+        # The executor's connection is ``company``, taken from the pool in ``companies``.
+        self.companies = companies
+        self.company = company
+        # The worker's connection reports to the same profiler when it was opened with it.
+        self.profiler = profiler if profiler is not None else Profiler()
+        # All database work goes through the worker; callbacks run on the Tk thread.
+        self.db = TkBridge(self, executor, self.profiler)
+        # Backups run on their own worker and connection (see backup.py); None disables them.
+        self.backups = TkBridge(self, backup_executor, self.profiler) if backup_executor is not None else None
+        # Kept for this session only; with a password automatic backups are encrypted too.
+        self.backup_password = None
+        self.auto_backup = True
+        self.current_page = None
+        self.startup_marks = startup_marks if startup_marks is not None else {}
+        self.startup_probe = startup_probe
+        self._tree_style = None
+        self.title(f"MasterAccount — {company}")
+        self.geometry("1200x700")
+        self.minsize(1000, 600)
+
+        ctk.set_appearance_mode("dark")
+        ctk.set_default_color_theme("dark-blue")
+
+        # Layout: sidebar + content
+        self.grid_columnconfigure(1, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.sidebar = ctk.CTkFrame(self, width=220, fg_color="#1a1a1a")
+        self.sidebar.grid(row=0, column=0, sticky="nswe")
+        self.sidebar.grid_propagate(False)
+
+        self.logo = ctk.CTkLabel(
+            self.sidebar,
+            text="MasterAccount",
+            font=ctk.CTkFont(size=18, weight="bold"),
+        )
+        self.logo.pack(pady=(20, 12 if companies else 30))
+
+        if companies is not None:
+            self.var_company = ctk.StringVar(value=company)
+            self.company_menu = ctk.CTkOptionMenu(
+                self.sidebar, values=[company], variable=self.var_company, command=self.switch_company
+            )
+            self.company_menu.pack(fill="x", padx=12, pady=(0, 18))
+            self.refresh_companies()
+
+        self.btn_dashboard = ctk.CTkButton(
+            self.sidebar, text="📊 Dashboard", command=self.show_dashboard, height=40
+        )
+        self.btn_income_expense = ctk.CTkButton(
+            self.sidebar, text="💰 Gelir/Gider", command=self.show_income_expense, height=40
+        )
+        self.btn_customers = ctk.CTkButton(
+            self.sidebar, text="👥 Müşteriler", command=self.show_customers, height=40
+        )
+        self.btn_recurring = ctk.CTkButton(
+            self.sidebar, text="🔁 Tekrarlayan", command=self.show_recurring, height=40
+        )
+        self.btn_settings = ctk.CTkButton(
+            self.sidebar, text="⚙️ Ayarlar", command=self.show_settings, height=40
+        )
+
+        for w in (
+            self.btn_dashboard, self.btn_income_expense, self.btn_customers, self.btn_recurring, self.btn_settings
+        ):
+            w.pack(fill="x", padx=12, pady=8)
+
+        # Undo/redo over the change journal (Ctrl+Z / Ctrl+Y anywhere in the window).
+        self.status = ctk.CTkLabel(self.sidebar, text="", text_color="#9ca3af", wraplength=190)
+        self.status.pack(side="bottom", fill="x", padx=12, pady=(0, 12))
+        history_bar = ctk.CTkFrame(self.sidebar, fg_color="transparent")
+        history_bar.pack(side="bottom", fill="x", padx=12, pady=8)
+        history_bar.grid_columnconfigure((0, 1), weight=1)
+        ctk.CTkButton(history_bar, text="↶ Geri Al", command=self.undo, height=32, fg_color="#4b5563").grid(
+            row=0, column=0, padx=(0, 4), sticky="ew"
+        )
+        ctk.CTkButton(history_bar, text="↷ Yinele", command=self.redo, height=32, fg_color="#4b5563").grid(
+            row=0, column=1, padx=(4, 0), sticky="ew"
+        )
+        self.bind("<Control-z>", lambda _event: self.undo())
+        self.bind("<Control-y>", lambda _event: self.redo())
+        self.bind("<Control-Z>", lambda _event: self.redo())
+
+        # Content frames
+        self.container = ctk.CTkFrame(self)
+        self.container.grid(row=0, column=1, sticky="nswe", padx=16, pady=16)
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
+
+        # Only the dashboard is built up front; other pages on first visit.
+        self.frames = {}
+        self.show_dashboard()
+
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.after(CHECKPOINT_INTERVAL_MS, self._checkpoint)
+        self.after(RECURRING_INTERVAL_MS, self._recurring_timer)
+        if self.backups is not None:
+            self.after(BACKUP_DELAY_MS, self._backup_timer)
+        self.after_idle(self.mark_startup, "window")
+        self.materialize_recurring()
+
+    def page(self, name):
+        frame = self.frames.get(name)
+        if frame is None:
+            frame = getattr(self, name)(parent=self.container, controller=self)
+            frame.grid(row=0, column=0, sticky="nswe")
+            self.frames[name] = frame
+        return frame
+
+    def tree_style(self):
+        """The shared ttk style for tables, configured once on first use."""
+        if self._tree_style is None:
+            from tkinter import ttk
+
+            style = ttk.Style()
+            style.theme_use("clam")
+            style.configure("Treeview", background="#1a1a1a", foreground="white", fieldbackground="#2d3748")
+            style.configure("Treeview.Heading", background="#3f3f3f", foreground="white")
+            style.map("Treeview", background=[("selected", "#10b981")])
+            self._tree_style = style
+        return self._tree_style
+
+    def mark_startup(self, name):
+        if name in self.startup_marks:
+            return
+        self.startup_marks[name] = time.perf_counter()
+        if name == "dashboard" and self.startup_probe:
+            start = self.startup_marks.get("start", 0)
+            timings = {
+                f"{mark}_ms": (at - start) * 1000
+                for mark, at in self.startup_marks.items()
+                if mark != "start"
+            }
+            timings["finished_at"] = time.time()
+            with open(self.startup_probe, "w", encoding="utf-8") as f:
+                json.dump(timings, f)
+            self.after(0, self.on_close)
+
+    def refresh_companies(self):
+        self.db.run(lambda _conn: self.companies.names(), on_done=self._show_companies, key="companies")
+
+    def _show_companies(self, names):
+        self.company_menu.configure(values=[*names, NEW_COMPANY_LABEL])
+
+    def switch_company(self, name):
+        if name == NEW_COMPANY_LABEL:
+            self.var_company.set(self.company)
+            name = ctk.CTkInputDialog(text="Şirket adı:", title="Yeni Şirket").get_input()
+            if not name or not name.strip():
+                return
+            self.db.run(
+                lambda _conn: self.companies.create(name),
+                on_done=lambda _path: self._open_company(name.strip()),
+                on_error=lambda e: self.set_status(f"Hata: {e}"),
+            )
+        elif name != self.company:
+            self._open_company(name)
+
+    def _open_company(self, name):
+        if self.current_page is not None:
+            self.db.cancel_group(self.current_page)
+        # Jobs queued before this still run on the old company's connection.
+        self.db.run(
+            lambda _conn: self.companies.open(name),
+            switch=True,
+            on_done=lambda _: self._company_opened(name),
+            on_error=lambda e: self._company_failed(e),
+        )
+
+    def _company_opened(self, name):
+        self.company = name
+        self.var_company.set(name)
+        self.title(f"MasterAccount — {name}")
+        self.set_status(f"Şirket: {name}")
+        dashboard = self.frames.get("DashboardFrame")
+        if dashboard is not None:
+            dashboard.forget_series()
+        ledger = self.frames.get("IncomeExpenseFrame")
+        if ledger is not None:
+            # Customer names belong to the previous company.
+            ledger.filter_customer.set("")
+            ledger.customer_entry.set("")
+        if self.backups is not None:
+            self.backups.run(_reopen_backup_source, self.companies.path(name), switch=True)
+        self.refresh_companies()
+        self.refresh_page()
+        self.materialize_recurring()
+
+    def _company_failed(self, error):
+        self.var_company.set(self.company)
+        self.set_status(f"Şirket açılamadı: {error}")
+
+    def undo(self):
+        self._run_history(undo, "Geri alındı", "Geri alınacak işlem yok")
+
+    def redo(self):
+        self._run_history(redo, "Yinelendi", "Yinelenecek işlem yok")
+
+    def _run_history(self, step, done_text, empty_text):
+        def show(label):
+            self.set_status(f"{done_text}: {label}" if label else empty_text)
+            if label:
+                self.refresh_page()
+
+        # Not keyed: every press is one step, run in order, none coalesced away.
+        self.db.run(step, on_done=show, on_error=lambda e: self.set_status(f"Hata: {e}"))
+
+    def set_status(self, text):
+        self.status.configure(text=text)
+
+    def refresh_page(self):
+        """Reload the visible page after the data changed underneath it."""
+        refresh = {
+            "DashboardFrame": self.show_dashboard,
+            "IncomeExpenseFrame": self.show_income_expense,
+            "CustomersFrame": self.show_customers,
+            "RecurringFrame": self.show_recurring,
+            "SettingsFrame": self.show_settings,
+        }
+        if self.current_page in refresh:
+            refresh[self.current_page]()
+
+    def _checkpoint(self):
+        self.db.run(checkpoint, key="checkpoint")
+        self.after(CHECKPOINT_INTERVAL_MS, self._checkpoint)
+
+    def materialize_recurring(self, announce=False):
+        """Write the recurring entries that are due, all in one worker job."""
+        self.db.run(
+            materialize_due,
+            on_done=lambda count: self._recurring_written(count, announce),
+            on_error=lambda e: self.set_status(f"Tekrarlayan kayıtlar yazılamadı: {e}"),
+            key="recurring",
+        )
+
+    def _recurring_written(self, count, announce):
+        if count:
+            self.set_status(f"{count:,} tekrarlayan kayıt eklendi")
+            self.refresh_page()
+        elif announce:
+            self.set_status("Zamanı gelen tekrarlayan kayıt yok")
+
+    def _recurring_timer(self):
+        self.materialize_recurring()
+        self.after(RECURRING_INTERVAL_MS, self._recurring_timer)
+
+    def backup_now(self, full=False, on_done=None):
+        """Back up the open company on the backup worker; incremental unless ``full``."""
+        def done(path):
+            self.set_status(f"Yedek alındı: {path.name}")
+            if on_done is not None:
+                on_done(path)
+
+        self.backups.run(
+            create_backup,
+            None,
+            not full,
+            self.backup_password,
+            on_done=done,
+            on_error=lambda e: self.set_status(f"Yedek alınamadı: {e}"),
+            key="backup",
+        )
+
+    def _backup_timer(self):
+        if self.auto_backup:
+            self.backup_now()
+        self.after(BACKUP_INTERVAL_MS, self._backup_timer)
+
+    def on_close(self):
+        self.db.executor.shutdown()
+        if self.backups is not None:
+            # An unfinished backup leaves only a temporary file, removed by the next one.
+            self.backups.executor.shutdown(wait=False)
+        self.destroy()
+
+    def show_frame(self, name: str):
+        started = time.perf_counter()
+        if self.current_page not in (None, name):
+            # Results for the page being left are no longer wanted.
+            self.db.cancel_group(self.current_page)
+        self.current_page = name
+        self.page(name).tkraise()
+        if self.profiler.enabled:
+            # Idle comes after the pending redraw, so this includes painting the page.
+            self.after_idle(lambda: self.profiler.record_ui(f"sayfa: {name}", time.perf_counter() - started))
+
+    def show_dashboard(self):
+        self.show_frame("DashboardFrame")
+        self.page("DashboardFrame").update_cards()
+
+    def show_income_expense(self):
+        self.show_frame("IncomeExpenseFrame")
+        self.page("IncomeExpenseFrame").refresh_customers()
+        self.page("IncomeExpenseFrame").refresh_table()
+
+    def show_customers(self):
+        self.show_frame("CustomersFrame")
+        self.page("CustomersFrame").refresh_table()
+
+    def show_recurring(self):
+        self.show_frame("RecurringFrame")
+        self.page("RecurringFrame").refresh_table()
+
+    def show_settings(self):
+        self.show_frame("SettingsFrame")
+        self.page("SettingsFrame").refresh_snapshots()
+        self.page("SettingsFrame").refresh_backups()
+        self.page("SettingsFrame").refresh_profile()
+
+    class DashboardFrame(ctk.CTkFrame):
+        def __init__(self, parent, controller):
+            super().__init__(parent)
+            self.controller = controller
+            self.grid_columnconfigure((0, 1, 2), weight=1)
+            self.grid_rowconfigure(2, weight=1)
+
+            # Period shown under each all-time total and in the chart.
+            period_bar = ctk.CTkFrame(self, fg_color="transparent")
+            period_bar.grid(row=0, column=0, columnspan=3, padx=12, pady=(12, 0), sticky="w")
+            self.var_period = ctk.StringVar(value=DASHBOARD_PERIODS[0])
+            ctk.CTkSegmentedButton(
+                period_bar, values=list(DASHBOARD_PERIODS), variable=self.var_period,
+                command=lambda _value: self._period_changed(),
+            ).pack(side="left", padx=(0, 12))
+            self.from_entry = ctk.CTkEntry(period_bar, placeholder_text="Başlangıç", width=110)
+            self.to_entry = ctk.CTkEntry(period_bar, placeholder_text="Bitiş", width=110)
+            self.from_entry.pack(side="left", padx=(0, 6))
+            self.to_entry.pack(side="left", padx=(0, 6))
+            ctk.CTkButton(period_bar, text="Uygula", command=self._apply_custom, width=70, height=28).pack(
+                side="left"
+            )
+            # Totals over every company file, shown once there is more than one.
+            self.consolidated = ctk.CTkLabel(self, text="", text_color="#9ca3af")
+            self.consolidated.grid(row=0, column=0, columnspan=3, padx=12, pady=(12, 0), sticky="e")
+
+            self.card_income = ctk.CTkFrame(self, corner_radius=12, fg_color="#2d3748")
+            self.card_balance = ctk.CTkFrame(self, corner_radius=12, fg_color="#2d3748")
+            self.card_expense = ctk.CTkFrame(self, corner_radius=12, fg_color="#2d3748")
+
+            self.card_income.grid(row=1, column=0, padx=12, pady=12, sticky="nwe")
+            self.card_balance.grid(row=1, column=1, padx=12, pady=12, sticky="nwe")
+            self.card_expense.grid(row=1, column=2, padx=12, pady=12, sticky="nwe")
+
+            self.lbl_income = ctk.CTkLabel(
+                self.card_income, text="Toplam Gelir", font=ctk.CTkFont(size=14, weight="bold")
+            )
+            self.val_income = ctk.CTkLabel(
+                self.card_income, text="0 ₺", font=ctk.CTkFont(size=28, weight="bold"), text_color="#4ade80"
+            )
+            self.sub_income = ctk.CTkLabel(self.card_income, text="", text_color="#9ca3af")
+            self.lbl_income.pack(pady=(16, 4))
+            self.val_income.pack(pady=(0, 4))
+            self.sub_income.pack(pady=(0, 12))
+
+            self.lbl_balance = ctk.CTkLabel(
+                self.card_balance, text="Toplam Bakiye", font=ctk.CTkFont(size=14, weight="bold")
+            )
+            self.val_balance = ctk.CTkLabel(
+                self.card_balance, text="0 ₺", font=ctk.CTkFont(size=28, weight="bold"), text_color="#60a5fa"
+            )
+            self.sub_balance = ctk.CTkLabel(self.card_balance, text="", text_color="#9ca3af")
+            self.lbl_balance.pack(pady=(16, 4))
+            self.val_balance.pack(pady=(0, 4))
+            self.sub_balance.pack(pady=(0, 12))
+
+            self.lbl_expense = ctk.CTkLabel(
+                self.card_expense, text="Toplam Gider", font=ctk.CTkFont(size=14, weight="bold")
+            )
+            self.val_expense = ctk.CTkLabel(
+                self.card_expense, text="0 ₺", font=ctk.CTkFont(size=28, weight="bold"), text_color="#f87171"
+            )
+            self.sub_expense = ctk.CTkLabel(self.card_expense, text="", text_color="#9ca3af")
+            self.lbl_expense.pack(pady=(16, 4))
+            self.val_expense.pack(pady=(0, 4))
+            self.sub_expense.pack(pady=(0, 12))
+
+            chart_frame = ctk.CTkFrame(self, corner_radius=12, fg_color="#2d3748")
+            chart_frame.grid(row=2, column=0, columnspan=3, padx=12, pady=(0, 12), sticky="nsew")
+            chart_frame.grid_columnconfigure(0, weight=1)
+            chart_frame.grid_rowconfigure(1, weight=1)
+            self.var_chart_grain = ctk.StringVar(value=_chart_grain_label(*_period_range(
+                DASHBOARD_PERIODS[0], date.today()
+            )))
+            ctk.CTkSegmentedButton(
+                chart_frame, values=list(CHART_GRAINS), variable=self.var_chart_grain,
+                command=lambda _value: self.update_cards(),
+            ).grid(row=0, column=0, padx=12, pady=(12, 0), sticky="e")
+
+            import tkinter
+
+            canvas = tkinter.Canvas(chart_frame, bg="#2d3748", highlightthickness=0, height=220)
+            canvas.grid(row=1, column=0, padx=12, pady=12, sticky="nsew")
+            self.chart = LedgerChart(canvas)
+            # Chart series by (grain, from, to), valid while the database is at _series_version.
+            self._series_cache = {}
+            self._series_version = None
+
+        def forget_series(self):
+            self._series_cache.clear()
+            self._series_version = None
+
+        def _apply_custom(self):
+            self.var_period.set("Özel")
+            self._period_changed()
+
+        def _period_changed(self):
+            try:
+                date_from, date_to = _period_range(
+                    self.var_period.get(), date.today(), (self.from_entry.get().strip(), self.to_entry.get().strip())
+                )
+            except ValueError:
+                date_from = date_to = None
+            self.var_chart_grain.set(_chart_grain_label(date_from, date_to))
+            self.update_cards()
+
+        def update_cards(self):
+            period = self.var_period.get()
+            try:
+                date_from, date_to = _period_range(
+                    period, date.today(), (self.from_entry.get().strip(), self.to_entry.get().strip())
+                )
+            except ValueError as e:
+                self.sub_balance.configure(text=f"Hata: {e}", text_color="#f87171")
+                return
+            if period == "Özel":
+                label = f"{date_from or '…'} – {date_to or '…'}"
+            else:
+                label = period
+            self.controller.db.run(
+                _dashboard_totals,
+                date_from,
+                date_to,
+                on_done=lambda totals: self._show_cards(label, totals),
+                on_error=self._load_failed,
+                key="dashboard.cards",
+                group="DashboardFrame",
+            )
+            self.update_chart(date_from, date_to)
+            if self.controller.companies is not None:
+                self.controller.db.run(
+                    _consolidated_totals,
+                    self.controller.companies,
+                    date_from,
+                    date_to,
+                    on_done=lambda totals: self._show_consolidated(label, totals),
+                    on_error=lambda e: self.consolidated.configure(text=f"Konsolide toplam alınamadı: {e}"),
+                    key="dashboard.consolidated",
+                    group="DashboardFrame",
+                )
+
+        def _show_consolidated(self, label, totals):
+            if totals is None:
+                self.consolidated.configure(text="")
+                return
+            count, income, expense, pending = totals
+            text = (
+                f"Tüm şirketler ({count}) · {label}: Gelir {format_amount(income, currency=True)} · "
+                f"Gider {format_amount(expense, currency=True)} · Net {format_amount(income - expense, currency=True)}"
+            )
+            if pending:
+                text += f" · {pending} şirket henüz taşınmadı (açıldığında taşınır)"
+            self.consolidated.configure(text=text)
+
+        def update_chart(self, date_from, date_to):
+            key = (CHART_GRAINS[self.var_chart_grain.get()], date_from, date_to)
+            known = self._series_version if key in self._series_cache else None
+            self.controller.db.run(
+                _dashboard_series,
+                *key,
+                known,
+                on_done=lambda result: self._show_chart(key, *result),
+                key="dashboard.series",
+                group="DashboardFrame",
+            )
+
+        def _show_chart(self, key, version, series):
+            if series is None:
+                series = self._series_cache.get(key)
+                if series is None:
+                    return
+            else:
+                if version != self._series_version:
+                    self._series_cache.clear()
+                    self._series_version = version
+                self._series_cache[key] = series
+            self.chart.set_data(*series)
+
+        def _load_failed(self, error):
+            # The first load also reports failures to open or migrate the database.
+            self.sub_balance.configure(text=f"Veritabanı hatası: {error}", text_color="#f87171")
+
+        def _show_cards(self, label, totals):
+            (total_income, total_expense), (period_income, period_expense) = totals
+            balance = total_income - total_expense
+
+            self.val_income.configure(text=format_amount(total_income, currency=True))
+            self.val_expense.configure(text=format_amount(total_expense, currency=True))
+            color = "#4ade80" if balance >= 0 else "#f87171"
+            self.val_balance.configure(text=format_amount(balance, currency=True), text_color=color)
+            self.sub_income.configure(text=f"{label}: {format_amount(period_income, currency=True)}")
+            self.sub_expense.configure(text=f"{label}: {format_amount(period_expense, currency=True)}")
+            self.sub_balance.configure(
+                text=f"{label}: {format_amount(period_income - period_expense, currency=True)}",
+                text_color="#9ca3af",
+            )
+            self.controller.mark_startup("dashboard")
+
+    class IncomeExpenseFrame(ctk.CTkFrame):
+        def __init__(self, parent, controller):
+            super().__init__(parent)
+            self.controller = controller
+            self.grid_columnconfigure(0, weight=1)
+            self.grid_rowconfigure(1, weight=1)
+
+            # Form Frame
+            form_frame = ctk.CTkFrame(self, fg_color="#2d3748", corner_radius=12)
+            form_frame.grid(row=0, column=0, sticky="ew", padx=0, pady=(0, 16))
+            form_frame.grid_columnconfigure(1, weight=1)
+
+            ctk.CTkLabel(form_frame, text="Tür", font=ctk.CTkFont(size=12, weight="bold")).grid(
+                row=0, column=0, padx=12, pady=(12, 4), sticky="w"
+            )
+            self.var_type = ctk.StringVar(value="Gelir")
+            type_menu = ctk.CTkOptionMenu(
+                form_frame, values=["Gelir", "Gider"], variable=self.var_type
+            )
+            type_menu.grid(row=0, column=1, padx=12, pady=(12, 4), sticky="ew")
+
+            ctk.CTkLabel(form_frame, text="Tarih", font=ctk.CTkFont(size=12, weight="bold")).grid(
+                row=1, column=0, padx=12, pady=4, sticky="w"
+            )
+            self.date_entry = ctk.CTkEntry(form_frame)
+            self.date_entry.insert(0, datetime.now().strftime("%Y-%m-%d"))
+            self.date_entry.grid(row=1, column=1, padx=12, pady=4, sticky="ew")
+
+            ctk.CTkLabel(form_frame, text="Açıklama", font=ctk.CTkFont(size=12, weight="bold")).grid(
+                row=2, column=0, padx=12, pady=4, sticky="w"
+            )
+            self.desc_entry = ctk.CTkEntry(form_frame, placeholder_text="Örn: Danışmanlık hizmeti")
+            self.desc_entry.grid(row=2, column=1, padx=12, pady=4, sticky="ew")
+
+            ctk.CTkLabel(form_frame, text="Tutar (₺)", font=ctk.CTkFont(size=12, weight="bold")).grid(
+                row=3, column=0, padx=12, pady=4, sticky="w"
+            )
+            self.amount_entry = ctk.CTkEntry(form_frame, placeholder_text="0.00")
+            self.amount_entry.grid(row=3, column=1, padx=12, pady=4, sticky="ew")
+
+            ctk.CTkLabel(form_frame, text="Müşteri", font=ctk.CTkFont(size=12, weight="bold")).grid(
+                row=4, column=0, padx=12, pady=4, sticky="w"
+            )
+            self.customer_entry = ctk.CTkComboBox(form_frame, values=[""])
+            self.customer_entry.set("")
+            self.customer_entry.grid(row=4, column=1, padx=12, pady=4, sticky="ew")
+
+            # A repeating entry is stored as a rule; its date is the first occurrence.
+            ctk.CTkLabel(form_frame, text="Tekrar", font=ctk.CTkFont(size=12, weight="bold")).grid(
+                row=5, column=0, padx=12, pady=4, sticky="w"
+            )
+            repeat_bar = ctk.CTkFrame(form_frame, fg_color="transparent")
+            repeat_bar.grid(row=5, column=1, padx=12, pady=4, sticky="ew")
+            self.var_repeat = ctk.StringVar(value=ONCE_LABEL)
+            ctk.CTkOptionMenu(
+                repeat_bar, values=[ONCE_LABEL, *FREQUENCY_LABELS.values()], variable=self.var_repeat, width=110
+            ).pack(side="left", padx=(0, 6))
+            ctk.CTkLabel(repeat_bar, text="Her").pack(side="left", padx=(0, 4))
+            self.interval_entry = ctk.CTkEntry(repeat_bar, width=50)
+            self.interval_entry.insert(0, "1")
+            self.interval_entry.pack(side="left", padx=(0, 6))
+            self.repeat_end_entry = ctk.CTkEntry(repeat_bar, placeholder_text="Bitiş (isteğe bağlı)", width=150)
+            self.repeat_end_entry.pack(side="left")
+
+            btn_add = ctk.CTkButton(
+                form_frame, text="Kaydet", command=self.save_entry, height=36, fg_color="#10b981"
+            )
+            btn_add.grid(row=6, column=0, columnspan=2, padx=12, pady=12, sticky="ew")
+
+            # Table Frame
+            table_frame = ctk.CTkFrame(self, fg_color="#2d3748", corner_radius=12)
+            table_frame.grid(row=1, column=0, sticky="nsew", padx=0, pady=0)
+            table_frame.grid_rowconfigure(2, weight=1)
+            table_frame.grid_columnconfigure(0, weight=1)
+
+            ctk.CTkLabel(
+                table_frame, text="Gelir ve Gider Kayıtları", font=ctk.CTkFont(size=14, weight="bold")
+            ).grid(row=0, column=0, padx=12, pady=(12, 8), sticky="w")
+            search_bar, self.search_entry = _search_bar(
+                table_frame, self.refresh_table, "Açıklamada ara…"
+            )
+            search_bar.grid(row=0, column=0, columnspan=2, padx=12, pady=(12, 8), sticky="e")
+
+            # Filters are applied in SQL, together with the search text.
+            filter_bar = ctk.CTkFrame(table_frame, fg_color="transparent")
+            filter_bar.grid(row=1, column=0, columnspan=2, padx=12, pady=(0, 8), sticky="w")
+            self.filter_from = ctk.CTkEntry(filter_bar, placeholder_text="Başlangıç", width=110)
+            self.filter_to = ctk.CTkEntry(filter_bar, placeholder_text="Bitiş", width=110)
+            self.var_filter_type = ctk.StringVar(value=ALL_KINDS_LABEL)
+            filter_type = ctk.CTkOptionMenu(
+                filter_bar, values=[ALL_KINDS_LABEL, *KIND_LABELS.values()],
+                variable=self.var_filter_type, width=90,
+            )
+            self.filter_min = ctk.CTkEntry(filter_bar, placeholder_text="En az ₺", width=90)
+            self.filter_max = ctk.CTkEntry(filter_bar, placeholder_text="En çok ₺", width=90)
+            self.filter_customer = ctk.CTkComboBox(filter_bar, values=[""], width=150)
+            self.filter_customer.set("")
+            for widget in (
+                self.filter_from, self.filter_to, filter_type, self.filter_min, self.filter_max,
+                self.filter_customer,
+            ):
+                widget.pack(side="left", padx=(0, 6))
+            for entry in (self.filter_from, self.filter_to, self.filter_min, self.filter_max):
+                entry.bind("<Return>", lambda _event: self.refresh_table())
+            ctk.CTkButton(filter_bar, text="Filtrele", command=self.refresh_table, width=70, height=28).pack(
+                side="left", padx=(0, 6)
+            )
+            ctk.CTkButton(
+                filter_bar, text="Temizle", command=self.clear_filters, width=70, height=28, fg_color="#4b5563"
+            ).pack(side="left")
+
+            from tkinter import ttk
+
+            controller.tree_style()
+
+            self.tree = ttk.Treeview(
+                table_frame,
+                columns=("id", "date", "desc", "type", "amount", "customer"),
+                height=12,
+                show="headings",
+                selectmode="extended",
+            )
+            self.tree.column("id", width=40, anchor="center")
+            self.tree.column("date", width=100, anchor="center")
+            self.tree.column("desc", width=250, anchor="w")
+            self.tree.column("type", width=80, anchor="center")
+            self.tree.column("amount", width=120, anchor="e")
+            self.tree.column("customer", width=150, anchor="w")
+
+            self.tree.heading("id", text="ID")
+            self.tree.heading("date", text="Tarih")
+            self.tree.heading("desc", text="Açıklama")
+            self.tree.heading("type", text="Tür")
+            self.tree.heading("amount", text="Tutar (₺)")
+            self.tree.heading("customer", text="Müşteri")
+
+            self.scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
+            self.tree.configure(yscroll=self._on_tree_scroll)
+            self.tree.bind("<Delete>", lambda _event: self.delete_selected())
+            self.tree.bind("<Control-a>", lambda _event: self._select_all())
+
+            self.tree.grid(row=2, column=0, sticky="nsew", padx=12, pady=(0, 12))
+            self.scrollbar.grid(row=2, column=1, sticky="nse", padx=(0, 12), pady=(0, 12))
+
+            self.pager = None
+            self._page_pending = False
+            self._generation = 0
+            self._filters = None
+            self._customer_choices = []
+
+            self.filter_summary = ctk.CTkLabel(table_frame, text="", text_color="#9ca3af")
+            self.filter_summary.grid(row=3, column=0, padx=12, pady=(0, 12), sticky="w")
+
+            btn_delete = ctk.CTkButton(
+                table_frame,
+                text="Sil",
+                command=self.delete_selected,
+                height=32,
+                fg_color="#ef4444",
+                width=100,
+            )
+            btn_delete.grid(row=3, column=0, padx=12, pady=(0, 12), sticky="e")
+            btn_edit = ctk.CTkButton(
+                table_frame, text="Düzenle", command=self.edit_selected, height=32, fg_color="#4b5563", width=100
+            )
+            btn_edit.grid(row=3, column=0, padx=(12, 124), pady=(0, 12), sticky="e")
+
+        def save_entry(self):
+            try:
+                date = self.date_entry.get()
+                desc = self.desc_entry.get()
+                amount = Money.parse(self.amount_entry.get()).minor
+                entry_type = self.var_type.get()
+                customer = self.customer_entry.get().strip()
+
+                if not desc:
+                    raise ValueError("Açıklama boş olamaz")
+                if amount <= 0:
+                    raise ValueError("Tutar sıfırdan büyük olmalı")
+                frequency = LABEL_FREQUENCIES.get(self.var_repeat.get())
+                interval = self.interval_entry.get().strip() or "1"
+                if frequency and not (interval.isdigit() and int(interval) >= 1):
+                    raise ValueError("Tekrar aralığı pozitif bir tam sayı olmalı")
+            except ValueError as e:
+                self._show_error(f"Hata: {e}")
+                return
+
+            kind = LABEL_KINDS[entry_type]
+            if frequency:
+                self.controller.db.run(
+                    _add_recurring, kind, date, desc, amount, customer, frequency, int(interval),
+                    self.repeat_end_entry.get().strip(),
+                    on_done=self._after_recurring_save,
+                    on_error=self._save_failed,
+                )
+                return
+            self.controller.db.run(
+                _add_entry, kind, date, desc, amount, customer,
+                on_done=self._after_save,
+                on_error=self._save_failed,
+            )
+
+        def _after_save(self, _entry_id):
+            self.desc_entry.delete(0, "end")
+            self.amount_entry.delete(0, "end")
+            # The ledger reloads when this page is shown again.
+            self.controller.show_dashboard()
+
+        def _after_recurring_save(self, count):
+            self.var_repeat.set(ONCE_LABEL)
+            self.repeat_end_entry.delete(0, "end")
+            self.controller.set_status(f"Tekrarlayan kayıt eklendi ({count:,} kayıt yazıldı)")
+            self._after_save(None)
+
+        def _save_failed(self, error):
+            if isinstance(error, ValueError):
+                self._show_error(f"Hata: {error}")
+            else:
+                self._show_error(f"Kayıt hatası: {error}")
+
+        def _select_all(self):
+            self.tree.selection_set(self.tree.get_children())
+            return "break"
+
+        def delete_selected(self):
+            selection = self.tree.selection()
+            if not selection:
+                self._show_error("Silmek için kayıt seçiniz")
+                return
+
+            ids = [int(item) for item in selection]
+            self.controller.db.run(
+                lambda conn: LedgerRepository(conn).delete_many(ids),
+                on_done=lambda count: self._remove_rows(selection, count),
+                on_error=lambda e: self._show_error(f"Hata: {e}"),
+            )
+
+        def _remove_rows(self, items, count):
+            # Only the deleted rows leave the view; the loaded pages stay as they are.
+            self.tree.delete(*(item for item in items if self.tree.exists(item)))
+            self.controller.set_status(f"{count:,} kayıt silindi")
+            self._refresh_summary()
+
+        def edit_selected(self):
+            ids = [int(item) for item in self.tree.selection()]
+            if not ids:
+                self._show_error("Düzenlemek için kayıt seçiniz")
+                return
+            fields = [
+                ("kind", "Tür", list(KIND_LABELS.values())),
+                ("date", "Tarih", None),
+                ("description", "Açıklama", None),
+                ("amount", "Tutar (₺)", None),
+                ("customer", "Müşteri", [NO_CUSTOMER_LABEL, *self._customer_choices]),
+            ]
+            BulkEditDialog(self, f"{len(ids):,} kaydı düzenle", fields, lambda values: self._apply_edit(ids, values))
+
+        def _apply_edit(self, ids, values):
+            customer = values.pop("customer", None)
+            try:
+                if "kind" in values:
+                    if values["kind"] not in LABEL_KINDS:
+                        raise ValueError(f"Bilinmeyen tür: {values['kind']}")
+                    values["kind"] = LABEL_KINDS[values["kind"]]
+                if "amount" in values:
+                    values["amount"] = Money.parse(values["amount"]).minor
+                    if values["amount"] <= 0:
+                        raise ValueError("Tutar sıfırdan büyük olmalı")
+            except ValueError as e:
+                self._show_error(f"Hata: {e}")
+                return
+
+            self.controller.db.run(
+                _edit_entries, ids, values, customer,
+                on_done=self._show_edited,
+                on_error=self._save_failed,
+            )
+
+        def _show_edited(self, rows):
+            for row in rows:
+                item = str(row[0])
+                if self.tree.exists(item):
+                    self.tree.item(item, values=_ledger_values(row))
+            self.controller.set_status(f"{len(rows):,} kayıt düzenlendi")
+            self._refresh_summary()
+
+        def _read_filters(self):
+            amounts = []
+            for entry in (self.filter_min, self.filter_max):
+                text = entry.get().strip()
+                amounts.append(Money.parse(text).minor if text else None)
+            entry_type = self.var_filter_type.get()
+            return LedgerFilter(
+                self.filter_from.get().strip() or None,
+                self.filter_to.get().strip() or None,
+                LABEL_KINDS.get(entry_type),
+                *amounts,
+            )
+
+        def clear_filters(self):
+            for entry in (self.filter_from, self.filter_to, self.filter_min, self.filter_max):
+                entry.delete(0, "end")
+            self.var_filter_type.set(ALL_KINDS_LABEL)
+            self.filter_customer.set("")
+            self.refresh_table()
+
+        def refresh_customers(self):
+            self.controller.db.run(
+                _customer_names,
+                on_done=self._show_customer_names,
+                key="ledger.customers",
+                group="IncomeExpenseFrame",
+            )
+
+        def _show_customer_names(self, names):
+            self._customer_choices = names
+            for box in (self.customer_entry, self.filter_customer):
+                box.configure(values=["", *names])
+
+        def refresh_table(self):
+            try:
+                filters = self._read_filters()
+            except ValueError as e:
+                self._show_error(f"Hata: {e}")
+                return
+            self._generation += 1
+            self._page_pending = True
+            generation = self._generation
+            self.filter_summary.configure(text="")
+            self.controller.db.run(
+                _open_ledger,
+                self.search_entry.get(),
+                filters,
+                self.filter_customer.get().strip(),
+                on_done=lambda result: self._show_first_page(generation, *result),
+                on_error=lambda error: self._load_failed(generation, error),
+                key="ledger.refresh",
+                group="IncomeExpenseFrame",
+                interruptible=True,
+            )
+
+        def _load_failed(self, generation, error):
+            if generation != self._generation:
+                return
+            self._page_pending = False
+            self._show_error(f"Hata: {error}")
+
+        def _show_summary(self, generation, totals):
+            if generation != self._generation:
+                return
+            income, expense = totals
+            self.filter_summary.configure(
+                text=f"Filtre toplamı — Gelir: {format_amount(income, currency=True)}   "
+                f"Gider: {format_amount(expense, currency=True)}   "
+                f"Net: {format_amount(income - expense, currency=True)}"
+            )
+
+        def _show_first_page(self, generation, pager, rows, filters):
+            if generation != self._generation:
+                return
+            self.pager = pager
+            # Keeps the customer already resolved by the page query.
+            self._filters = filters
+            self.tree.delete(*self.tree.get_children())
+            self.tree.yview_moveto(0)
+            self._append_rows(generation, rows)
+            self._refresh_summary()
+
+        def _refresh_summary(self):
+            if not self._filters:
+                return
+            generation = self._generation
+            self.controller.db.run(
+                _filtered_totals,
+                self._filters,
+                on_done=lambda totals: self._show_summary(generation, totals),
+                key="ledger.totals",
+                group="IncomeExpenseFrame",
+                interruptible=True,
+            )
+
+        def _append_rows(self, generation, rows):
+            if generation != self._generation:
+                return
+            self._page_pending = False
+            for row in rows:
+                # A row edited in place can come round again in a later page.
+                if self.tree.exists(row[0]):
+                    self.tree.item(row[0], values=_ledger_values(row))
+                else:
+                    self.tree.insert("", "end", iid=row[0], values=_ledger_values(row))
+
+        def _on_tree_scroll(self, first, last):
+            self.scrollbar.set(first, last)
+            # Fetch the next page once the user nears the end of what is loaded.
+            if float(last) > 0.9 and self.pager and not self.pager.exhausted and not self._page_pending:
+                self._page_pending = True
+                pager, generation = self.pager, self._generation
+                self.controller.db.run(
+                    lambda _conn: pager.next_page(),
+                    on_done=lambda rows: self._append_rows(generation, rows),
+                    on_error=lambda error: self._load_failed(generation, error),
+                    group="IncomeExpenseFrame",
+                    interruptible=True,
+                )
+
+        def _show_error(self, msg):
+            error_frame = ctk.CTkFrame(self)
+            error_frame.place(relx=0.5, rely=0.5, anchor="center")
+            ctk.CTkLabel(error_frame, text=msg, text_color="#f87171").pack(padx=20, pady=10)
+            error_frame.after(3000, error_frame.destroy)
+
+    class CustomersFrame(ctk.CTkFrame):
+        def __init__(self, parent, controller):
+            super().__init__(parent)
+            self.controller = controller
+            self.grid_columnconfigure(0, weight=1)
+            self.grid_rowconfigure(1, weight=1)
+
+            # Form Frame
+            form_frame = ctk.CTkFrame(self, fg_color="#2d3748", corner_radius=12)
+            form_frame.grid(row=0, column=0, sticky="ew", padx=0, pady=(0, 16))
+            form_frame.grid_columnconfigure(1, weight=1)
+
+            ctk.CTkLabel(form_frame, text="Müşteri Adı", font=ctk.CTkFont(size=12, weight="bold")).grid(
+                row=0, column=0, padx=12, pady=(12, 4), sticky="w"
+            )
+            self.name_entry = ctk.CTkEntry(form_frame, placeholder_text="Örn: Şirket Adı")
+            self.name_entry.grid(row=0, column=1, padx=12, pady=(12, 4), sticky="ew")
+
+            ctk.CTkLabel(form_frame, text="İletişim", font=ctk.CTkFont(size=12, weight="bold")).grid(
+                row=1, column=0, padx=12, pady=4, sticky="w"
+            )
+            self.contact_entry = ctk.CTkEntry(form_frame, placeholder_text="Örn: +90 555 123 4567 / email")
+            self.contact_entry.grid(row=1, column=1, padx=12, pady=4, sticky="ew")
+
+            ctk.CTkLabel(form_frame, text="Notlar", font=ctk.CTkFont(size=12, weight="bold")).grid(
+                row=2, column=0, padx=12, pady=4, sticky="w"
+            )
+            self.notes_entry = ctk.CTkEntry(form_frame, placeholder_text="Ek bilgiler")
+            self.notes_entry.grid(row=2, column=1, padx=12, pady=4, sticky="ew")
+
+            btn_add = ctk.CTkButton(
+                form_frame, text="Ekle", command=self.add_customer, height=36, fg_color="#10b981"
+            )
+            btn_add.grid(row=3, column=0, columnspan=2, padx=12, pady=12, sticky="ew")
+
+            # Table Frame
+            table_frame = ctk.CTkFrame(self, fg_color="#2d3748", corner_radius=12)
+            table_frame.grid(row=1, column=0, sticky="nsew", padx=0, pady=0)
+            table_frame.grid_rowconfigure(1, weight=1)
+            table_frame.grid_columnconfigure(0, weight=1)
+
+            ctk.CTkLabel(
+                table_frame, text="Müşteri Listesi", font=ctk.CTkFont(size=14, weight="bold")
+            ).grid(row=0, column=0, padx=12, pady=(12, 8), sticky="w")
+            search_bar, self.search_entry = _search_bar(
+                table_frame, self.refresh_table, "Ad, iletişim veya notlarda ara…"
+            )
+            search_bar.grid(row=0, column=0, columnspan=2, padx=12, pady=(12, 8), sticky="e")
+
+            from tkinter import ttk
+
+            controller.tree_style()
+
+            self.tree = ttk.Treeview(
+                table_frame,
+                columns=("id", "name", "contact", "notes", "balance", "overdue"),
+                height=12,
+                show="headings",
+                selectmode="extended",
+            )
+            self.tree.column("id", width=40, anchor="center")
+            self.tree.column("name", width=150, anchor="w")
+            self.tree.column("contact", width=180, anchor="w")
+            self.tree.column("notes", width=240, anchor="w")
+            self.tree.column("balance", width=120, anchor="e")
+            self.tree.column("overdue", width=120, anchor="e")
+
+            self.tree.heading("id", text="ID")
+            self.tree.heading("name", text="Müşteri Adı")
+            self.tree.heading("contact", text="İletişim")
+            self.tree.heading("notes", text="Notlar")
+            self.tree.heading("balance", text="Bakiye (₺)")
+            self.tree.heading("overdue", text="30+ gün (₺)")
+
+            self.scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
+            self.tree.configure(yscroll=self._on_tree_scroll)
+            self.tree.bind("<Delete>", lambda _event: self.delete_customer())
+            self.tree.bind("<Double-1>", lambda _event: self.open_statement())
+
+            self.tree.grid(row=1, column=0, sticky="nsew", padx=12, pady=(0, 12))
+            self.scrollbar.grid(row=1, column=1, sticky="nse", padx=(0, 12), pady=(0, 12))
+
+            self.pager = None
+            self._page_pending = False
+            self._generation = 0
+
+            btn_delete = ctk.CTkButton(
+                table_frame,
+                text="Sil",
+                command=self.delete_customer,
+                height=32,
+                fg_color="#ef4444",
+                width=100,
+            )
+            btn_delete.grid(row=2, column=0, padx=12, pady=(0, 12), sticky="e")
+            btn_edit = ctk.CTkButton(
+                table_frame, text="Düzenle", command=self.edit_customers, height=32, fg_color="#4b5563", width=100
+            )
+            btn_edit.grid(row=2, column=0, padx=(12, 124), pady=(0, 12), sticky="e")
+            btn_statement = ctk.CTkButton(
+                table_frame, text="Hesap Ekstresi", command=self.open_statement, height=32, width=120
+            )
+            btn_statement.grid(row=2, column=0, padx=(12, 236), pady=(0, 12), sticky="e")
+
+        def add_customer(self):
+            try:
+                name = self.name_entry.get()
+                contact = self.contact_entry.get()
+                notes = self.notes_entry.get()
+
+                if not name:
+                    raise ValueError("Müşteri adı boş olamaz")
+            except ValueError as e:
+                self._show_error(f"Hata: {e}")
+                return
+
+            self.controller.db.run(
+                lambda conn: CustomerRepository(conn).add(name, contact, notes),
+                on_done=self._after_add,
+                on_error=lambda e: self._show_error(f"Hata: {e}"),
+            )
+
+        def _after_add(self, _customer_id):
+            self.name_entry.delete(0, "end")
+            self.contact_entry.delete(0, "end")
+            self.notes_entry.delete(0, "end")
+            self.refresh_table()
+
+        def delete_customer(self):
+            selection = self.tree.selection()
+            if not selection:
+                self._show_error("Silmek için kayıt seçiniz")
+                return
+
+            ids = [int(item) for item in selection]
+            self.controller.db.run(
+                lambda conn: CustomerRepository(conn).delete_many(ids),
+                on_done=lambda count: self._remove_rows(selection, count),
+                on_error=lambda e: self._show_error(f"Hata: {e}"),
+            )
+
+        def _remove_rows(self, items, count):
+            self.tree.delete(*(item for item in items if self.tree.exists(item)))
+            self.controller.set_status(f"{count:,} müşteri silindi")
+
+        def edit_customers(self):
+            selection = self.tree.selection()
+            if not selection:
+                self._show_error("Düzenlemek için kayıt seçiniz")
+                return
+            fields = [("contact", "İletişim", None), ("notes", "Notlar", None)]
+            if len(selection) == 1:
+                # Names are unique, so they are only edited one customer at a time.
+                fields.insert(0, ("name", "Müşteri Adı", None))
+            BulkEditDialog(
+                self, f"{len(selection):,} müşteriyi düzenle", fields,
+                lambda values: self._apply_edit(selection, values),
+            )
+
+        def _apply_edit(self, items, values):
+            ids = [int(item) for item in items]
+            self.controller.db.run(
+                lambda conn: CustomerRepository(conn).update_many(ids, **values),
+                on_done=lambda count: self._show_edited(items, values, count),
+                on_error=lambda e: self._show_error(f"Hata: {e}"),
+            )
+
+        def _show_edited(self, items, values, count):
+            # Edited columns share their names with the fields.
+            for item in items:
+                if self.tree.exists(item):
+                    for column, value in values.items():
+                        self.tree.set(item, column, value)
+            self.controller.set_status(f"{count:,} müşteri düzenlendi")
+
+        def refresh_table(self):
+            self._generation += 1
+            self._page_pending = True
+            generation = self._generation
+            self.controller.db.run(
+                _open_customers,
+                self.search_entry.get(),
+                on_done=lambda result: self._show_first_page(generation, *result),
+                on_error=lambda error: self._load_failed(generation, error),
+                key="customers.refresh",
+                group="CustomersFrame",
+                interruptible=True,
+            )
+
+        def _load_failed(self, generation, error):
+            if generation != self._generation:
+                return
+            self._page_pending = False
+            self._show_error(f"Hata: {error}")
+
+        def _show_first_page(self, generation, pager, rows):
+            if generation != self._generation:
+                return
+            self.pager = pager
+            self.tree.delete(*self.tree.get_children())
+            self.tree.yview_moveto(0)
+            self._append_rows(generation, rows)
+
+        def _append_rows(self, generation, rows):
+            if generation != self._generation:
+                return
+            self._page_pending = False
+            for *row, (debit, credit, aging) in rows:
+                values = (*row, format_amount(debit - credit), format_amount(sum(aging[1:])))
+                # A renamed customer can come round again in a later page.
+                if self.tree.exists(row[0]):
+                    self.tree.item(row[0], values=values)
+                else:
+                    self.tree.insert("", "end", iid=row[0], values=values)
+
+        def _on_tree_scroll(self, first, last):
+            self.scrollbar.set(first, last)
+            # Fetch the next page once the user nears the end of what is loaded.
+            if float(last) > 0.9 and self.pager and not self.pager.exhausted and not self._page_pending:
+                self._page_pending = True
+                pager, generation = self.pager, self._generation
+                self.controller.db.run(
+                    _customer_page,
+                    pager,
+                    on_done=lambda rows: self._append_rows(generation, rows),
+                    on_error=lambda error: self._load_failed(generation, error),
+                    group="CustomersFrame",
+                    interruptible=True,
+                )
+
+        def open_statement(self):
+            selection = self.tree.selection()
+            if len(selection) != 1:
+                self._show_error("Ekstre için bir müşteri seçiniz")
+                return
+            item = selection[0]
+            StatementWindow(
+                self, self.controller.db, int(item), self.tree.set(item, "name"), on_change=self.refresh_table
+            )
+
+        def _show_error(self, msg):
+            error_frame = ctk.CTkFrame(self)
+            error_frame.place(relx=0.5, rely=0.5, anchor="center")
+            ctk.CTkLabel(error_frame, text=msg, text_color="#f87171").pack(padx=20, pady=10)
+            error_frame.after(3000, error_frame.destroy)
+
+    class RecurringFrame(ctk.CTkFrame):
+        def __init__(self, parent, controller):
+            super().__init__(parent)
+            self.controller = controller
+            self.grid_columnconfigure(0, weight=1)
+            self.grid_rowconfigure(0, weight=1)
+
+            table_frame = ctk.CTkFrame(self, fg_color="#2d3748", corner_radius=12)
+            table_frame.grid(row=0, column=0, sticky="nsew")
+            table_frame.grid_rowconfigure(1, weight=1)
+            table_frame.grid_columnconfigure(0, weight=1)
+
+            ctk.CTkLabel(
+                table_frame, text="Tekrarlayan Kayıtlar", font=ctk.CTkFont(size=14, weight="bold")
+            ).grid(row=0, column=0, padx=12, pady=(12, 8), sticky="w")
+            ctk.CTkLabel(
+                table_frame, text="Yeni kural Gelir/Gider sayfasındaki Tekrar seçeneğiyle eklenir.",
+                text_color="#9ca3af",
+            ).grid(row=0, column=0, columnspan=2, padx=12, pady=(12, 8), sticky="e")
+
+            from tkinter import ttk
+
+            controller.tree_style()
+
+            columns = {
+                "id": ("ID", 40, "center"),
+                "desc": ("Açıklama", 220, "w"),
+                "type": ("Tür", 70, "center"),
+                "amount": ("Tutar (₺)", 110, "e"),
+                "customer": ("Müşteri", 140, "w"),
+                "every": ("Sıklık", 110, "center"),
+                "next": ("Sonraki", 100, "center"),
+                "end": ("Bitiş", 100, "center"),
+                "status": ("Durum", 90, "center"),
+            }
+            self.tree = ttk.Treeview(table_frame, columns=tuple(columns), height=12, show="headings")
+            for column, (heading, width, anchor) in columns.items():
+                self.tree.column(column, width=width, anchor=anchor)
+                self.tree.heading(column, text=heading)
+
+            scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
+            self.tree.configure(yscroll=scrollbar.set)
+            self.tree.bind("<Delete>", lambda _event: self.delete_rule())
+
+            self.tree.grid(row=1, column=0, sticky="nsew", padx=12, pady=(0, 12))
+            scrollbar.grid(row=1, column=1, sticky="nse", padx=(0, 12), pady=(0, 12))
+
+            button_bar = ctk.CTkFrame(table_frame, fg_color="transparent")
+            button_bar.grid(row=2, column=0, columnspan=2, padx=12, pady=(0, 12), sticky="e")
+            ctk.CTkButton(
+                button_bar,
+                text="Şimdi Çalıştır",
+                command=lambda: controller.materialize_recurring(announce=True),
+                height=32,
+                width=120,
+            ).pack(side="left", padx=(0, 8))
+            ctk.CTkButton(
+                button_bar, text="Durdur / Devam", command=self.toggle_rule, height=32, fg_color="#4b5563",
+                width=120,
+            ).pack(side="left", padx=(0, 8))
+            ctk.CTkButton(
+                button_bar, text="Sil", command=self.delete_rule, height=32, fg_color="#ef4444", width=100
+            ).pack(side="left")
+
+        def _selected(self):
+            selection = self.tree.selection()
+            if not selection:
+                self._show_error("Önce bir kural seçiniz")
+                return None
+            return int(selection[0])
+
+        def toggle_rule(self):
+            rule_id = self._selected()
+            if rule_id is None:
+                return
+            resume = self.tree.set(str(rule_id), "status") == "Durduruldu"
+            self.controller.db.run(
+                lambda conn: RecurringRepository(conn).set_active(rule_id, resume),
+                on_done=lambda _: self.refresh_table(),
+                on_error=lambda e: self._show_error(f"Hata: {e}"),
+            )
+
+        def delete_rule(self):
+            rule_id = self._selected()
+            if rule_id is None:
+                return
+            self.controller.db.run(
+                lambda conn: RecurringRepository(conn).delete(rule_id),
+                on_done=lambda _: self._after_delete(rule_id),
+                on_error=lambda e: self._show_error(f"Hata: {e}"),
+            )
+
+        def _after_delete(self, rule_id):
+            if self.tree.exists(str(rule_id)):
+                self.tree.delete(str(rule_id))
+            # Entries already written stay in the ledger.
+            self.controller.set_status("Tekrarlayan kural silindi")
+
+        def refresh_table(self):
+            self.controller.db.run(
+                lambda conn: RecurringRepository(conn).all(),
+                on_done=self._show_rows,
+                on_error=lambda e: self._show_error(f"Hata: {e}"),
+                key="recurring.refresh",
+                group="RecurringFrame",
+            )
+
+        def _show_rows(self, rows):
+            self.tree.delete(*self.tree.get_children())
+            for row in rows:
+                self.tree.insert("", "end", iid=row[0], values=_rule_values(row))
+
+        def _show_error(self, msg):
+            error_frame = ctk.CTkFrame(self)
+            error_frame.place(relx=0.5, rely=0.5, anchor="center")
+            ctk.CTkLabel(error_frame, text=msg, text_color="#f87171").pack(padx=20, pady=10)
+            error_frame.after(3000, error_frame.destroy)
+
+    class SettingsFrame(ctk.CTkFrame):
+        def __init__(self, parent, controller):
+            super().__init__(parent)
+            self.controller = controller
+            self.grid_columnconfigure(0, weight=1)
+            self.grid_rowconfigure(0, weight=1)
+
+            settings_frame = ctk.CTkFrame(self, fg_color="#2d3748", corner_radius=12)
+            settings_frame.pack(padx=20, pady=20, fill="both", expand=True)
+
+            ctk.CTkLabel(
+                settings_frame,
+                text="⚙️ Uygulamaya Ait Bilgiler",
+                font=ctk.CTkFont(size=18, weight="bold"),
+            ).pack(pady=(20, 10))
+
+            info_text = """
+            MasterAccount - Masaüstü Muhasebe Uygulaması
+            
+            Sürüm: 1.0.0
+            Python ile geliştirilmiştir.
+            
+            Özellikler:
+            • Dashboard: Anlık gelir, gider ve bakiye gösterme
+            • Gelir/Gider: Kayıt ekleme, listeleme ve silme
+            • Müşteriler: Müşteri bilgilerini yönetme
+            • Yerel Veritabanı: Veriler lokal olarak güvenli şekilde saklanır
+            
+            Veritabanı Dosyası:
+            data.db (uygulama dizininde)
+            
+            © 2026 - Tüm Hakları Saklıdır
+            """
+
+            ctk.CTkLabel(
+                settings_frame, text=info_text, justify="left", font=ctk.CTkFont(size=12)
+            ).pack(padx=20, pady=20, anchor="nw")
+
+            # Snapshots are full copies taken with SQLite's backup API.
+            snapshot_bar = ctk.CTkFrame(settings_frame, fg_color="transparent")
+            snapshot_bar.pack(padx=20, pady=(0, 0), fill="x")
+            ctk.CTkLabel(snapshot_bar, text="Anlık Görüntüler", font=ctk.CTkFont(size=12, weight="bold")).pack(
+                side="left", padx=(0, 12)
+            )
+            self.var_snapshot = ctk.StringVar(value="")
+            self.snapshot_menu = ctk.CTkOptionMenu(snapshot_bar, values=[""], variable=self.var_snapshot, width=300)
+            self.snapshot_menu.pack(side="left", padx=(0, 6))
+            ctk.CTkButton(snapshot_bar, text="Geri Yükle", command=self.restore_snapshot, width=100).pack(
+                side="left", padx=(0, 6)
+            )
+            ctk.CTkButton(snapshot_bar, text="Anlık Görüntü Al", command=self.take_snapshot, width=130).pack(
+                side="left"
+            )
+            self._snapshots = {}
+
+            # Compressed, optionally encrypted backups; see backup.py.
+            self._backups = {}
+            if controller.backups is not None:
+                backup_bar = ctk.CTkFrame(settings_frame, fg_color="transparent")
+                backup_bar.pack(padx=20, pady=(16, 0), fill="x")
+                ctk.CTkLabel(backup_bar, text="Yedekler", font=ctk.CTkFont(size=12, weight="bold")).pack(
+                    side="left", padx=(0, 12)
+                )
+                self.var_backup = ctk.StringVar(value="")
+                self.backup_menu = ctk.CTkOptionMenu(backup_bar, values=[""], variable=self.var_backup, width=300)
+                self.backup_menu.pack(side="left", padx=(0, 6))
+                for text, command in (
+                    ("Geri Yükle", self.restore_backup),
+                    ("Doğrula", self.verify_backup),
+                    ("Şimdi Yedekle", lambda: self.create_backup(full=False)),
+                    ("Tam Yedek", lambda: self.create_backup(full=True)),
+                ):
+                    ctk.CTkButton(backup_bar, text=text, command=command, width=100).pack(side="left", padx=(0, 6))
+
+                backup_options = ctk.CTkFrame(settings_frame, fg_color="transparent")
+                backup_options.pack(padx=20, pady=(6, 0), fill="x")
+                self.var_auto_backup = ctk.BooleanVar(value=controller.auto_backup)
+                ctk.CTkSwitch(
+                    backup_options, text="Otomatik (6 saatte bir)", variable=self.var_auto_backup,
+                    command=self.toggle_auto_backup,
+                ).pack(side="left", padx=(0, 12))
+                ctk.CTkLabel(backup_options, text="Şifre:").pack(side="left", padx=(0, 6))
+                self.var_backup_password = ctk.StringVar(value=controller.backup_password or "")
+                self.var_backup_password.trace_add("write", lambda *_: self._set_backup_password())
+                ctk.CTkEntry(backup_options, textvariable=self.var_backup_password, show="•", width=180).pack(
+                    side="left", padx=(0, 6)
+                )
+                ctk.CTkLabel(
+                    backup_options, text="boş bırakılırsa şifrelenmez; şifre kaydedilmez", text_color="#9ca3af"
+                ).pack(side="left")
+
+            # Query and UI timings; see profiling.py.
+            profile_bar = ctk.CTkFrame(settings_frame, fg_color="transparent")
+            profile_bar.pack(padx=20, pady=(16, 6), fill="x")
+            ctk.CTkLabel(profile_bar, text="Performans Ölçümü", font=ctk.CTkFont(size=12, weight="bold")).pack(
+                side="left", padx=(0, 12)
+            )
+            self.var_profiling = ctk.BooleanVar(value=controller.profiler.enabled)
+            ctk.CTkSwitch(
+                profile_bar, text="Açık", variable=self.var_profiling, command=self.toggle_profiling
+            ).pack(side="left", padx=(0, 12))
+            for text, command in (
+                ("Raporu Yenile", self.refresh_profile),
+                ("Sıfırla", self.reset_profile),
+                ("Dosyaya Kaydet", self.save_profile),
+            ):
+                ctk.CTkButton(profile_bar, text=text, command=command, width=110, fg_color="#4b5563").pack(
+                    side="left", padx=(0, 6)
+                )
+            self.profile_text = ctk.CTkTextbox(
+                settings_frame, height=180, wrap="none", font=ctk.CTkFont(family="Courier", size=11)
+            )
+            self.profile_text.pack(padx=20, pady=(0, 0), fill="both", expand=True)
+
+            btn_reset = ctk.CTkButton(
+                settings_frame,
+                text="🗑️ Tüm Verileri Sil (Dikkat!)",
+                command=self.reset_database,
+                fg_color="#ef4444",
+                height=40,
+            )
+            btn_reset.pack(padx=20, pady=(20, 20), fill="x")
+
+        def refresh_snapshots(self):
+            self.controller.db.run(
+                list_snapshots,
+                on_done=self._show_snapshots,
+                key="settings.snapshots",
+                group="SettingsFrame",
+            )
+
+        def _show_snapshots(self, paths):
+            self._snapshots = {path.name: path for path in paths}
+            names = list(self._snapshots) or [""]
+            self.snapshot_menu.configure(values=names)
+            self.var_snapshot.set(names[0])
+
+        def take_snapshot(self):
+            self.controller.db.run(
+                take_snapshot,
+                on_done=self._after_snapshot,
+                on_error=lambda e: self._show_error(f"Hata: {e}"),
+            )
+
+        def _after_snapshot(self, path):
+            self._show_message(f"Anlık görüntü alındı: {path.name}")
+            self.refresh_snapshots()
+
+        def restore_snapshot(self):
+            path = self._snapshots.get(self.var_snapshot.get())
+            if path is None:
+                self._show_error("Geri yüklenecek anlık görüntü yok")
+                return
+            self.controller.db.run(
+                restore_as_action,
+                path,
+                on_done=lambda _: self._after_restore(path.name),
+                on_error=lambda e: self._show_error(f"Hata: {e}"),
+            )
+
+        def _after_restore(self, name):
+            self._show_message(f"Geri yüklendi: {name}")
+            self.controller.set_status(f"Anlık görüntü geri yüklendi: {name} — Geri Al ile geri alınabilir")
+            self.refresh_snapshots()
+            self.controller.refresh_page()
+
+        def refresh_backups(self):
+            if self.controller.backups is None:
+                return
+            self.controller.backups.run(
+                _load_backups,
+                on_done=self._show_backups,
+                key="settings.backups",
+                group="SettingsFrame",
+            )
+
+        def _show_backups(self, rows):
+            self._backups = dict(rows)
+            labels = list(self._backups) or [""]
+            self.backup_menu.configure(values=labels)
+            self.var_backup.set(labels[0])
+
+        def create_backup(self, full):
+            self.controller.backup_now(full, on_done=lambda _path: self.refresh_backups())
+
+        def _selected_backup(self):
+            path = self._backups.get(self.var_backup.get())
+            if path is None:
+                self._show_error("Yedek yok")
+            return path
+
+        def verify_backup(self):
+            path = self._selected_backup()
+            if path is None:
+                return
+            password = self.controller.backup_password
+            self.controller.backups.run(
+                lambda _conn: verify_backup(path, password),
+                on_done=lambda _header: self._show_message("Yedek sağlam"),
+                on_error=lambda e: self._show_error(f"Hata: {e}"),
+            )
+
+        def restore_backup(self):
+            path = self._selected_backup()
+            if path is None:
+                return
+            password = self.controller.backup_password
+            # Rebuilt and checked on the backup worker; only the final copy holds up the main one.
+            self.controller.backups.run(
+                lambda _conn: prepare_restore(path, password),
+                on_done=lambda rebuilt: self._apply_restore(path, rebuilt),
+                on_error=lambda e: self._show_error(f"Hata: {e}"),
+            )
+            self.controller.set_status(f"Yedek hazırlanıyor: {path.name}")
+
+        def _apply_restore(self, path, rebuilt):
+            self.controller.db.run(
+                apply_restore,
+                path,
+                rebuilt,
+                on_done=lambda _: self._after_backup_restore(path.name),
+                on_error=lambda e: self._show_error(f"Hata: {e}"),
+            )
+
+        def _after_backup_restore(self, name):
+            self._show_message(f"Geri yüklendi: {name}")
+            self.controller.set_status(f"Yedek geri yüklendi: {name} — Geri Al ile geri alınabilir")
+
+        def toggle_auto_backup(self):
+            self.controller.auto_backup = self.var_auto_backup.get()
+
+        def _set_backup_password(self):
+            self.controller.backup_password = self.var_backup_password.get() or None
+
+        def toggle_profiling(self):
+            self.controller.profiler.enabled = self.var_profiling.get()
+            self.controller.set_status(
+                "Performans ölçümü açık" if self.controller.profiler.enabled else "Performans ölçümü kapalı"
+            )
+
+        def refresh_profile(self):
+            # Plans of slow queries are read on the worker's connection.
+            self.controller.db.run(
+                self.controller.profiler.snapshot,
+                on_done=self._show_profile,
+                key="settings.profile",
+                group="SettingsFrame",
+            )
+
+        def _show_profile(self, snapshot):
+            self.profile_text.configure(state="normal")
+            self.profile_text.delete("1.0", "end")
+            self.profile_text.insert("1.0", format_report(snapshot))
+            self.profile_text.configure(state="disabled")
+
+        def reset_profile(self):
+            self.controller.db.run(
+                lambda _conn: self.controller.profiler.reset(),
+                on_done=lambda _: self.refresh_profile(),
+            )
+
+        def save_profile(self):
+            self.controller.db.run(
+                _dump_profile,
+                self.controller.profiler,
+                on_done=lambda path: self._show_message(f"Rapor kaydedildi: {path.name}"),
+                on_error=lambda e: self._show_error(f"Hata: {e}"),
+            )
+
+        def reset_database(self):
+            self.controller.db.run(
+                reset_database,
+                on_done=self._after_reset,
+                on_error=lambda e: self._show_error(f"Hata: {e}"),
+            )
+
+        def _after_reset(self, _result):
+            self._show_message("Veritabanı sıfırlandı")
+            self.controller.set_status("Tüm veriler silindi — Geri Al ile geri alınabilir")
+            self.controller.show_dashboard()
+
+        def _show_error(self, msg):
+            error_frame = ctk.CTkFrame(self)
+            error_frame.place(relx=0.5, rely=0.5, anchor="center")
+            ctk.CTkLabel(error_frame, text=msg, text_color="#f87171").pack(padx=20, pady=10)
+            error_frame.after(3000, error_frame.destroy)
+
+        def _show_message(self, msg):
+            msg_frame = ctk.CTkFrame(self)
+            msg_frame.place(relx=0.5, rely=0.5, anchor="center")
+            ctk.CTkLabel(msg_frame, text=msg, text_color="#4ade80").pack(padx=20, pady=10)
+            msg_frame.after(3000, msg_frame.destroy)
@@ -0,0 +1,489 @@
+"""Compressed, optionally encrypted, incremental backups of a database.
+
+A backup first copies the database with SQLite's online backup API, so it is
+consistent while the app keeps writing (in WAL mode writers are not blocked).
+The copy is then read page by page: a full backup stores every page, an
+incremental one only the pages whose hash differs from the previous backup
+in the chain, so backing up a large ledger after a day's work writes a few
+megabytes. Pages are streamed through zlib and, with a password, AES-GCM in
+frames of about a megabyte; memory use does not grow with the database.
+
+Archives live in ``<stem>-backups`` next to the database. Each one starts
+with a plain JSON header (kind, base archive, page size and count) and ends
+with a digest of every page of the database it restores to; restoring
+rebuilds the chain into a temporary file, checks that digest and SQLite's
+quick_check, and only then copies the result over the live database. The
+page hashes of the latest backup are kept in a ``.pages`` file beside it,
+for the next incremental to compare against.
+
+What an incremental backup saves is writing, compressing and encrypting
+unchanged pages, and the disk space they would take; finding them still
+reads the whole database. SQLite does not record which pages changed (and
+the ``sqlite_dbpage`` table is not in Python's build), and the file cannot
+be read directly while the app writes to it in WAL mode, so every backup
+copies the database and hashes each page. An incremental took 0.7 s for a
+1M-row (280 MB) ledger and 13 s for a 10M-row (2.9 GB) one, against 2.8 s
+and 46 s for a full backup. It runs on a thread and connection of its own,
+so the app is never held up; ``bench.py backup`` measures it per size.
+
+Encryption needs the optional ``cryptography`` package.
+"""
+
+import hashlib
+import json
+import os
+import secrets
+import sqlite3
+import struct
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+try:
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:  # Only needed for encrypted backups.
+    AESGCM = InvalidTag = None
+
+from journal import restore_as_action
+
+
+# Incrementals after a full backup before the next one is full again.
+MAX_CHAIN = 20
+# Chains (a full backup and its incrementals) kept; older ones are deleted.
+KEEP_CHAINS = 3
+COMPRESS_LEVEL = 3
+FRAME_BYTES = 1 << 20
+# Pages hashed per read of the database copy.
+_READ_PAGES = 256
+
+_MAGIC = b"MABK1\n"
+_FRAME = struct.Struct(">IB")
+_PAGE_NO = struct.Struct(">I")
+_HASH_BYTES = 16
+_SCRYPT = {"n": 2**15, "r": 8, "p": 1, "maxmem": 64 * 1024 * 1024}
+
+
+class BackupError(ValueError):
+    """A backup that cannot be read, restored or verified."""
+
+
+def backup_dir(conn):
+    path = conn.execute("PRAGMA database_list").fetchone()[2]
+    if not path:
+        raise ValueError("bellekteki veritabanı yedeklenemez")
+    path = Path(path)
+    return path.with_name(f"{path.stem}-backups")
+
+
+def open_source(path):
+    """A plain connection to back up ``path`` from a thread of its own."""
+    return sqlite3.connect(path, timeout=30)
+
+
+def list_backups(folder):
+    """Archives in ``folder``, newest first."""
+    folder = Path(folder)
+    return sorted(folder.glob("*.mab"), reverse=True) if folder.is_dir() else []
+
+
+def read_header(path):
+    """The plain header of an archive (readable without the password)."""
+    with open(path, "rb") as f:
+        return _read_header(f, path)[0]
+
+
+def _read_header(f, path):
+    if f.read(len(_MAGIC)) != _MAGIC:
+        raise BackupError(f"yedek dosyası değil: {Path(path).name}")
+    line = f.readline()
+    try:
+        return json.loads(line), _MAGIC + line
+    except ValueError:
+        raise BackupError(f"yedek başlığı okunamadı: {Path(path).name}") from None
+
+
+class _Keys:
+    """Keys derived from the password and the chain's salt."""
+
+    def __init__(self, password, salt):
+        if AESGCM is None:
+            raise BackupError("şifreli yedek için 'cryptography' paketi gerekli: pip install cryptography")
+        master = hashlib.scrypt(password.encode("utf-8"), salt=salt, dklen=64, **_SCRYPT)
+        self._cipher_key = master[:32]
+        # Page hashes are keyed too, so they say nothing about an encrypted backup's contents.
+        self.hash_key = master[32:]
+        self.check = hashlib.blake2b(b"check", key=self.hash_key, digest_size=16).hexdigest()
+
+    def cipher(self, nonce):
+        return AESGCM(hashlib.blake2b(nonce, key=self._cipher_key, digest_size=32).digest())
+
+
+def _page_hasher(keys):
+    key = keys.hash_key if keys else b""
+
+    def page_hash(page):
+        return hashlib.blake2b(page, digest_size=_HASH_BYTES, key=key).digest()
+
+    return page_hash
+
+
+class _FrameWriter:
+    """Compresses (and encrypts) a byte stream into length-prefixed frames."""
+
+    def __init__(self, f, header, cipher=None):
+        self.f = f
+        self.header = header
+        self.cipher = cipher
+        self.index = 0
+        self.compress = zlib.compressobj(COMPRESS_LEVEL)
+        self.pending = []
+        self.size = 0
+
+    def write(self, data):
+        out = self.compress.compress(data)
+        if out:
+            self.pending.append(out)
+            self.size += len(out)
+            if self.size >= FRAME_BYTES:
+                self._frame(b"".join(self.pending), final=False)
+
+    def close(self):
+        self.pending.append(self.compress.flush())
+        self._frame(b"".join(self.pending), final=True)
+
+    def _frame(self, data, final):
+        if self.cipher is not None:
+            # The header, frame number and final flag are authenticated, so frames cannot be reordered or cut off.
+            nonce = self.index.to_bytes(12, "big")
+            data = self.cipher.encrypt(nonce, data, self.header + _FRAME.pack(self.index, final))
+        self.f.write(_FRAME.pack(len(data), final))
+        self.f.write(data)
+        self.index += 1
+        self.pending, self.size = [], 0
+
+
+class _FrameReader:
+    """Reads back what :class:`_FrameWriter` wrote; :meth:`read` returns exactly ``n`` bytes."""
+
+    def __init__(self, f, header, cipher=None):
+        self.f = f
+        self.header = header
+        self.cipher = cipher
+        self.index = 0
+        self.done = False
+        self.decompress = zlib.decompressobj()
+        self.buffer = bytearray()
+        self.offset = 0
+
+    def read(self, n):
+        while len(self.buffer) - self.offset < n:
+            if self.done:
+                raise BackupError("yedek dosyası eksik veya bozuk")
+            self._next_frame()
+        data = bytes(self.buffer[self.offset:self.offset + n])
+        self.offset += n
+        if self.offset > FRAME_BYTES:
+            del self.buffer[:self.offset]
+            self.offset = 0
+        return data
+
+    def _next_frame(self):
+        prefix = self.f.read(_FRAME.size)
+        if len(prefix) < _FRAME.size:
+            raise BackupError("yedek dosyası eksik (son bölüm bulunamadı)")
+        length, final = _FRAME.unpack(prefix)
+        data = self.f.read(length)
+        if len(data) < length:
+            raise BackupError("yedek dosyası eksik")
+        if self.cipher is not None:
+            try:
+                data = self.cipher.decrypt(
+                    self.index.to_bytes(12, "big"), data, self.header + _FRAME.pack(self.index, final)
+                )
+            except InvalidTag:
+                raise BackupError("şifre yanlış veya yedek dosyası bozuk") from None
+        try:
+            self.buffer += self.decompress.decompress(data)
+        except zlib.error:
+            raise BackupError("yedek dosyası bozuk") from None
+        self.index += 1
+        self.done = bool(final)
+
+    def rest(self):
+        """Everything left in the stream."""
+        while not self.done:
+            self._next_frame()
+        data = bytes(self.buffer[self.offset:])
+        self.buffer, self.offset = bytearray(), 0
+        return data
+
+
+def _iter_pages(path, page_size):
+    with open(path, "rb") as f:
+        number = 1
+        while True:
+            chunk = f.read(page_size * _READ_PAGES)
+            if not chunk:
+                return
+            for offset in range(0, len(chunk), page_size):
+                yield number, chunk[offset:offset + page_size]
+                number += 1
+
+
+def _digest(hashes):
+    return hashlib.blake2b(hashes, digest_size=32).hexdigest()
+
+
+def _sidecar(archive):
+    return archive.with_suffix(".pages")
+
+
+def _read_sidecar(archive):
+    """``(header, hashes)`` stored for ``archive``, or None if it has none."""
+    path = _sidecar(archive)
+    if not path.is_file():
+        return None
+    with open(path, "rb") as f:
+        header = json.loads(f.readline())
+        hashes = f.read()
+    if len(hashes) != header["page_count"] * _HASH_BYTES:
+        return None
+    return header, hashes
+
+
+def _write_atomic(path, write):
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def _copy_database(conn, path):
+    target = sqlite3.connect(path)
+    try:
+        conn.backup(target)
+        # The copy inherits WAL mode; a rollback journal keeps it one file, page for page.
+        target.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        target.close()
+
+
+def _previous(folder, password):
+    """``(archive, header, sidecar header, hashes, keys)`` to continue the latest chain from, or None."""
+    archives = list_backups(folder)
+    if not archives:
+        return None
+    latest = archives[0]
+    sidecar = _read_sidecar(latest)
+    if sidecar is None:
+        return None
+    header = read_header(latest)
+    if header["chain_length"] >= MAX_CHAIN or header["encrypted"] != (password is not None):
+        return None
+    keys = _Keys(password, bytes.fromhex(header["salt"])) if password is not None else None
+    if keys is not None and sidecar[0].get("key_check") != keys.check:
+        # Another password starts a new chain.
+        return None
+    return latest, header, sidecar[0], sidecar[1], keys
+
+
+def _prune(folder):
+    fulls = [path for path in list_backups(folder) if read_header(path)["kind"] == "full"]
+    if len(fulls) <= KEEP_CHAINS:
+        return
+    oldest_kept = fulls[KEEP_CHAINS - 1].name
+    for path in list_backups(folder):
+        if path.name < oldest_kept:
+            path.unlink()
+            _sidecar(path).unlink(missing_ok=True)
+
+
+def create_backup(conn, folder=None, incremental=True, password=None):
+    """Back up the database behind ``conn``; returns the archive's path.
+
+    With ``incremental`` the backup continues the latest chain when it can
+    (same password, fewer than MAX_CHAIN links) and is full otherwise.
+    Call outside a write transaction: uncommitted changes are not included.
+    """
+    folder = Path(folder) if folder else backup_dir(conn)
+    folder.mkdir(parents=True, exist_ok=True)
+    # Left by a backup that was interrupted; a restore's files are not touched.
+    for pattern in ("kopya-*.tmp", "*.mab.tmp", "*.pages.tmp"):
+        for stale in folder.glob(pattern):
+            stale.unlink()
+    previous = _previous(folder, password) if incremental else None
+    copy = folder / f"kopya-{secrets.token_hex(4)}.db.tmp"
+    try:
+        _copy_database(conn, copy)
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        if previous is not None and previous[2]["page_size"] != page_size:
+            previous = None
+        if previous is None:
+            salt = secrets.token_bytes(16)
+            keys = _Keys(password, salt) if password is not None else None
+            old_hashes, base, length = b"", None, 0
+        else:
+            archive, header, _sidecar_header, old_hashes, keys = previous
+            salt, base, length = bytes.fromhex(header["salt"]), archive.name, header["chain_length"] + 1
+        page_count = copy.stat().st_size // page_size
+        created = datetime.now()
+        name = f"{created:%Y%m%d-%H%M%S-%f}-{'incr' if base else 'full'}.mab"
+        header = {
+            "kind": "incremental" if base else "full",
+            "base": base,
+            "chain_length": length,
+            "created": created.isoformat(timespec="seconds"),
+            "page_size": page_size,
+            "page_count": page_count,
+            "encrypted": keys is not None,
+            "salt": salt.hex(),
+            "nonce": secrets.token_hex(16),
+            "compression": "zlib",
+        }
+        header_bytes = _MAGIC + json.dumps(header).encode("utf-8") + b"\n"
+        cipher = keys.cipher(bytes.fromhex(header["nonce"])) if keys else None
+        page_hash = _page_hasher(keys)
+        hashes = bytearray()
+
+        def write_archive(f):
+            stored = 0
+            f.write(header_bytes)
+            out = _FrameWriter(f, header_bytes, cipher)
+            for number, page in _iter_pages(copy, page_size):
+                digest = page_hash(page)
+                hashes.extend(digest)
+                at = (number - 1) * _HASH_BYTES
+                if old_hashes[at:at + _HASH_BYTES] != digest:
+                    out.write(_PAGE_NO.pack(number))
+                    out.write(page)
+                    stored += 1
+            out.write(_PAGE_NO.pack(0))
+            out.write(json.dumps({"pages": stored, "digest": _digest(hashes)}).encode("utf-8"))
+            out.close()
+
+        path = folder / name
+        _write_atomic(path, write_archive)
+        sidecar = {"page_size": page_size, "page_count": page_count, "key_check": keys.check if keys else None}
+
+        def write_sidecar(f):
+            f.write(json.dumps(sidecar).encode("utf-8") + b"\n")
+            f.write(hashes)
+
+        _write_atomic(_sidecar(path), write_sidecar)
+    finally:
+        copy.unlink(missing_ok=True)
+    # Only the newest backup's hashes are needed for the next incremental.
+    for old in list_backups(folder)[1:]:
+        _sidecar(old).unlink(missing_ok=True)
+    _prune(folder)
+    return path
+
+
+def _chain(path):
+    """Archives from the full backup up to ``path``, oldest first."""
+    chain = [Path(path)]
+    while True:
+        header = read_header(chain[0])
+        if header["kind"] == "full":
+            return chain
+        base = chain[0].with_name(header["base"])
+        if not base.is_file():
+            raise BackupError(f"yedek zinciri eksik: {header['base']} bulunamadı")
+        chain.insert(0, base)
+
+
+def _apply(archive, f, password):
+    with open(archive, "rb") as src:
+        header, header_bytes = _read_header(src, archive)
+        keys = None
+        if header["encrypted"]:
+            if password is None:
+                raise BackupError("bu yedek şifreli; şifre gerekli")
+            keys = _Keys(password, bytes.fromhex(header["salt"]))
+        reader = _FrameReader(src, header_bytes, keys.cipher(bytes.fromhex(header["nonce"])) if keys else None)
+        page_size = header["page_size"]
+        while True:
+            number = _PAGE_NO.unpack(reader.read(_PAGE_NO.size))[0]
+            if number == 0:
+                break
+            f.seek((number - 1) * page_size)
+            f.write(reader.read(page_size))
+        trailer = json.loads(reader.rest())
+        f.truncate(header["page_count"] * page_size)
+    return header, keys, trailer
+
+
+def rebuild(path, target, password=None):
+    """Rebuild the database saved by archive ``path`` into the file ``target`` and verify it.
+
+    Raises BackupError unless every page matches the digest recorded at
+    backup time and SQLite's quick_check passes. Returns the archive header.
+    """
+    chain = _chain(path)
+    with open(target, "wb") as f:
+        for archive in chain:
+            header, keys, trailer = _apply(archive, f, password)
+    page_hash = _page_hasher(keys)
+    hashes = b"".join(page_hash(page) for _number, page in _iter_pages(target, header["page_size"]))
+    if _digest(hashes) != trailer["digest"]:
+        raise BackupError(f"yedek doğrulanamadı: {Path(path).name} sayfaları kayıtlı özetle eşleşmiyor")
+    check = sqlite3.connect(f"file:{Path(target).as_posix()}?mode=ro", uri=True)
+    try:
+        result = check.execute("PRAGMA quick_check").fetchone()[0]
+    finally:
+        check.close()
+    if result != "ok":
+        raise BackupError(f"geri yüklenen veritabanı bozuk: {result}")
+    return header
+
+
+def verify_backup(path, password=None):
+    """Rebuild ``path`` into a temporary file and check it; returns the archive header."""
+    path = Path(path)
+    target = path.with_name(f"dogrula-{secrets.token_hex(4)}.db.tmp")
+    try:
+        return rebuild(path, target, password)
+    finally:
+        target.unlink(missing_ok=True)
+
+
+def prepare_restore(path, password=None):
+    """Rebuild and verify archive ``path`` into a temporary file next to it; returns that file.
+
+    The slow half of a restore, which needs no connection to the live
+    database; pass the result to :func:`apply_restore`.
+    """
+    path = Path(path)
+    target = path.with_name(f"geri-{secrets.token_hex(4)}.db.tmp")
+    try:
+        rebuild(path, target, password)
+    except BaseException:
+        target.unlink(missing_ok=True)
+        raise
+    return target
+
+
+def apply_restore(conn, path, rebuilt):
+    """Copy ``rebuilt`` (from :func:`prepare_restore` of archive ``path``) over the database behind ``conn``.
+
+    The restore is one undoable action: undo restores a snapshot of the
+    database taken first, which is kept while undo can reach it (see
+    journal.py) and so never pushes out another action's snapshot. The
+    rebuilt file is deleted either way.
+    """
+    try:
+        restore_as_action(conn, rebuilt, label=f"Yedek geri yüklendi: {Path(path).name}")
+    finally:
+        Path(rebuilt).unlink(missing_ok=True)
+
+
+def restore_backup(conn, path, password=None):
+    """Replace the database behind ``conn`` with the verified contents of archive ``path``."""
+    apply_restore(conn, path, prepare_restore(path, password))
@@ -0,0 +1,586 @@
+"""Headless benchmarks for the MasterAccount data layer.
+
+Usage: python bench.py <benchmark> [options]; see ``--help``. Each benchmark
+builds its own throwaway database with synthetic data.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from backup import create_backup, verify_backup
+from charts import dense_series
+from db import PROFILES, close_db, init_db
+from main import STARTUP_PROBE_ENV
+from money import MINOR_PER_UNIT, to_decimal_string
+from repository import CustomerRepository, LedgerFilter, LedgerRepository
+from search import SearchPager
+from statements import accounts, statement
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+HERE = Path(__file__).resolve().parent
+
+
+def synthetic_entries(count, seed=0, years=(2015, 2025)):
+    """Yield ``(date, description, amount)`` rows with realistic spread; amounts are kuruş."""
+    rng = random.Random(seed)
+    first, last = years
+    for i in range(count):
+        date = f"{rng.randint(first, last)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        yield date, f"İşlem {i} — ödeme açıklaması", rng.randint(100, 2_500_000)
+
+
+def _ledger_rows(entries, kind, customers=0, seed=0):
+    # Links every other row to one of ``customers`` customers (ids 1..customers).
+    rng = random.Random(seed)
+    for date, desc, amount in entries:
+        customer_id = rng.randint(1, customers) if customers and rng.random() < 0.5 else None
+        yield date, desc, kind, amount, customer_id
+
+
+def populate(conn, rows, seed=0, customers=0):
+    ledger = LedgerRepository(conn)
+    if customers:
+        CustomerRepository(conn).add_many((f"Müşteri {i}", "", "") for i in range(1, customers + 1))
+    half = rows // 2
+    for kind, count, kind_seed in (("income", half, seed), ("expense", rows - half, seed + 1)):
+        entries = _ledger_rows(synthetic_entries(count, kind_seed), kind, customers, kind_seed)
+        ledger.add_many(entries, batch_size=100_000)
+
+
+def peak_rss_kib():
+    """Peak resident set size of this process in KiB (tracemalloc peak where unavailable)."""
+    # Linux carries ru_maxrss across exec, so a child would report its
+    # parent's peak; VmHWM belongs to the new address space.
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if sys.platform == "darwin" else peak
+    import tracemalloc
+
+    return tracemalloc.get_traced_memory()[1] // 1024
+
+
+def _export_child(args):
+    if resource is None:
+        import tracemalloc
+
+        tracemalloc.start()
+    import export
+
+    conn = init_db(args.db)
+    started = time.perf_counter()
+    count = getattr(export, f"export_{args.target}")(conn, os.devnull, args.format)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({"rows": count, "seconds": elapsed, "peak_rss_kib": peak_rss_kib()}))
+
+
+def bench_export(args):
+    """Export ledgers of increasing size, each in a fresh process, and compare peak RSS."""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.sizes:
+            db_path = Path(tmp) / f"export-{rows}.db"
+            conn = init_db(db_path)
+            populate(conn, rows)
+            conn.close()
+            out = subprocess.run(
+                [sys.executable, __file__, "_export-child", str(db_path), args.target, args.format],
+                check=True, capture_output=True, text=True, cwd=HERE,
+            )
+            result = json.loads(out.stdout)
+            result["size"] = rows
+            results.append(result)
+            print(
+                f"{rows:>12,} satır  {result['seconds']:8.2f} sn  "
+                f"{result['rows'] / max(result['seconds'], 1e-9):>12,.0f} satır/sn  "
+                f"tepe bellek {result['peak_rss_kib'] / 1024:8.1f} MiB"
+            )
+    peaks = [r["peak_rss_kib"] for r in results]
+    growth = peaks[-1] / peaks[0] if peaks[0] else 0
+    print(f"tepe bellek oranı (en büyük / en küçük): {growth:.2f}")
+    return results
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def bench_profiles(args):
+    """Compare write latency and read throughput of the connection profiles."""
+    results = []
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        for profile in args.profiles:
+            db_path = Path(tmp) / f"profile-{profile}.db"
+            conn = init_db(db_path, profile, args.synchronous)
+            ledger = LedgerRepository(conn)
+
+            latencies = []
+            for date, desc, amount in synthetic_entries(args.writes, seed=1):
+                started = time.perf_counter()
+                ledger.add("income", date, desc, amount)
+                latencies.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            ledger.add_many(_ledger_rows(synthetic_entries(args.rows, seed=2), "expense"))
+            bulk = time.perf_counter() - started
+
+            started = time.perf_counter()
+            scanned = sum(1 for _ in ledger.iter_entries())
+            scan = time.perf_counter() - started
+
+            pager = ledger.pager()
+            started = time.perf_counter()
+            pages = 0
+            while pages < 200 and pager.next_page():
+                pages += 1
+            paging = time.perf_counter() - started
+            close_db(conn)
+
+            result = {
+                "profile": profile,
+                "write_median_ms": statistics.median(latencies) * 1000,
+                "write_p95_ms": _percentile(latencies, 0.95) * 1000,
+                "bulk_rows_per_s": args.rows / bulk,
+                "scan_rows_per_s": scanned / scan,
+                "page_ms": paging / max(pages, 1) * 1000,
+            }
+            results.append(result)
+            print(
+                f"{profile:>9}  yazma medyan {result['write_median_ms']:7.3f} ms  "
+                f"p95 {result['write_p95_ms']:7.3f} ms  toplu {result['bulk_rows_per_s']:>10,.0f} satır/sn  "
+                f"tarama {result['scan_rows_per_s']:>10,.0f} satır/sn  sayfa {result['page_ms']:6.2f} ms"
+            )
+    return results
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def bench_money(args):
+    """Sum amounts as integer kuruş versus REAL lira, in SQL and in Python."""
+    rng = random.Random(0)
+    amounts = [rng.randint(1, 2_500_000) for _ in range(args.rows)]
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        conn = sqlite3.connect(Path(tmp) / "money.db")
+        conn.execute("CREATE TABLE cents (amount INTEGER NOT NULL)")
+        conn.execute("CREATE TABLE lira (amount REAL NOT NULL)")
+        with conn:
+            conn.executemany("INSERT INTO cents VALUES (?)", ((a,) for a in amounts))
+            conn.executemany("INSERT INTO lira VALUES (?)", ((a / MINOR_PER_UNIT,) for a in amounts))
+        exact, sql_int = _timed(lambda: conn.execute("SELECT SUM(amount) FROM cents").fetchone()[0])
+        real, sql_real = _timed(lambda: conn.execute("SELECT SUM(amount) FROM lira").fetchone()[0])
+        floats = [row[0] for row in conn.execute("SELECT amount FROM lira")]
+        conn.close()
+
+    _, py_int = _timed(lambda: sum(amounts))
+    float_sum, py_float = _timed(lambda: sum(floats))
+    # What a consumer of REAL amounts has to do to get an exact answer back.
+    decimal_sum, py_decimal = _timed(lambda: sum(Decimal(repr(f)) for f in floats))
+
+    expected = Decimal(to_decimal_string(exact))
+    rows = [
+        ("SQL SUM INTEGER", sql_int, expected),
+        ("SQL SUM REAL", sql_real, Decimal(repr(real))),
+        ("Python int", py_int, expected),
+        ("Python float", py_float, Decimal(repr(float_sum))),
+        ("Python Decimal", py_decimal, decimal_sum),
+    ]
+    results = []
+    for name, seconds, total in rows:
+        drift = total - expected
+        results.append({"method": name, "seconds": seconds, "drift": str(drift)})
+        print(
+            f"{name:>16}  {seconds:8.3f} sn  {args.rows / max(seconds, 1e-9):>14,.0f} satır/sn  "
+            f"toplam {total:>22}  sapma {drift}"
+        )
+    return results
+
+
+def bench_filters(args):
+    """Latency of dashboard period totals and filtered ledger pages on a large ledger."""
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        conn = init_db(Path(tmp) / "filters.db")
+        populate(conn, args.rows, customers=args.customers)
+        ledger = LedgerRepository(conn)
+        customers = CustomerRepository(conn)
+        cases = [
+            ("dashboard bu ay", lambda: ledger.totals_between("2024-06-01", "2024-06-30")),
+            ("dashboard bu yıl", lambda: ledger.totals_between("2024-01-01", "2024-12-31")),
+            ("dashboard özel aralık", lambda: ledger.totals_between("2016-02-13", "2024-11-07")),
+            ("grafik: tüm yıllar günlük", lambda: dense_series("day", ledger.series("day")[1])),
+            ("grafik: tüm yıllar haftalık", lambda: dense_series("week", ledger.series("week")[1])),
+            ("müşteri bakiyesi", lambda: customers.balance(1)),
+            ("tüm müşteri bakiyeleri", customers.balances),
+        ]
+        filters = {
+            "tarih aralığı": LedgerFilter("2020-01-01", "2020-03-31"),
+            "tür + bitiş tarihi": LedgerFilter(date_to="2016-01-05", kind="expense"),
+            "tutar aralığı": LedgerFilter(amount_min=2_400_000, amount_max=2_450_000),
+            "tümü birlikte": LedgerFilter("2019-06-01", "2019-06-30", "income", 100_000, 200_000),
+            "müşteri": LedgerFilter(customer_id=1),
+        }
+        for name, f in filters.items():
+            cases.append((f"ilk sayfa: {name}", lambda f=f: ledger.pager(filters=f).next_page()))
+            cases.append((f"toplam: {name}", lambda f=f: ledger.filtered_totals(f)))
+
+        results = []
+        for name, run in cases:
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - started)
+            result = {"case": name, "median_ms": statistics.median(timings) * 1000, "max_ms": max(timings) * 1000}
+            results.append(result)
+            print(f"{name:>32}  medyan {result['median_ms']:8.2f} ms  en kötü {result['max_ms']:8.2f} ms")
+        close_db(conn)
+    return results
+
+
+def _suite_database(folder, rows, customers):
+    """Synthetic database of ``rows`` entries, reused from ``folder`` when already built."""
+    path = Path(folder) / f"suite-{rows}-{customers}.db"
+    if path.exists():
+        conn = init_db(path)
+        if conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == rows:
+            close_db(conn)
+            return path
+        close_db(conn)
+        path.unlink()
+    conn = init_db(path)
+    started = time.perf_counter()
+    populate(conn, rows, customers=customers)
+    close_db(conn)
+    print(f"{rows:>12,} satırlık veritabanı {time.perf_counter() - started:.1f} sn'de üretildi")
+    return path
+
+
+def _insert_rolled_back(conn, rows):
+    # Bulk insert into the full table, then roll back so the database is reused unchanged.
+    ledger = LedgerRepository(conn)
+    ledger.add_many(_ledger_rows(synthetic_entries(rows, seed=99), "income"), commit=False)
+    conn.rollback()
+
+
+def _list_customers(customers):
+    # What the customers page loads: its first page plus those customers' accounts.
+    rows = customers.pager().next_page()
+    accounts(customers.conn, customer_ids=[row[0] for row in rows])
+    return rows
+
+
+def _age_all(conn):
+    # The first list of the day: every customer's aging recomputed.
+    with conn:
+        conn.execute("UPDATE customer_balances SET aged_on = NULL")
+    return accounts(conn)
+
+
+def _suite_cases(conn, args, backups):
+    """``(name, rows_per_run, fn)`` for every hot path, as the pages call them.
+
+    ``backups`` is a scratch folder; a full backup goes there first so the
+    backup case measures what the app's timer runs: an incremental one.
+    """
+    ledger = LedgerRepository(conn)
+    customers = CustomerRepository(conn)
+    create_backup(conn, backups, incremental=False)
+
+    def scroll():
+        pager = ledger.pager()
+        for _ in range(10):
+            pager.next_page()
+
+    return [
+        ("toplu ekleme", args.insert_rows, lambda: _insert_rolled_back(conn, args.insert_rows)),
+        ("dashboard kartları", 0, lambda: (ledger.totals(), ledger.totals_between("2024-06-01", "2024-06-30"))),
+        ("dashboard grafiği", 0, lambda: dense_series("day", ledger.series("day", "2024-04-01", "2024-06-30")[1])),
+        ("tablo ilk sayfa", 0, lambda: ledger.pager().next_page()),
+        ("tablo 10 sayfa kaydırma", 0, scroll),
+        ("tablo filtreli", 0, lambda: (
+            ledger.pager(filters=LedgerFilter("2020-01-01", "2020-12-31", "expense")).next_page(),
+            ledger.filtered_totals(LedgerFilter("2020-01-01", "2020-12-31", "expense")),
+        )),
+        ("arama ilk sayfa", 0, lambda: SearchPager(conn, "ödeme 4242").next_page()),
+        ("müşteri listesi", 0, lambda: _list_customers(customers)),
+        ("müşteri yaşlandırma (tümü)", 0, lambda: _age_all(conn)),
+        ("müşteri ekstresi", 0, lambda: statement(conn, 1)),
+        ("artımlı yedek", 0, lambda: create_backup(conn, backups)),
+    ]
+
+
+def _measure(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return {
+        "median_ms": statistics.median(timings) * 1000,
+        "p95_ms": _percentile(timings, 0.95) * 1000,
+        "max_ms": max(timings) * 1000,
+    }
+
+
+def compare_results(results, baseline, tolerance, floor_ms):
+    """``(size, case, baseline_ms, ms, ratio)`` for every case slower than the baseline allows.
+
+    A case regresses when its median exceeds the baseline median by more than
+    ``tolerance`` (a fraction) and by more than ``floor_ms``, so sub-millisecond
+    noise never fails a run. Cases missing from either side are skipped.
+    """
+    known = {(r["size"], r["case"]): r["median_ms"] for r in baseline["results"]}
+    regressions = []
+    for r in results["results"]:
+        before = known.get((r["size"], r["case"]))
+        if before is None:
+            continue
+        if r["median_ms"] > before * (1 + tolerance) and r["median_ms"] - before > floor_ms:
+            regressions.append((r["size"], r["case"], before, r["median_ms"], r["median_ms"] / max(before, 1e-9)))
+    return regressions
+
+
+def bench_suite(args):
+    """Hot paths of the data layer at several ledger sizes; results as JSON, checked against a baseline.
+
+    Databases are generated once per size and kept in ``--data-dir`` when
+    given, so repeated runs (and 10M rows) do not pay for generation again.
+    """
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": [],
+    }
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        folder = args.data_dir or tmp
+        Path(folder).mkdir(parents=True, exist_ok=True)
+
+        # Schema creation on an empty file is the same at every size.
+        empty = Path(tmp) / "empty.db"
+
+        def create():
+            empty.unlink(missing_ok=True)
+            close_db(init_db(empty))
+
+        cases = [(0, "init_db: yeni veritabanı", 0, create)]
+        for rows in args.sizes:
+            path = _suite_database(folder, rows, args.customers)
+            conn = init_db(path)
+            cases.append((rows, "init_db", 0, lambda path=path: close_db(init_db(path))))
+            cases += [(rows, *case) for case in _suite_cases(conn, args, Path(tmp) / f"yedek-{rows}")]
+            for size, name, work_rows, run in cases:
+                result = {"size": size, "case": name, **_measure(run, args.repeat)}
+                if work_rows:
+                    result["rows_per_s"] = work_rows / (result["median_ms"] / 1000)
+                results["results"].append(result)
+                rate = f"  {result['rows_per_s']:>10,.0f} satır/sn" if work_rows else ""
+                print(
+                    f"{size:>12,}  {name:>26}  medyan {result['median_ms']:9.2f} ms  "
+                    f"p95 {result['p95_ms']:9.2f} ms{rate}"
+                )
+            cases = []
+            close_db(conn)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_results(results, baseline, args.tolerance, args.floor_ms)
+        for size, name, before, after, ratio in regressions:
+            print(f"GERİLEME {size:>12,}  {name}: {before:.2f} ms → {after:.2f} ms (x{ratio:.2f})")
+        if regressions:
+            raise SystemExit(f"{len(regressions)} ölçüm temel değerin gerisinde kaldı")
+        print("temel değere göre gerileme yok")
+    return results
+
+
+def bench_backup(args):
+    """Full and incremental backup times, archive sizes and verification at realistic ledger sizes.
+
+    An incremental backup copies and hashes the whole database to find what
+    changed (see backup.py), so its time follows the database size; the
+    change size only shows in the archive.
+    """
+    results = []
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        folder = args.data_dir or tmp
+        Path(folder).mkdir(parents=True, exist_ok=True)
+        for rows in args.sizes:
+            source = sqlite3.connect(_suite_database(folder, rows, args.customers))
+            path = Path(tmp) / f"yedek-{rows}.db"
+            # Changed below, so a copy: the database in --data-dir stays reusable.
+            target = sqlite3.connect(path)
+            source.backup(target)
+            target.close()
+            source.close()
+            conn = init_db(path)
+            backups = Path(tmp) / f"yedek-{rows}"
+            ledger = LedgerRepository(conn)
+            steps = [
+                ("tam yedek", None, False),
+                ("artımlı, değişiklik yok", None, True),
+                (f"artımlı, {args.changed:,} yeni kayıt", args.changed, True),
+            ]
+            size_mb = path.stat().st_size / 1e6
+            for name, changed, incremental in steps:
+                if changed:
+                    ledger.add_many(_ledger_rows(synthetic_entries(changed, seed=7), "income"))
+                started = time.perf_counter()
+                archive = create_backup(conn, backups, incremental=incremental)
+                elapsed = time.perf_counter() - started
+                result = {
+                    "size": rows, "case": name, "db_mb": size_mb, "seconds": elapsed,
+                    "archive_mb": archive.stat().st_size / 1e6,
+                }
+                results.append(result)
+                print(f"{rows:>12,}  {name:>28}  {elapsed:7.2f} sn  {size_mb / elapsed:7.0f} MB/sn  "
+                      f"arşiv {result['archive_mb']:9.2f} MB")
+            started = time.perf_counter()
+            verify_backup(archive)
+            elapsed = time.perf_counter() - started
+            results.append({"size": rows, "case": "doğrulama", "db_mb": size_mb, "seconds": elapsed})
+            print(f"{rows:>12,}  {'doğrulama':>28}  {elapsed:7.2f} sn  {size_mb / elapsed:7.0f} MB/sn")
+            close_db(conn)
+    return results
+
+
+def bench_startup(args):
+    """Time to the first filled dashboard, for the source tree and optionally a frozen build.
+
+    Each run launches the real GUI with a startup probe set; the app writes
+    its timings once the dashboard cards are filled and exits.
+    """
+    builds = [("kaynak", [sys.executable, str(HERE / "main.py")])]
+    if args.exe:
+        builds.append(("paket", [str(args.exe)]))
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "startup.db"
+        conn = init_db(db_path)
+        populate(conn, args.rows)
+        close_db(conn)
+        for label, command in builds:
+            runs = []
+            for run in range(args.runs):
+                probe = Path(tmp) / f"{label}-{run}.json"
+                env = dict(os.environ, **{STARTUP_PROBE_ENV: str(probe)})
+                started = time.time()
+                subprocess.run(command + ["--db", str(db_path)], env=env, check=True, timeout=120)
+                timings = json.loads(probe.read_text(encoding="utf-8"))
+                timings["wall_ms"] = (timings.pop("finished_at") - started) * 1000
+                runs.append(timings)
+            result = {"build": label, "runs": args.runs}
+            for name in ("wall_ms", "imports_ms", "window_ms", "dashboard_ms"):
+                result[name] = statistics.median(r[name] for r in runs if name in r)
+            results.append(result)
+            print(
+                f"{label:>7}  toplam {result['wall_ms']:8.1f} ms  içe aktarma {result['imports_ms']:7.1f} ms  "
+                f"pencere {result['window_ms']:7.1f} ms  dashboard {result['dashboard_ms']:7.1f} ms"
+            )
+    return results
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="bench.py")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    exp = commands.add_parser("export", help="akışlı dışa aktarımda bellek kullanımı")
+    exp.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    exp.add_argument("--target", choices=("ledger", "monthly_report"), default="ledger")
+    exp.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    exp.set_defaults(handler=bench_export)
+
+    prof = commands.add_parser("profiles", help="bağlantı profillerinde yazma gecikmesi ve okuma hızı")
+    prof.add_argument("--profiles", nargs="+", choices=tuple(PROFILES), default=list(PROFILES))
+    prof.add_argument("--synchronous", type=str.upper, help="tüm profillerde synchronous seviyesini zorla")
+    prof.add_argument("--writes", type=int, default=500, help="tek tek kaydedilen satır sayısı")
+    prof.add_argument("--rows", type=int, default=200_000, help="toplu yazılıp okunan satır sayısı")
+    prof.add_argument("--dir", help="veritabanlarının oluşturulacağı klasör (ölçülecek disk)")
+    prof.set_defaults(handler=bench_profiles)
+
+    money = commands.add_parser("money", help="tam sayı kuruş ve REAL toplamlarının hızı ve doğruluğu")
+    money.add_argument("--rows", type=int, default=10_000_000)
+    money.add_argument("--dir", help="veritabanının oluşturulacağı klasör")
+    money.set_defaults(handler=bench_money)
+
+    filt = commands.add_parser("filters", help="dönem toplamları ve filtreli sayfa gecikmesi")
+    filt.add_argument("--rows", type=int, default=2_000_000)
+    filt.add_argument("--repeat", type=int, default=20)
+    filt.add_argument("--customers", type=int, default=1000, help="satırların yarısına bağlanan müşteri sayısı")
+    filt.add_argument("--dir", help="veritabanının oluşturulacağı klasör")
+    filt.set_defaults(handler=bench_filters)
+
+    suite = commands.add_parser("suite", help="veri katmanı sıcak yolları; JSON sonuç ve temel değerle karşılaştırma")
+    suite.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000],
+                       help="kayıt sayıları (10M için: --sizes 10000 1000000 10000000)")
+    suite.add_argument("--repeat", type=int, default=10)
+    suite.add_argument("--customers", type=int, default=1000, help="satırların yarısına bağlanan müşteri sayısı")
+    suite.add_argument("--insert-rows", type=int, default=20_000, help="toplu eklemede ölçülen satır sayısı")
+    suite.add_argument("--data-dir", help="üretilen veritabanlarının saklanıp yeniden kullanılacağı klasör")
+    suite.add_argument("--dir", help="geçici dosyaların oluşturulacağı klasör")
+    suite.add_argument("--output", type=Path, help="sonuçların yazılacağı JSON dosyası")
+    suite.add_argument("--baseline", type=Path, help="karşılaştırılacak önceki JSON sonucu")
+    suite.add_argument("--tolerance", type=float, default=0.25, help="izin verilen yavaşlama oranı (0.25 = %%25)")
+    suite.add_argument("--floor-ms", type=float, default=1.0, help="bundan küçük farklar gerileme sayılmaz")
+    suite.set_defaults(handler=bench_suite)
+
+    bak = commands.add_parser("backup", help="tam ve artımlı yedek süresi, arşiv boyutu ve doğrulama")
+    bak.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000],
+                     help="kayıt sayıları (10M satır yaklaşık 2,8 GB)")
+    bak.add_argument("--changed", type=int, default=1000, help="iki artımlı yedek arasında eklenen kayıt sayısı")
+    bak.add_argument("--customers", type=int, default=1000, help="satırların yarısına bağlanan müşteri sayısı")
+    bak.add_argument("--data-dir", help="üretilen veritabanlarının saklanıp yeniden kullanılacağı klasör")
+    bak.add_argument("--dir", help="kopyaların ve yedeklerin oluşturulacağı klasör (ölçülecek disk)")
+    bak.set_defaults(handler=bench_backup)
+
+    start = commands.add_parser("startup", help="açılış süresi: içe aktarma ve ilk dolu ekran")
+    start.add_argument("--exe", type=Path, help="PyInstaller ile üretilmiş uygulama (ör. dist/MasterAccount/MasterAccount)")
+    start.add_argument("--runs", type=int, default=5)
+    start.add_argument("--rows", type=int, default=100_000, help="veritabanındaki kayıt sayısı")
+    start.set_defaults(handler=bench_startup)
+
+    child = commands.add_parser("_export-child")
+    child.add_argument("db", type=Path)
+    child.add_argument("target")
+    child.add_argument("format")
+    child.set_defaults(handler=_export_child)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
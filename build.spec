@@ -1,10 +1,15 @@
 # Build configuration for PyInstaller
 # Run: pyinstaller build.spec
+# Builds a one-folder app (dist/MasterAccount/) that starts without unpacking
+# anything; set MASTERACCOUNT_ONEFILE=1 for a single, slower-starting exe.
 
 # -*- mode: python ; coding: utf-8 -*-
+import os
 import sys
 from PyInstaller.utils.hooks import collect_submodules
 
+ONEFILE = os.environ.get("MASTERACCOUNT_ONEFILE") == "1"
+
 block_cipher = None
 
 a = Analysis(
@@ -16,7 +21,8 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludedimports=[],
+    # Standard-library packages the app never imports; less to load and unpack.
+    excludes=["unittest", "doctest", "pydoc", "pdb", "lib2to3", "xmlrpc", "test", "tkinter.test"],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
@@ -25,23 +31,52 @@ a = Analysis(
 
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
 
-exe = EXE(
-    pyz,
-    a.scripts,
-    a.binaries,
-    a.zipfiles,
-    a.datas,
-    [],
-    name="MasterAccount",
-    debug=False,
-    bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
-    console=False,
-    disable_windowed_traceback=False,
-    target_arch=None,
-    codesign_identity=None,
-    entitlements_file=None,
-)
+if ONEFILE:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        a.binaries,
+        a.zipfiles,
+        a.datas,
+        [],
+        name="MasterAccount",
+        debug=False,
+        bootloader_ignore_signals=False,
+        strip=False,
+        # UPX-packed libraries are decompressed on every launch.
+        upx=False,
+        upx_exclude=[],
+        runtime_tmpdir=None,
+        console=False,
+        disable_windowed_traceback=False,
+        target_arch=None,
+        codesign_identity=None,
+        entitlements_file=None,
+    )
+else:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        [],
+        exclude_binaries=True,
+        name="MasterAccount",
+        debug=False,
+        bootloader_ignore_signals=False,
+        strip=False,
+        upx=False,
+        console=False,
+        disable_windowed_traceback=False,
+        target_arch=None,
+        codesign_identity=None,
+        entitlements_file=None,
+    )
+    coll = COLLECT(
+        exe,
+        a.binaries,
+        a.zipfiles,
+        a.datas,
+        strip=False,
+        upx=False,
+        upx_exclude=[],
+        name="MasterAccount",
+    )
@@ -0,0 +1,185 @@
+"""Dashboard charts: income/expense bars and the running balance on a Tk canvas.
+
+Series come from ledger_totals (see db.read_series). Before drawing they are
+downsampled to the canvas width, so a ten-year daily series costs no more to
+draw than a yearly one, and resizing redraws from the series held in memory.
+"""
+
+from datetime import date, timedelta
+
+from db import bucket_start
+from money import format_amount
+
+
+INCOME_COLOR = "#4ade80"
+EXPENSE_COLOR = "#f87171"
+BALANCE_COLOR = "#60a5fa"
+TEXT_COLOR = "#9ca3af"
+GRID_COLOR = "#4b5563"
+# Narrowest bar pair and the horizontal step between balance samples, in pixels.
+MIN_BAR_WIDTH = 4
+LINE_STEP = 2
+
+
+def _period_date(grain, period):
+    if grain == "year":
+        return date(int(period), 1, 1)
+    if grain == "month":
+        return date(int(period[:4]), int(period[5:7]), 1)
+    return date.fromisoformat(period)
+
+
+def _next_bucket(grain, day):
+    if grain == "year":
+        return day.replace(year=day.year + 1)
+    if grain == "month":
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=7 if grain == "week" else 1)
+
+
+def dense_series(grain, rows, first=None, last=None):
+    """Fill the buckets missing from ``rows`` with zeros between ``first`` and ``last``.
+
+    ``rows`` are ``(period, income, expense)`` as returned by db.read_series;
+    the bounds are dates and default to the first and last row.
+    """
+    if not rows and (first is None or last is None):
+        return []
+    known = {period: (income, expense) for period, income, expense in rows}
+    day = bucket_start(grain, first) if first else _period_date(grain, rows[0][0])
+    end = bucket_start(grain, last) if last else _period_date(grain, rows[-1][0])
+    width = {"year": 4, "month": 7}.get(grain, 10)
+    dense = []
+    while day <= end:
+        period = day.isoformat()[:width]
+        dense.append((period, *known.get(period, (0, 0))))
+        day = _next_bucket(grain, day)
+    return dense
+
+
+def running_balance(opening, rows):
+    """Balance after each ``(period, income, expense)`` row, starting from ``opening``."""
+    balances = []
+    balance = opening
+    for _period, income, expense in rows:
+        balance += income - expense
+        balances.append(balance)
+    return balances
+
+
+def merge_buckets(rows, max_bars):
+    """Sum runs of adjacent rows so at most ``max_bars`` remain; totals are preserved.
+
+    Each merged row is labelled with the first period of its run.
+    """
+    if max_bars <= 0 or len(rows) <= max_bars:
+        return list(rows)
+    size = -(-len(rows) // max_bars)
+    merged = []
+    for start in range(0, len(rows), size):
+        run = rows[start:start + size]
+        merged.append((run[0][0], sum(r[1] for r in run), sum(r[2] for r in run)))
+    return merged
+
+
+def minmax_points(values, max_points):
+    """Downsample a line to about ``max_points`` ``(index, value)`` points.
+
+    Each slice keeps its minimum and maximum in their original order, so peaks
+    and dips survive at any zoom level, and the last value is always kept.
+    """
+    if len(values) <= max_points:
+        return list(enumerate(values))
+    slices = max(max_points // 2, 1)
+    size = -(-len(values) // slices)
+    points = []
+    for start in range(0, len(values), size):
+        chunk = values[start:start + size]
+        low = min(range(len(chunk)), key=chunk.__getitem__)
+        high = max(range(len(chunk)), key=chunk.__getitem__)
+        for i in sorted({low, high}):
+            points.append((start + i, chunk[i]))
+    if points[-1][0] != len(values) - 1:
+        points.append((len(values) - 1, values[-1]))
+    return points
+
+
+class LedgerChart:
+    """Income/expense bars above the running balance, drawn on one canvas.
+
+    :meth:`set_data` keeps the full series; every draw downsamples it to the
+    canvas size, and a resize only redraws.
+    """
+
+    PAD = 12
+    LABEL_HEIGHT = 18
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.rows = []
+        self.balances = []
+        self._pending = False
+        canvas.bind("<Configure>", lambda _event: self.schedule_draw())
+
+    def set_data(self, opening, rows):
+        self.rows = rows
+        self.balances = running_balance(opening, rows)
+        self.schedule_draw()
+
+    def schedule_draw(self):
+        # A window resize sends a burst of <Configure> events; draw once after them.
+        if not self._pending:
+            self._pending = True
+            self.canvas.after_idle(self.draw)
+
+    def draw(self):
+        self._pending = False
+        canvas = self.canvas
+        canvas.delete("all")
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        if not self.rows:
+            canvas.create_text(width / 2, height / 2, text="Bu dönemde kayıt yok", fill=TEXT_COLOR)
+            return
+        inner = width - 2 * self.PAD
+        split = int(height * 0.6)
+        self._draw_bars(inner, self.PAD, split - self.LABEL_HEIGHT)
+        self._draw_balance(inner, split + self.LABEL_HEIGHT, height - self.PAD - self.LABEL_HEIGHT)
+        canvas.create_text(self.PAD, height - self.PAD, anchor="sw", text=self.rows[0][0], fill=TEXT_COLOR)
+        canvas.create_text(width - self.PAD, height - self.PAD, anchor="se", text=self.rows[-1][0],
+                           fill=TEXT_COLOR)
+
+    def _draw_bars(self, inner, top, bottom):
+        canvas = self.canvas
+        bars = merge_buckets(self.rows, max(inner // MIN_BAR_WIDTH, 1))
+        peak = max(max(income, expense) for _period, income, expense in bars) or 1
+        step = inner / len(bars)
+        bar = max(step / 2 - 1, 1)
+        scale = (bottom - top - self.LABEL_HEIGHT) / peak
+        for i, (_period, income, expense) in enumerate(bars):
+            x = self.PAD + i * step
+            if income:
+                canvas.create_rectangle(x, bottom - income * scale, x + bar, bottom, fill=INCOME_COLOR, width=0)
+            if expense:
+                canvas.create_rectangle(x + bar, bottom - expense * scale, x + 2 * bar, bottom,
+                                        fill=EXPENSE_COLOR, width=0)
+        canvas.create_line(self.PAD, bottom, self.PAD + inner, bottom, fill=GRID_COLOR)
+        canvas.create_text(self.PAD, top, anchor="nw", fill=TEXT_COLOR,
+                           text=f"Gelir / Gider (en yüksek {format_amount(peak, currency=True)})")
+
+    def _draw_balance(self, inner, top, bottom):
+        canvas = self.canvas
+        points = minmax_points(self.balances, max(inner // LINE_STEP, 2))
+        low, high = min(self.balances), max(self.balances)
+        span = (high - low) or 1
+        last = max(len(self.balances) - 1, 1)
+        coords = []
+        for index, value in points:
+            coords += (self.PAD + index * inner / last, bottom - (value - low) * (bottom - top) / span)
+        if low < 0 < high:
+            zero = bottom - (0 - low) * (bottom - top) / span
+            canvas.create_line(self.PAD, zero, self.PAD + inner, zero, fill=GRID_COLOR, dash=(2, 4))
+        if len(coords) >= 4:
+            canvas.create_line(*coords, fill=BALANCE_COLOR, width=2)
+        canvas.create_text(self.PAD, top - self.LABEL_HEIGHT, anchor="nw", fill=TEXT_COLOR,
+                           text=f"Bakiye ({format_amount(low, currency=True)} – "
+                                f"{format_amount(high, currency=True)})")
@@ -0,0 +1,157 @@
+"""Companies: one ledger database file each, and a pool of open connections.
+
+The database given on the command line is the main company; the others are
+``<name>.db`` files in the ``<stem>-companies`` folder next to it. Switching
+company swaps the worker's connection for one from a small LRU pool, so going
+back to a recently used company reopens nothing. Consolidated totals ATTACH
+the company files to one in-memory connection and read all their
+ledger_totals tables in a single query.
+"""
+
+import re
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+from urllib.parse import quote
+
+from db import MIGRATIONS, close_db, init_db, read_attached_totals
+
+
+# Company connections kept open; the least recently used one is closed first.
+POOL_SIZE = 4
+MAIN_COMPANY = "Ana şirket"
+_COMPANY_NAME = re.compile(r"\w[\w .&'-]*(?<![. ])$")
+# SQLite's default when the limit cannot be read (Python < 3.11).
+_DEFAULT_ATTACH_LIMIT = 10
+
+
+def company_dir(main_db):
+    main_db = Path(main_db)
+    return main_db.with_name(f"{main_db.stem}-companies")
+
+
+class ConnectionPool:
+    """Keeps up to ``size`` connections open by path, closing the least recently used.
+
+    Connections belong to the thread that opened them, so use a pool from
+    the database worker only.
+    """
+
+    def __init__(self, connect=init_db, close=close_db, size=POOL_SIZE):
+        self._connect = connect
+        self._close = close
+        self.size = size
+        self._open = OrderedDict()
+
+    def get(self, path):
+        key = str(Path(path).resolve())
+        conn = self._open.pop(key, None)
+        if conn is None:
+            conn = self._connect(path)
+        self._open[key] = conn
+        while len(self._open) > self.size:
+            _, old = self._open.popitem(last=False)
+            self._close(old)
+        return conn
+
+    def close_all(self):
+        while self._open:
+            _, conn = self._open.popitem()
+            self._close(conn)
+
+
+def _attach_limit(conn):
+    try:
+        return conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+    except AttributeError:
+        return _DEFAULT_ATTACH_LIMIT
+
+
+def consolidated_totals(paths, date_from=None, date_to=None):
+    """(income, expense) for each database in ``paths``, read through ATTACH.
+
+    Files are attached read-only, as many at a time as SQLite allows, and
+    each batch is summed in one query. A file at an older schema version
+    gives None instead: migrating is a write, left to the first time the
+    company is opened.
+    """
+    conn = sqlite3.connect("file::memory:", uri=True)
+    try:
+        totals = []
+        limit = _attach_limit(conn)
+        for start in range(0, len(paths), limit):
+            batch = paths[start:start + limit]
+            attached, current = [], []
+            try:
+                for index, path in enumerate(batch):
+                    if not Path(path).is_file():
+                        raise ValueError(f"şirket dosyası bulunamadı: {path}")
+                    schema = f"company{index}"
+                    uri = f"file:{quote(Path(path).resolve().as_posix())}?mode=ro"
+                    conn.execute(f"ATTACH DATABASE ? AS {schema}", (uri,))
+                    attached.append(schema)
+                    if conn.execute(f"PRAGMA {schema}.user_version").fetchone()[0] >= len(MIGRATIONS):
+                        current.append(schema)
+                read = iter(read_attached_totals(conn, current, date_from, date_to))
+                totals += [next(read) if schema in current else None for schema in attached]
+            finally:
+                for schema in attached:
+                    conn.execute(f"DETACH DATABASE {schema}")
+        return totals
+    finally:
+        conn.close()
+
+
+class Companies:
+    """The companies of one main database and the pool of their open connections."""
+
+    def __init__(self, main_db, connect=init_db, size=POOL_SIZE):
+        self.main_db = Path(main_db)
+        self.pool = ConnectionPool(connect, size=size)
+
+    def list(self):
+        """``(name, path)`` of every company: the main one first, the rest by name."""
+        folder = company_dir(self.main_db)
+        others = sorted(folder.glob("*.db"), key=lambda p: p.stem.casefold()) if folder.is_dir() else []
+        return [(MAIN_COMPANY, self.main_db), *((path.stem, path) for path in others)]
+
+    def names(self):
+        return [name for name, _path in self.list()]
+
+    def path(self, name):
+        """File of the company called ``name``; raises ValueError for names unusable as file names."""
+        name = name.strip()
+        if name == MAIN_COMPANY:
+            return self.main_db
+        if len(name) > 100 or not _COMPANY_NAME.match(name):
+            raise ValueError(f"geçersiz şirket adı: {name!r}")
+        return company_dir(self.main_db) / f"{name}.db"
+
+    def create(self, name):
+        """Create an empty company database; returns its path."""
+        path = self.path(name)
+        if path.exists():
+            raise ValueError(f"bu adla bir şirket zaten var: {name.strip()}")
+        path.parent.mkdir(exist_ok=True)
+        close_db(init_db(path))
+        return path
+
+    def open(self, name):
+        """Connection to the company called ``name``, from the pool (worker thread only)."""
+        path = self.path(name)
+        # The main database is created on first start; other companies through create().
+        if path != self.main_db and not path.is_file():
+            raise ValueError(f"şirket bulunamadı: {name}")
+        return self.pool.get(path)
+
+    def close_all(self):
+        self.pool.close_all()
+
+    def totals(self, date_from=None, date_to=None):
+        """``(name, income, expense)`` for every company, consolidated in one pass.
+
+        Income and expense are None for a company whose file is not migrated yet.
+        """
+        companies = self.list()
+        totals = consolidated_totals([path for _name, path in companies], date_from, date_to)
+        return [(name, *(total or (None, None))) for (name, _path), total in zip(companies, totals)]
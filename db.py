@@ -0,0 +1,1087 @@
+"""SQLite schema and summary tables for MasterAccount (no GUI imports)."""
+
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import date as date_type, timedelta
+from functools import lru_cache
+from pathlib import Path
+
+from profiling import ProfiledConnection
+
+
+KINDS = ("income", "expense")
+
+SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+# PRAGMAs applied to every connection. "safe" keeps the rollback journal for
+# databases on network shares, where WAL's shared memory does not work;
+# "fast" trades durability of the last commits on power loss for latency.
+PROFILES = {
+    "safe": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "cache_size": -16_000,
+        "temp_store": "MEMORY",
+    },
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64_000,
+        "temp_store": "MEMORY",
+    },
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "mmap_size": 1024 * 1024 * 1024,
+        "cache_size": -256_000,
+        "temp_store": "MEMORY",
+    },
+}
+DEFAULT_PROFILE = "balanced"
+
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}$")
+_DMY_DATE = re.compile(r"(\d{1,2})[./](\d{1,2})[./](\d{4})$")
+
+# Running totals per kind for all time, per year, month, week and day,
+# maintained by triggers so the dashboard never has to SUM the ledger; any date
+# range is a handful of these rows (see read_range_totals) and the charts read
+# one grain as a time series (see read_series). Weeks are keyed by their Monday.
+TOTALS_GRAINS = {
+    "all": "''",
+    "year": "substr({date}, 1, 4)",
+    "month": "substr({date}, 1, 7)",
+    "week": "date({date}, 'weekday 0', '-6 days')",
+    "day": "substr({date}, 1, 10)",
+}
+_TOTALS_UPSERT = """
+    INSERT INTO ledger_totals (kind, grain, period, total, count) VALUES
+        ({row}.kind, 'all', '', {sign}IFNULL({row}.amount, 0), {sign}1),
+        ({row}.kind, 'year', IFNULL(substr({row}.date, 1, 4), ''), {sign}IFNULL({row}.amount, 0), {sign}1),
+        ({row}.kind, 'month', IFNULL(substr({row}.date, 1, 7), ''), {sign}IFNULL({row}.amount, 0), {sign}1),
+        ({row}.kind, 'week', IFNULL(date({row}.date, 'weekday 0', '-6 days'), ''),
+            {sign}IFNULL({row}.amount, 0), {sign}1),
+        ({row}.kind, 'day', IFNULL(substr({row}.date, 1, 10), ''), {sign}IFNULL({row}.amount, 0), {sign}1)
+    ON CONFLICT (kind, grain, period)
+    DO UPDATE SET total = total + excluded.total, count = count + excluded.count;
+"""
+# Set-based equivalent of the insert trigger for every row with id > ?.
+_TOTALS_CATCH_UP = """
+    INSERT INTO ledger_totals (kind, grain, period, total, count)
+    WITH day AS (
+        SELECT kind, IFNULL(substr(date, 1, 10), '') AS period, IFNULL(SUM(amount), 0) AS total,
+               COUNT(*) AS count
+        FROM transactions WHERE id > :last_id GROUP BY 1, 2
+    )
+    SELECT * FROM (
+        SELECT kind, 'all', '', SUM(total), SUM(count) FROM day GROUP BY 1
+        UNION ALL
+        SELECT kind, 'year', substr(period, 1, 4), SUM(total), SUM(count) FROM day GROUP BY 1, 3
+        UNION ALL
+        SELECT kind, 'month', substr(period, 1, 7), SUM(total), SUM(count) FROM day GROUP BY 1, 3
+        UNION ALL
+        SELECT kind, 'week', IFNULL(date(period, 'weekday 0', '-6 days'), ''), SUM(total), SUM(count)
+        FROM day GROUP BY 1, 3
+        UNION ALL
+        SELECT kind, 'day', period, total, count FROM day
+    ) WHERE true
+    ON CONFLICT (kind, grain, period)
+    DO UPDATE SET total = total + excluded.total, count = count + excluded.count
+"""
+
+# AFTER INSERT triggers that bulk loads drop for the duration of their
+# transaction, each with a set-based statement that applies the same effect to
+# the new rows afterwards: table -> [(trigger name, CREATE TRIGGER, catch-up)].
+_INSERT_HOOKS = {}
+
+
+def _register_insert_hook(table, name, body, catch_up):
+    create = f"CREATE TRIGGER IF NOT EXISTS {name} AFTER INSERT ON {table} BEGIN {body} END"
+    _INSERT_HOOKS.setdefault(table, []).append((name, create, catch_up))
+
+
+def _create_insert_hook(conn, table, name, fill=False):
+    for hook_name, create, catch_up in _INSERT_HOOKS[table]:
+        if hook_name == name:
+            conn.execute(create)
+            if fill:
+                conn.execute(catch_up, {"last_id": 0})
+
+
+# Full-text search: ledger_fts rowids are transaction ids and customers_fts
+# rowids customer ids. Dotless ı is folded to i here and in search queries;
+# unicode61 with remove_diacritics handles case and the other Turkish letters
+# (ş, ğ, ç, ö, ü, İ).
+_FOLD = "replace({}, 'ı', 'i')"
+_FTS_OPTIONS = "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'"
+
+_register_insert_hook(
+    "transactions",
+    "transactions_totals_ai",
+    _TOTALS_UPSERT.format(sign="", row="NEW"),
+    _TOTALS_CATCH_UP,
+)
+_register_insert_hook(
+    "transactions",
+    "transactions_fts_ai",
+    f"INSERT INTO ledger_fts (rowid, description) VALUES (NEW.id, {_FOLD.format('NEW.description')});",
+    f"INSERT INTO ledger_fts (rowid, description) "
+    f"SELECT id, {_FOLD.format('description')} FROM transactions WHERE id > :last_id",
+)
+_register_insert_hook(
+    "customers",
+    "customers_fts_ai",
+    f"INSERT INTO customers_fts (rowid, name, contact, notes) VALUES (NEW.id, "
+    f"{_FOLD.format('NEW.name')}, {_FOLD.format('NEW.contact')}, {_FOLD.format('NEW.notes')});",
+    f"INSERT INTO customers_fts (rowid, name, contact, notes) SELECT id, "
+    f"{_FOLD.format('name')}, {_FOLD.format('contact')}, {_FOLD.format('notes')} "
+    f"FROM customers WHERE id > :last_id",
+)
+
+# Change journal: every row inserted, deleted or updated in these tables is
+# logged under the newest journal_actions row (see start_action) with the
+# values needed to reverse it. Inserts only need the id; deletes and updates
+# keep the old values as a JSON array in column order.
+JOURNAL_COLUMNS = {
+    "transactions": ("date", "description", "kind", "amount", "customer_id", "source_key"),
+    "customers": ("name", "contact", "notes"),
+    "payments": ("date", "customer_id", "amount", "note"),
+}
+_CURRENT_ACTION = "(SELECT MAX(id) FROM journal_actions)"
+
+
+def _journal_triggers(table, columns):
+    """CREATE TRIGGER statements journaling deletes and edits of ``columns``, keyed by op."""
+    old = ", ".join(f"OLD.{column}" for column in columns)
+    return {
+        op: f"CREATE TRIGGER IF NOT EXISTS {table}_journal_{suffix} AFTER {event} ON {table} BEGIN "
+        f"INSERT INTO journal (action, tbl, op, row_id, data) "
+        f"VALUES ({_CURRENT_ACTION}, '{table}', '{op}', OLD.id, json_array({old})); END"
+        for op, suffix, event in (("delete", "ad", "DELETE"), ("update", "au", "UPDATE"))
+    }
+
+
+# The triggers of the current schema; migrations pin the columns of their own version.
+_JOURNAL_TRIGGERS = {}
+for _table, _columns in JOURNAL_COLUMNS.items():
+    _register_insert_hook(
+        _table,
+        f"{_table}_journal_ai",
+        f"INSERT INTO journal (action, tbl, op, row_id) VALUES ({_CURRENT_ACTION}, '{_table}', 'insert', NEW.id);",
+        f"INSERT INTO journal (action, tbl, op, row_id) "
+        f"SELECT {_CURRENT_ACTION}, '{_table}', 'insert', id FROM {_table} WHERE id > :last_id",
+    )
+    _JOURNAL_TRIGGERS[_table] = _journal_triggers(_table, _columns)
+
+
+# Customer accounts: per customer, what income entries charged (invoiced),
+# what expense entries and payments credited, and the open invoices split into
+# aging buckets. The sums are kept exact by triggers; every write also clears
+# aged_on, and statements.refresh_aging recomputes the buckets of such rows.
+_BALANCE_COLUMNS = {
+    "transactions": {
+        "invoiced": "CASE {row}.kind WHEN 'income' THEN IFNULL({row}.amount, 0) ELSE 0 END",
+        "credited": "CASE {row}.kind WHEN 'expense' THEN IFNULL({row}.amount, 0) ELSE 0 END",
+    },
+    "payments": {"paid": "{row}.amount"},
+}
+_BALANCE_ADD = (
+    "INSERT INTO customer_balances (customer_id, {columns}) SELECT {source} "
+    "ON CONFLICT (customer_id) DO UPDATE SET {update}, aged_on = NULL"
+)
+
+
+def _balance_sql(table):
+    """(add NEW, remove OLD, catch-up) statements keeping customer_balances in step with ``table``."""
+    columns = _BALANCE_COLUMNS[table]
+    names = ", ".join(columns)
+    update = ", ".join(f"{c} = {c} + excluded.{c}" for c in columns)
+    add = _BALANCE_ADD.format(
+        columns=names, update=update,
+        source=f"NEW.customer_id, {', '.join(v.format(row='NEW') for v in columns.values())} "
+        f"WHERE NEW.customer_id IS NOT NULL",
+    )
+    remove = (
+        f"UPDATE customer_balances SET {', '.join(f'{c} = {c} - ' + v.format(row='OLD') for c, v in columns.items())}, "
+        f"aged_on = NULL WHERE customer_id = OLD.customer_id"
+    )
+    catch_up = _BALANCE_ADD.format(
+        columns=names, update=update,
+        source=f"customer_id, {', '.join(f'SUM({v.format(row=table)})' for v in columns.values())} "
+        f"FROM {table} WHERE id > :last_id AND customer_id IS NOT NULL GROUP BY customer_id",
+    )
+    return add, remove, catch_up
+
+
+_BALANCE_TRIGGERS = {}
+for _table in _BALANCE_COLUMNS:
+    _add, _remove, _catch_up = _balance_sql(_table)
+    _register_insert_hook(_table, f"{_table}_balance_ai", f"{_add};", _catch_up)
+    _BALANCE_TRIGGERS[_table] = (
+        f"CREATE TRIGGER {_table}_balance_ad AFTER DELETE ON {_table} BEGIN {_remove}; END",
+        f"CREATE TRIGGER {_table}_balance_au AFTER UPDATE OF date, amount, customer_id"
+        f"{', kind' if _table == 'transactions' else ''} ON {_table} BEGIN {_remove}; {_add}; END",
+    )
+
+
+# Schema versions 1-5 kept incomes and expenses in separate tables; the
+# migrations up to the unified transactions table still build on these.
+# In that layout the FTS rowid encoded the kind in its lowest bit.
+_SPLIT_TABLES = {"income": "incomes", "expense": "expenses"}
+_SPLIT_FTS_BIT = {"income": 0, "expense": 1}
+_SPLIT_FTS_ROWID = "{row}.id * 2 + {bit}"
+_SPLIT_TOTALS_UPSERT = """
+    INSERT INTO ledger_totals (kind, grain, period, total, count) VALUES
+        ('{kind}', 'all', '', {sign}IFNULL({row}.amount, 0), {sign}1),
+        ('{kind}', 'year', IFNULL(substr({row}.date, 1, 4), ''), {sign}IFNULL({row}.amount, 0), {sign}1),
+        ('{kind}', 'month', IFNULL(substr({row}.date, 1, 7), ''), {sign}IFNULL({row}.amount, 0), {sign}1),
+        ('{kind}', 'day', IFNULL(substr({row}.date, 1, 10), ''), {sign}IFNULL({row}.amount, 0), {sign}1)
+    ON CONFLICT (kind, grain, period)
+    DO UPDATE SET total = total + excluded.total, count = count + excluded.count;
+"""
+# Set-based equivalent of the insert trigger for every row with id > ?.
+_SPLIT_TOTALS_CATCH_UP = """
+    INSERT INTO ledger_totals (kind, grain, period, total, count)
+    WITH day AS (
+        SELECT IFNULL(substr(date, 1, 10), '') AS period, IFNULL(SUM(amount), 0) AS total, COUNT(*) AS count
+        FROM {table} WHERE id > :last_id GROUP BY 1
+    )
+    SELECT * FROM (
+        SELECT '{kind}', 'all', '', IFNULL(SUM(total), 0), IFNULL(SUM(count), 0) FROM day
+        UNION ALL
+        SELECT '{kind}', 'year', substr(period, 1, 4), SUM(total), SUM(count) FROM day GROUP BY 3
+        UNION ALL
+        SELECT '{kind}', 'month', substr(period, 1, 7), SUM(total), SUM(count) FROM day GROUP BY 3
+        UNION ALL
+        SELECT '{kind}', 'day', period, total, count FROM day
+    ) WHERE true
+    ON CONFLICT (kind, grain, period)
+    DO UPDATE SET total = total + excluded.total, count = count + excluded.count
+"""
+
+for _kind, _table in _SPLIT_TABLES.items():
+    _register_insert_hook(
+        _table,
+        f"{_table}_totals_ai",
+        _SPLIT_TOTALS_UPSERT.format(kind=_kind, sign="", row="NEW"),
+        _SPLIT_TOTALS_CATCH_UP.format(kind=_kind, table=_table),
+    )
+    _register_insert_hook(
+        _table,
+        f"{_table}_fts_ai",
+        f"INSERT INTO ledger_fts (rowid, description) "
+        f"VALUES ({_SPLIT_FTS_ROWID.format(row='NEW', bit=_SPLIT_FTS_BIT[_kind])}, {_FOLD.format('NEW.description')});",
+        f"INSERT INTO ledger_fts (rowid, description) "
+        f"SELECT id * 2 + {_SPLIT_FTS_BIT[_kind]}, {_FOLD.format('description')} FROM {_table} WHERE id > :last_id",
+    )
+
+
+@lru_cache(maxsize=4096)
+def normalize_date(text):
+    """Return ``text`` as an ISO ``YYYY-MM-DD`` string or raise ValueError.
+
+    Ledger dates are stored in this form so they sort and range-scan
+    correctly. Day-first ``DD.MM.YYYY`` / ``DD/MM/YYYY`` input is accepted.
+    Imports repeat the same few dates, so results are cached.
+    """
+    text = text.strip()
+    if _ISO_DATE.match(text):
+        date_type.fromisoformat(text)
+        return text
+    match = _DMY_DATE.match(text)
+    if not match:
+        raise ValueError(f"geçersiz tarih: {text!r}")
+    day, month, year = map(int, match.groups())
+    return date_type(year, month, day).isoformat()
+
+
+def init_db(path: Path, profile=DEFAULT_PROFILE, synchronous=None, profiler=None):
+    """Open, configure and migrate the database; ``profiler`` (see profiling.py) instruments it."""
+    if profiler is None:
+        conn = sqlite3.connect(path)
+    else:
+        conn = sqlite3.connect(path, factory=ProfiledConnection)
+        conn.profiler = profiler
+    # Off by default in SQLite; transactions.customer_id relies on it.
+    conn.execute("PRAGMA foreign_keys = ON")
+    apply_profile(conn, profile, synchronous)
+    migrate(conn)
+    return conn
+
+
+def apply_profile(conn, profile=DEFAULT_PROFILE, synchronous=None):
+    """Apply a connection profile from PROFILES, optionally overriding ``synchronous``."""
+    settings = dict(PROFILES[profile])
+    if synchronous is not None:
+        if synchronous.upper() not in SYNCHRONOUS_LEVELS:
+            raise ValueError(f"geçersiz synchronous seviyesi: {synchronous}")
+        settings["synchronous"] = synchronous.upper()
+    for name, value in settings.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+
+
+def checkpoint(conn, mode="PASSIVE"):
+    """Copy WAL frames back into the database file; returns (busy, log, checkpointed)."""
+    return conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+
+
+def close_db(conn):
+    """Refresh planner statistics and close; call once on shutdown."""
+    try:
+        conn.execute("PRAGMA optimize")
+        checkpoint(conn, "TRUNCATE")
+    finally:
+        conn.close()
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Apply every migration newer than the file's ``PRAGMA user_version``.
+
+    Each step runs in its own transaction together with the version bump, so
+    an interrupted upgrade leaves the file at the last completed version.
+    """
+    version = schema_version(conn)
+    if version > len(MIGRATIONS):
+        raise RuntimeError(
+            f"Veritabanı sürümü ({version}) bu uygulamadan yeni; lütfen uygulamayı güncelleyin"
+        )
+    for number, step in enumerate(MIGRATIONS[version:], start=version + 1):
+        conn.execute("BEGIN")
+        try:
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {number}")
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+def _migrate_base_schema(conn):
+    # Files created before versioning already have some of these objects.
+    cur = conn.cursor()
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS incomes(
+            id INTEGER PRIMARY KEY,
+            date TEXT,
+            description TEXT,
+            amount REAL
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS expenses(
+            id INTEGER PRIMARY KEY,
+            date TEXT,
+            description TEXT,
+            amount REAL
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS customers(
+            id INTEGER PRIMARY KEY,
+            name TEXT,
+            contact TEXT,
+            notes TEXT
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS import_jobs(
+            path TEXT NOT NULL,
+            target TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            rows_done INTEGER NOT NULL DEFAULT 0,
+            finished INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (path, target)
+        )
+        """
+    )
+    has_totals = cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ledger_totals'"
+    ).fetchone()
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ledger_totals(
+            kind TEXT NOT NULL,
+            grain TEXT NOT NULL,
+            period TEXT NOT NULL,
+            total REAL NOT NULL DEFAULT 0,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (kind, grain, period)
+        ) WITHOUT ROWID
+        """
+    )
+    for kind, table in _SPLIT_TABLES.items():
+        _create_split_totals_triggers(conn, kind, table)
+    if not has_totals:
+        _fill_split_totals(conn)
+
+
+def _create_split_totals_triggers(conn, kind, table, replace=False):
+    add = _SPLIT_TOTALS_UPSERT.format(kind=kind, sign="", row="NEW")
+    remove = _SPLIT_TOTALS_UPSERT.format(kind=kind, sign="-", row="OLD")
+    if replace:
+        for suffix in ("ai", "ad", "au"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {table}_totals_{suffix}")
+    _create_insert_hook(conn, table, f"{table}_totals_ai")
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_totals_ad AFTER DELETE ON {table} BEGIN {remove} END")
+    conn.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {table}_totals_au AFTER UPDATE OF date, amount ON {table} "
+        f"BEGIN {remove} {add} END"
+    )
+
+
+def _migrate_indexes_and_iso_dates(conn):
+    for table in _SPLIT_TABLES.values():
+        fixes = []
+        for entry_id, text in conn.execute(
+            f"SELECT id, date FROM {table} WHERE date(date) IS NOT date"
+        ):
+            try:
+                fixes.append((normalize_date(text), entry_id))
+            except ValueError:
+                pass  # Unrecognisable dates are kept as entered.
+        conn.executemany(f"UPDATE {table} SET date = ? WHERE id = ?", fixes)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_date ON {table}(date)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_amount ON {table}(amount)")
+    conn.execute("CREATE INDEX IF NOT EXISTS customers_name ON customers(name)")
+
+
+def has_fts5(conn):
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)")
+    except sqlite3.OperationalError:
+        return False
+    conn.execute("DROP TABLE temp._fts5_probe")
+    return True
+
+
+def _migrate_full_text_search(conn):
+    # Without FTS5 the same tables are created as plain tables so the triggers
+    # still work; search.py then falls back to LIKE over the folded text.
+    if has_fts5(conn):
+        conn.execute(f"CREATE VIRTUAL TABLE ledger_fts USING fts5(description, {_FTS_OPTIONS})")
+        conn.execute(f"CREATE VIRTUAL TABLE customers_fts USING fts5(name, contact, notes, {_FTS_OPTIONS})")
+    else:
+        conn.execute("CREATE TABLE ledger_fts(description TEXT)")
+        conn.execute("CREATE TABLE customers_fts(name TEXT, contact TEXT, notes TEXT)")
+
+    for kind, table in _SPLIT_TABLES.items():
+        _create_split_fts_triggers(conn, kind, table, fill=True)
+    conn.execute(
+        "CREATE TRIGGER customers_fts_ad AFTER DELETE ON customers "
+        "BEGIN DELETE FROM customers_fts WHERE rowid = OLD.id; END"
+    )
+    conn.execute(
+        f"CREATE TRIGGER customers_fts_au AFTER UPDATE OF name, contact, notes ON customers "
+        f"BEGIN UPDATE customers_fts SET name = {_FOLD.format('NEW.name')}, "
+        f"contact = {_FOLD.format('NEW.contact')}, notes = {_FOLD.format('NEW.notes')} "
+        f"WHERE rowid = OLD.id; END"
+    )
+    _create_insert_hook(conn, "customers", "customers_fts_ai", fill=True)
+
+
+def _create_split_fts_triggers(conn, kind, table, fill=False):
+    old_rowid = _SPLIT_FTS_ROWID.format(row="OLD", bit=_SPLIT_FTS_BIT[kind])
+    _create_insert_hook(conn, table, f"{table}_fts_ai", fill)
+    conn.execute(
+        f"CREATE TRIGGER {table}_fts_ad AFTER DELETE ON {table} "
+        f"BEGIN DELETE FROM ledger_fts WHERE rowid = {old_rowid}; END"
+    )
+    conn.execute(
+        f"CREATE TRIGGER {table}_fts_au AFTER UPDATE OF description ON {table} "
+        f"BEGIN UPDATE ledger_fts SET description = {_FOLD.format('NEW.description')} "
+        f"WHERE rowid = {old_rowid}; END"
+    )
+
+
+def _migrate_integer_amounts(conn):
+    # Amounts move from REAL lira to INTEGER kuruş. SQLite cannot change a
+    # column type in place, so each ledger table is rebuilt (ids are kept, so
+    # the search index stays valid) and its indexes and triggers recreated.
+    for kind, table in _SPLIT_TABLES.items():
+        conn.execute(
+            f"CREATE TABLE {table}_new(id INTEGER PRIMARY KEY, date TEXT, description TEXT, amount INTEGER)"
+        )
+        conn.execute(
+            f"INSERT INTO {table}_new (id, date, description, amount) "
+            f"SELECT id, date, description, CAST(round(amount * 100) AS INTEGER) FROM {table}"
+        )
+        conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+        conn.execute(f"CREATE INDEX {table}_date ON {table}(date)")
+        conn.execute(f"CREATE INDEX {table}_amount ON {table}(amount)")
+        _create_split_totals_triggers(conn, kind, table)
+        _create_split_fts_triggers(conn, kind, table)
+    conn.execute("DROP TABLE ledger_totals")
+    conn.execute(
+        """
+        CREATE TABLE ledger_totals(
+            kind TEXT NOT NULL,
+            grain TEXT NOT NULL,
+            period TEXT NOT NULL,
+            total INTEGER NOT NULL DEFAULT 0,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (kind, grain, period)
+        ) WITHOUT ROWID
+        """
+    )
+    _fill_split_totals(conn)
+
+
+def _migrate_daily_totals(conn):
+    # ledger_totals gains a 'day' grain; the triggers are recreated from the
+    # current template and every grain is recomputed.
+    for kind, table in _SPLIT_TABLES.items():
+        _create_split_totals_triggers(conn, kind, table, replace=True)
+    _fill_split_totals(conn)
+
+
+def _fill_split_totals(conn):
+    conn.execute("DELETE FROM ledger_totals")
+    for kind, table in _SPLIT_TABLES.items():
+        conn.execute(_SPLIT_TOTALS_CATCH_UP.format(kind=kind, table=table), {"last_id": 0})
+
+
+def _migrate_transactions(conn):
+    # incomes and expenses merge into one transactions table that can point
+    # at a customer. Rows get new ids in (date, kind, old id) order, so the
+    # search index is rebuilt; the summary table is recomputed from scratch.
+    conn.execute(
+        """
+        CREATE TABLE transactions(
+            id INTEGER PRIMARY KEY,
+            date TEXT,
+            description TEXT,
+            kind TEXT NOT NULL CHECK (kind IN ('income', 'expense')),
+            amount INTEGER,
+            customer_id INTEGER REFERENCES customers(id) ON DELETE SET NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO transactions (date, description, kind, amount)
+        SELECT date, description, kind, amount FROM (
+            SELECT id, date, description, 'income' AS kind, amount FROM incomes
+            UNION ALL
+            SELECT id, date, description, 'expense' AS kind, amount FROM expenses
+        )
+        ORDER BY date, kind, id
+        """
+    )
+    conn.execute("DROP TABLE incomes")
+    conn.execute("DROP TABLE expenses")
+    # (date, kind) + rowid matches the ledger's sort order, so pages are read
+    # straight off the index; the customer index covers balance queries.
+    conn.execute("CREATE INDEX transactions_date ON transactions(date, kind)")
+    conn.execute("CREATE INDEX transactions_amount ON transactions(amount)")
+    conn.execute(
+        "CREATE INDEX transactions_customer ON transactions(customer_id, kind, amount) "
+        "WHERE customer_id IS NOT NULL"
+    )
+
+    conn.execute("DROP TABLE ledger_fts")
+    if has_fts5(conn):
+        conn.execute(f"CREATE VIRTUAL TABLE ledger_fts USING fts5(description, {_FTS_OPTIONS})")
+    else:
+        conn.execute("CREATE TABLE ledger_fts(description TEXT)")
+    _create_fts_triggers(conn, fill=True)
+    _create_totals_triggers(conn)
+    _fill_totals(conn)
+
+
+def _create_totals_triggers(conn, replace=False):
+    add = _TOTALS_UPSERT.format(sign="", row="NEW")
+    remove = _TOTALS_UPSERT.format(sign="-", row="OLD")
+    if replace:
+        for suffix in ("ai", "ad", "au"):
+            conn.execute(f"DROP TRIGGER IF EXISTS transactions_totals_{suffix}")
+    _create_insert_hook(conn, "transactions", "transactions_totals_ai")
+    conn.execute(f"CREATE TRIGGER transactions_totals_ad AFTER DELETE ON transactions BEGIN {remove} END")
+    conn.execute(
+        f"CREATE TRIGGER transactions_totals_au AFTER UPDATE OF date, kind, amount ON transactions "
+        f"BEGIN {remove} {add} END"
+    )
+
+
+def _create_fts_triggers(conn, fill=False):
+    _create_insert_hook(conn, "transactions", "transactions_fts_ai", fill)
+    conn.execute(
+        "CREATE TRIGGER transactions_fts_ad AFTER DELETE ON transactions "
+        "BEGIN DELETE FROM ledger_fts WHERE rowid = OLD.id; END"
+    )
+    conn.execute(
+        f"CREATE TRIGGER transactions_fts_au AFTER UPDATE OF description ON transactions "
+        f"BEGIN UPDATE ledger_fts SET description = {_FOLD.format('NEW.description')} "
+        f"WHERE rowid = OLD.id; END"
+    )
+
+
+def _migrate_weekly_totals(conn):
+    # ledger_totals gains a 'week' grain for the dashboard charts.
+    _create_totals_triggers(conn, replace=True)
+    _fill_totals(conn)
+
+
+def _migrate_journal(conn):
+    # Append-only change journal behind undo/redo; see journal.py.
+    conn.execute(
+        """
+        CREATE TABLE journal_actions(
+            id INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL CHECK (kind IN ('do', 'undo', 'redo', 'restore')),
+            label TEXT NOT NULL,
+            undo_of INTEGER,
+            undone INTEGER NOT NULL DEFAULT 0,
+            snapshot TEXT,
+            created TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE journal(
+            id INTEGER PRIMARY KEY,
+            action INTEGER,
+            tbl TEXT NOT NULL,
+            op TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            data TEXT
+        )
+        """
+    )
+    conn.execute("CREATE INDEX journal_action ON journal(action)")
+    for event in ("UPDATE", "DELETE"):
+        conn.execute(
+            f"CREATE TRIGGER journal_no_{event.lower()} BEFORE {event} ON journal "
+            f"BEGIN SELECT RAISE(ABORT, 'journal is append-only'); END"
+        )
+    # Tables added later create their journal triggers in their own migration.
+    _create_journal_triggers(conn, "transactions", ("date", "description", "kind", "amount", "customer_id"))
+    _create_journal_triggers(conn, "customers", ("name", "contact", "notes"))
+
+
+def _create_journal_triggers(conn, table, columns):
+    _create_insert_hook(conn, table, f"{table}_journal_ai")
+    for create in _journal_triggers(table, columns).values():
+        conn.execute(create)
+
+
+def _migrate_recurring(conn):
+    # Recurring rules and the key that makes materializing an occurrence idempotent; see recurring.py.
+    conn.execute(
+        """
+        CREATE TABLE recurring_rules(
+            id INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            kind TEXT NOT NULL CHECK (kind IN ('income', 'expense')),
+            amount INTEGER NOT NULL CHECK (amount > 0),
+            customer_id INTEGER REFERENCES customers(id) ON DELETE SET NULL,
+            frequency TEXT NOT NULL CHECK (frequency IN ('daily', 'weekly', 'monthly', 'yearly')),
+            interval INTEGER NOT NULL DEFAULT 1 CHECK (interval >= 1),
+            start_date TEXT NOT NULL,
+            end_date TEXT,
+            next_index INTEGER NOT NULL DEFAULT 0,
+            next_date TEXT NOT NULL,
+            active INTEGER NOT NULL DEFAULT 1
+        )
+        """
+    )
+    conn.execute("ALTER TABLE transactions ADD COLUMN source_key TEXT")
+    conn.execute(
+        "CREATE UNIQUE INDEX transactions_source_key ON transactions(source_key) WHERE source_key IS NOT NULL"
+    )
+
+
+def _migrate_customer_accounts(conn):
+    # Payments received from customers and the cached per-customer account; see statements.py.
+    conn.execute(
+        """
+        CREATE TABLE payments(
+            id INTEGER PRIMARY KEY,
+            date TEXT NOT NULL,
+            customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
+            amount INTEGER NOT NULL CHECK (amount > 0),
+            note TEXT
+        )
+        """
+    )
+    conn.execute("CREATE INDEX payments_customer ON payments(customer_id, date)")
+    conn.execute(
+        """
+        CREATE TABLE customer_balances(
+            customer_id INTEGER PRIMARY KEY,
+            invoiced INTEGER NOT NULL DEFAULT 0,
+            credited INTEGER NOT NULL DEFAULT 0,
+            paid INTEGER NOT NULL DEFAULT 0,
+            aged_on TEXT,
+            age_0_30 INTEGER NOT NULL DEFAULT 0,
+            age_31_60 INTEGER NOT NULL DEFAULT 0,
+            age_61_90 INTEGER NOT NULL DEFAULT 0,
+            age_90 INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    # Statements and aging read a customer's entries in date order straight off this index.
+    conn.execute("DROP INDEX transactions_customer")
+    conn.execute(
+        "CREATE INDEX transactions_customer ON transactions(customer_id, kind, date, amount) "
+        "WHERE customer_id IS NOT NULL"
+    )
+    for table in _BALANCE_COLUMNS:
+        _create_insert_hook(conn, table, f"{table}_balance_ai", fill=True)
+        for create in _BALANCE_TRIGGERS[table]:
+            conn.execute(create)
+    conn.execute(
+        "CREATE TRIGGER customers_balance_ad AFTER DELETE ON customers "
+        "BEGIN DELETE FROM customer_balances WHERE customer_id = OLD.id; END"
+    )
+    _create_journal_triggers(conn, "payments", ("date", "customer_id", "amount", "note"))
+
+
+def _migrate_journal_source_key(conn):
+    # An undone delete or edit of a recurring occurrence keeps its source_key, so it is not written twice.
+    for suffix in ("ad", "au"):
+        conn.execute(f"DROP TRIGGER transactions_journal_{suffix}")
+    columns = ("date", "description", "kind", "amount", "customer_id", "source_key")
+    for create in _journal_triggers("transactions", columns).values():
+        conn.execute(create)
+
+
+# Append only: a file at user_version N has run exactly MIGRATIONS[:N].
+MIGRATIONS = [
+    _migrate_base_schema,
+    _migrate_indexes_and_iso_dates,
+    _migrate_full_text_search,
+    _migrate_integer_amounts,
+    _migrate_daily_totals,
+    _migrate_transactions,
+    _migrate_weekly_totals,
+    _migrate_journal,
+    _migrate_recurring,
+    _migrate_customer_accounts,
+    _migrate_journal_source_key,
+]
+
+
+def _fill_totals(conn):
+    conn.execute("DELETE FROM ledger_totals")
+    conn.execute(_TOTALS_CATCH_UP, {"last_id": 0})
+
+
+def rebuild_totals(conn):
+    """Recompute ledger_totals from scratch in a single transaction."""
+    with conn:
+        _fill_totals(conn)
+
+
+def verify_totals(conn):
+    """Return (kind, grain, period, stored, actual) for every drifted total (kuruş)."""
+    stored = {
+        (kind, grain, period): total
+        for kind, grain, period, total in conn.execute(
+            "SELECT kind, grain, period, total FROM ledger_totals WHERE count != 0"
+        )
+    }
+    actual = {}
+    for grain, expr in TOTALS_GRAINS.items():
+        expr = expr.format(date="date")
+        for kind, period, total in conn.execute(
+            f"SELECT kind, IFNULL({expr}, ''), IFNULL(SUM(amount), 0) FROM transactions GROUP BY 1, 2"
+        ):
+            actual[(kind, grain, period)] = total
+    mismatches = []
+    for key in sorted(stored.keys() | actual.keys()):
+        have, want = stored.get(key, 0), actual.get(key, 0)
+        if have != want:
+            mismatches.append((*key, have, want))
+    return mismatches
+
+
+def rebuild_customer_balances(conn):
+    """Recompute the customer_balances sums from scratch; aging is recomputed on next read."""
+    with conn:
+        conn.execute("DELETE FROM customer_balances")
+        for table in _BALANCE_COLUMNS:
+            conn.execute(_balance_sql(table)[2], {"last_id": 0})
+
+
+def verify_customer_balances(conn):
+    """Return (customer id, column, stored, actual) for every drifted customer sum (kuruş)."""
+    columns = [column for table in _BALANCE_COLUMNS.values() for column in table]
+    stored = {
+        row[0]: row[1:]
+        for row in conn.execute(f"SELECT customer_id, {', '.join(columns)} FROM customer_balances")
+    }
+    actual = {}
+    for table, sums in _BALANCE_COLUMNS.items():
+        sums = ", ".join(f"SUM({v.format(row=table)})" for v in sums.values())
+        for customer_id, *values in conn.execute(
+            f"SELECT customer_id, {sums} FROM {table} WHERE customer_id IS NOT NULL GROUP BY customer_id"
+        ):
+            actual.setdefault(customer_id, dict.fromkeys(columns, 0)).update(
+                zip(_BALANCE_COLUMNS[table], values)
+            )
+    mismatches = []
+    for customer_id in sorted(stored.keys() | actual.keys()):
+        have = dict(zip(columns, stored.get(customer_id, (0,) * len(columns))))
+        want = actual.get(customer_id, dict.fromkeys(columns, 0))
+        mismatches += [(customer_id, c, have[c], want[c]) for c in columns if have[c] != want[c]]
+    return mismatches
+
+
+def read_totals(conn, grain="all", period=""):
+    """Return (income, expense) in kuruş for one period straight from ledger_totals."""
+    totals = dict.fromkeys(KINDS, 0)
+    for kind, total in conn.execute(
+        "SELECT kind, total FROM ledger_totals WHERE grain = ? AND period = ?", (grain, period)
+    ):
+        totals[kind] = total
+    return totals["income"], totals["expense"]
+
+
+_RANGE_TOTAL_SQL = (
+    "SELECT IFNULL(SUM(total), 0) FROM ledger_totals WHERE kind = ? AND grain = ? AND period BETWEEN ? AND ?"
+)
+
+
+def _month_period(index):
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def _range_buckets(first, last):
+    """Split the inclusive date range into (grain, first period, last period) runs.
+
+    Partial months at either end become day runs, partial years month runs and
+    the rest one year run, so a range of any length is at most five index
+    range scans over ledger_totals.
+    """
+    buckets = []
+    if first.day != 1:
+        month_end = (first.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+        end = min(last, month_end)
+        buckets.append(("day", first.isoformat(), end.isoformat()))
+        if end == last:
+            return buckets
+        first = end + timedelta(days=1)
+    if last != date_type.max and (last + timedelta(days=1)).day != 1:
+        start = max(first, last.replace(day=1))
+        buckets.append(("day", start.isoformat(), last.isoformat()))
+        if start == first:
+            return buckets
+        last = start - timedelta(days=1)
+    # first is now the 1st of a month and last the end of one.
+    lo, hi = first.year * 12 + first.month - 1, last.year * 12 + last.month - 1
+    if lo % 12:
+        end = min(hi, lo - lo % 12 + 11)
+        buckets.append(("month", _month_period(lo), _month_period(end)))
+        lo = end + 1
+    if lo <= hi and hi % 12 != 11:
+        start = max(lo, hi - hi % 12)
+        buckets.append(("month", _month_period(start), _month_period(hi)))
+        hi = start - 1
+    if lo <= hi:
+        buckets.append(("year", f"{lo // 12:04d}", f"{hi // 12:04d}"))
+    return buckets
+
+
+def read_range_totals(conn, date_from=None, date_to=None):
+    """Return (income, expense) in kuruş for dates in ``[date_from, date_to]``.
+
+    Bounds are inclusive dates (``None`` leaves that end open) and are answered
+    from ledger_totals, so the cost does not depend on the ledger's size.
+    """
+    if date_from is None and date_to is None:
+        return read_totals(conn)
+    first = date_type.fromisoformat(normalize_date(date_from)) if date_from else date_type.min
+    last = date_type.fromisoformat(normalize_date(date_to)) if date_to else date_type.max
+    totals = dict.fromkeys(KINDS, 0)
+    if first > last:
+        return totals["income"], totals["expense"]
+    for grain, lo, hi in _range_buckets(first, last):
+        for kind in totals:
+            totals[kind] += conn.execute(_RANGE_TOTAL_SQL, (kind, grain, lo, hi)).fetchone()[0]
+    return totals["income"], totals["expense"]
+
+
+_ATTACHED_TOTALS_SQL = """
+    SELECT {index}, kind, IFNULL(SUM(total), 0) FROM {schema}.ledger_totals
+    WHERE kind IN ('income', 'expense') AND ({buckets}) GROUP BY kind"""
+
+
+def read_attached_totals(conn, schemas, date_from=None, date_to=None):
+    """(income, expense) for each attached database in ``schemas``, in one query.
+
+    Every schema must hold this app's current tables (see ATTACH). Bounds
+    work as in :func:`read_range_totals`. Returns a list in ``schemas`` order.
+    """
+    if date_from is None and date_to is None:
+        buckets = [("all", "", "")]
+    else:
+        first = date_type.fromisoformat(normalize_date(date_from)) if date_from else date_type.min
+        last = date_type.fromisoformat(normalize_date(date_to)) if date_to else date_type.max
+        if first > last:
+            return [(0, 0)] * len(schemas)
+        buckets = _range_buckets(first, last)
+    if not schemas:
+        return []
+    totals = [[0, 0] for _ in schemas]
+    where = " OR ".join(["(grain = ? AND period BETWEEN ? AND ?)"] * len(buckets))
+    params = [value for bucket in buckets for value in bucket]
+    sql = " UNION ALL ".join(
+        _ATTACHED_TOTALS_SQL.format(index=i, schema=schema, buckets=where) for i, schema in enumerate(schemas)
+    )
+    for index, kind, total in conn.execute(sql, params * len(schemas)):
+        totals[index][KINDS.index(kind)] = total
+    return [tuple(t) for t in totals]
+
+
+_SERIES_SQL = """
+    SELECT period,
+           SUM(CASE WHEN kind = 'income' THEN total ELSE 0 END),
+           SUM(CASE WHEN kind = 'expense' THEN total ELSE 0 END)
+    FROM ledger_totals
+    WHERE kind IN ('income', 'expense') AND grain = ? AND period BETWEEN ? AND ? AND count != 0
+    GROUP BY period ORDER BY period
+"""
+_PERIOD_WIDTHS = {"year": 4, "month": 7, "week": 10, "day": 10}
+
+
+def bucket_start(grain, day):
+    """First day of the ``grain`` bucket (year, month, week or day) containing ``day``."""
+    if grain == "year":
+        return day.replace(month=1, day=1)
+    if grain == "month":
+        return day.replace(day=1)
+    if grain == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def read_series(conn, grain, date_from=None, date_to=None):
+    """Return ``(opening, rows)`` for charting one grain of ledger_totals.
+
+    ``rows`` are ``(period, income, expense)`` in period order for the buckets
+    overlapping the inclusive date range (empty buckets are left out) and
+    ``opening`` is the balance before the first of those buckets.
+    """
+    width = _PERIOD_WIDTHS[grain]
+    lo, hi, opening = "0", "9", 0
+    if date_from:
+        first = bucket_start(grain, date_type.fromisoformat(normalize_date(date_from)))
+        lo = first.isoformat()[:width]
+        if first > date_type.min:
+            income, expense = read_range_totals(conn, None, (first - timedelta(days=1)).isoformat())
+            opening = income - expense
+    if date_to:
+        hi = bucket_start(grain, date_type.fromisoformat(normalize_date(date_to))).isoformat()[:width]
+    return opening, conn.execute(_SERIES_SQL, (grain, lo, hi)).fetchall()
+
+
+def data_version(conn):
+    """A value that changes whenever this or any other connection writes to the database."""
+    return conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes
+
+
+def start_action(conn, label, kind="do", undo_of=None, snapshot=None):
+    """Open a journal action; changes made after it, until the next one, belong to it.
+
+    Call inside the write transaction, before the changes. Returns the action id.
+    """
+    return conn.execute(
+        "INSERT INTO journal_actions (kind, label, undo_of, snapshot) VALUES (?, ?, ?, ?)",
+        (kind, label, undo_of, snapshot),
+    ).lastrowid
+
+
+@contextmanager
+def journal_paused(conn, table):
+    """Stop journaling deletes from ``table`` inside the block.
+
+    For deletes backed by a snapshot instead (see journal.py). Runs inside the
+    caller's transaction, like bulk_insert.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    conn.execute(f"DROP TRIGGER IF EXISTS {table}_journal_ad")
+    try:
+        yield
+    finally:
+        conn.execute(_JOURNAL_TRIGGERS[table]["delete"])
+
+
+_FTS_TABLES = {"transactions": "ledger_fts", "customers": "customers_fts"}
+# What emptying each table does to the summary tables, in place of its delete triggers.
+_TRUNCATE_SUMMARIES = {
+    "transactions": (
+        "DELETE FROM ledger_totals",
+        "UPDATE customer_balances SET invoiced = 0, credited = 0, aged_on = NULL",
+    ),
+    "customers": ("DELETE FROM customer_balances",),
+    "payments": ("UPDATE customer_balances SET paid = 0, aged_on = NULL",),
+}
+
+
+def truncate(conn, table):
+    """Delete every row of ``transactions``, ``customers`` or ``payments``; returns the row count.
+
+    The per-row delete triggers (summary totals, search index, journal) are
+    dropped for the statement and their effect applied to the whole table at
+    once: the summary tables are reset and the search index recreated empty.
+    Nothing is journaled, so callers snapshot first. Runs inside the caller's
+    transaction, like bulk_insert.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    triggers = [
+        (name, sql)
+        for name, sql in conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?", (table,)
+        )
+        if name.endswith("_ad")
+    ]
+    for name, _ in triggers:
+        conn.execute(f"DROP TRIGGER {name}")
+    count = conn.execute(f"DELETE FROM {table}").rowcount
+    for sql in _TRUNCATE_SUMMARIES[table]:
+        conn.execute(sql)
+    fts = _FTS_TABLES.get(table)
+    if fts:
+        create_fts = conn.execute("SELECT sql FROM sqlite_master WHERE name = ?", (fts,)).fetchone()[0]
+        conn.execute(f"DROP TABLE {fts}")
+        conn.execute(create_fts)
+    for _, sql in triggers:
+        conn.execute(sql)
+    return count
+
+
+def bulk_insert(conn, table, sql, rows):
+    """``executemany`` an INSERT into ``table`` without per-row triggers.
+
+    The table's insert triggers are dropped inside the current transaction and
+    their effect is applied once, set-based, to the new rows before the
+    triggers are recreated. The caller commits or rolls back; a rollback
+    restores the triggers along with everything else.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    hooks = _INSERT_HOOKS.get(table, ())
+    last_id = conn.execute(f"SELECT IFNULL(MAX(id), 0) FROM {table}").fetchone()[0]
+    for name, _, _ in hooks:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    try:
+        return conn.executemany(sql, rows).rowcount
+    finally:
+        for _, create, catch_up in hooks:
+            conn.execute(catch_up, {"last_id": last_id})
+            conn.execute(create)
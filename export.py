@@ -0,0 +1,102 @@
+"""Streaming CSV / JSON-lines export and the monthly profit & loss report.
+
+Rows are pulled from cursors in ``fetchmany`` batches and written as they
+arrive, so memory use does not grow with the size of the ledger.
+"""
+
+import csv
+import json
+import sys
+from contextlib import contextmanager
+
+from money import MINOR_PER_UNIT, to_decimal_string
+from repository import CustomerRepository, LedgerRepository
+
+
+LEDGER_FIELDS = ("id", "date", "description", "type", "amount", "customer")
+CUSTOMER_FIELDS = ("id", "name", "contact", "notes")
+REPORT_FIELDS = ("month", "income", "expense", "net", "balance")
+FORMATS = ("csv", "jsonl")
+
+
+def iter_ledger(conn):
+    """Yield ``(id, date, description, kind, amount, customer)`` for all entries in date order.
+
+    The rows stream off the (date, kind) index through one cursor, so no sort
+    buffer is built for the whole ledger.
+    """
+    return LedgerRepository(conn).iter_entries()
+
+
+def iter_monthly_report(conn):
+    """Yield ``(month, income, expense, net, running balance)`` from the monthly totals."""
+    cur = conn.execute(
+        """
+        SELECT period,
+               SUM(CASE WHEN kind = 'income' THEN total ELSE 0 END),
+               SUM(CASE WHEN kind = 'expense' THEN total ELSE 0 END)
+        FROM ledger_totals WHERE grain = 'month' AND count != 0
+        GROUP BY period ORDER BY period
+        """
+    )
+    balance = 0
+    for month, income, expense in cur:
+        balance += income - expense
+        yield month, income, expense, income - expense, balance
+
+
+@contextmanager
+def _open_output(path):
+    if str(path) == "-":
+        yield sys.stdout
+        return
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        yield f
+
+
+def _convert_money(rows, positions, convert):
+    if not positions:
+        return rows
+    return (
+        tuple(convert(v) if i in positions and v is not None else v for i, v in enumerate(row))
+        for row in rows
+    )
+
+
+def write_rows(rows, fields, path, fmt="csv", money_fields=()):
+    """Write an iterable of tuples to ``path`` (``-`` for stdout); returns the row count.
+
+    Columns named in ``money_fields`` hold kuruş and are written as decimal
+    lira: ``1234.56`` text in CSV, a JSON number in JSON lines (exact, as
+    two-decimal values round-trip through a double).
+    """
+    count = 0
+    positions = {fields.index(name) for name in money_fields}
+    with _open_output(path) as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(fields)
+            for row in _convert_money(rows, positions, to_decimal_string):
+                writer.writerow(row)
+                count += 1
+        elif fmt == "jsonl":
+            dumps, write = json.JSONEncoder(ensure_ascii=False).encode, f.write
+            for row in _convert_money(rows, positions, lambda minor: minor / MINOR_PER_UNIT):
+                write(dumps(dict(zip(fields, row))))
+                write("\n")
+                count += 1
+        else:
+            raise ValueError(f"bilinmeyen biçim: {fmt}")
+    return count
+
+
+def export_ledger(conn, path, fmt="csv"):
+    return write_rows(iter_ledger(conn), LEDGER_FIELDS, path, fmt, money_fields=("amount",))
+
+
+def export_customers(conn, path, fmt="csv"):
+    return write_rows(CustomerRepository(conn).iter_all(), CUSTOMER_FIELDS, path, fmt)
+
+
+def export_monthly_report(conn, path, fmt="csv"):
+    return write_rows(iter_monthly_report(conn), REPORT_FIELDS, path, fmt, money_fields=REPORT_FIELDS[1:])
@@ -0,0 +1,255 @@
+"""Streaming CSV import for ledger entries and customers.
+
+Files are read in chunks; each chunk is validated, written with
+``executemany`` and committed together with the job's progress in
+``import_jobs``, so an interrupted import resumes after the last committed
+chunk when run again on the same file.
+"""
+
+import csv
+import hashlib
+import time
+from itertools import islice
+from pathlib import Path
+
+from db import KINDS, normalize_date, start_action
+from money import Money
+from repository import CustomerRepository, LedgerRepository
+
+
+CHUNK_SIZE = 50_000
+
+# Header aliases, matched case-insensitively after stripping.
+LEDGER_COLUMNS = {
+    "date": ("date", "tarih", "işlem tarihi"),
+    "description": ("description", "açıklama", "aciklama"),
+    "amount": ("amount", "tutar", "miktar"),
+    "type": ("type", "kind", "tür", "tur"),
+    "customer": ("customer", "müşteri", "musteri"),
+}
+CUSTOMER_COLUMNS = {
+    "name": ("name", "ad", "müşteri adı", "musteri adi"),
+    "contact": ("contact", "iletişim", "iletisim"),
+    "notes": ("notes", "notlar", "not"),
+}
+TYPE_VALUES = {
+    "income": "income", "gelir": "income", "+": "income",
+    "expense": "expense", "gider": "expense", "-": "expense",
+}
+
+
+class CsvImportError(ValueError):
+    """The file cannot be imported (missing columns, invalid row without a rejects file)."""
+
+
+def _column_map(header, columns, required):
+    normalized = [h.strip().lower() for h in header]
+    mapping = {}
+    for name, aliases in columns.items():
+        for alias in aliases:
+            if alias in normalized:
+                mapping[name] = normalized.index(alias)
+                break
+    missing = [name for name in required if name not in mapping]
+    if missing:
+        raise CsvImportError(f"eksik sütun(lar): {', '.join(missing)}")
+    return mapping
+
+
+def _fingerprint(path):
+    # The whole file, read in blocks: an edit anywhere must not resume at a stale offset.
+    digest = hashlib.blake2b(digest_size=16)
+    size = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+            size += len(block)
+    return f"{size}:{digest.hexdigest()}"
+
+
+def _open_csv(path, encoding, delimiter):
+    f = open(path, newline="", encoding=encoding)
+    if delimiter is None:
+        sample = f.read(1 << 16)
+        f.seek(0)
+        try:
+            delimiter = csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+        except csv.Error:
+            delimiter = ","
+    return f, csv.reader(f, delimiter=delimiter)
+
+
+class ImportJob:
+    """One resumable import of ``path`` into ``target`` (``"ledger"`` or ``"customers"``).
+
+    ``kind`` applies to ledger imports: ``"income"``/``"expense"`` forces the
+    type of every row, ``"auto"`` reads a type column or falls back to the
+    sign of the amount (negative amounts are expenses).
+    """
+
+    def __init__(self, conn, path, target="ledger", kind="auto", chunk_size=CHUNK_SIZE,
+                 encoding="utf-8-sig", delimiter=None, rejects=None, progress=None):
+        self.conn = conn
+        self.path = Path(path).resolve()
+        self.target = target
+        self.kind = kind
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+        self.delimiter = delimiter
+        self.rejects = rejects
+        self.progress = progress
+        self.imported = 0
+        self.rejected = 0
+
+    def _job_state(self, restart):
+        fingerprint = _fingerprint(self.path)
+        key = (str(self.path), self.target)
+        row = self.conn.execute(
+            "SELECT fingerprint, rows_done, finished FROM import_jobs WHERE path = ? AND target = ?", key
+        ).fetchone()
+        if row and not restart:
+            old_fingerprint, rows_done, finished = row
+            if old_fingerprint == fingerprint:
+                return rows_done
+            if rows_done and not finished:
+                # Starting over would write the rows already committed a second time.
+                raise CsvImportError(
+                    f"{self.path.name} yarım kalan içe aktarmadan sonra değişmiş ({rows_done:,} satır "
+                    f"aktarılmıştı); baştan almak için --restart kullanın (aktarılan satırlar silinmez)"
+                )
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO import_jobs (path, target, fingerprint, rows_done, finished) "
+                "VALUES (?, ?, ?, 0, 0)",
+                (*key, fingerprint),
+            )
+        return 0
+
+    def run(self, restart=False):
+        """Import the file; returns the number of rows written by this run."""
+        skip = self._job_state(restart)
+        self._action_started = False
+        done = skip
+        started = time.perf_counter()
+        reject_file = reject_writer = None
+        f, reader = _open_csv(self.path, self.encoding, self.delimiter)
+        try:
+            header = next(reader, None)
+            if header is None:
+                raise CsvImportError("dosya boş")
+            if self.target == "ledger":
+                required = ("date", "description", "amount")
+                mapping = _column_map(header, LEDGER_COLUMNS, required)
+                convert = self._ledger_converter(mapping)
+            else:
+                mapping = _column_map(header, CUSTOMER_COLUMNS, ("name",))
+                convert = self._customer_converter(mapping)
+            if self.rejects:
+                reject_file = open(self.rejects, "a", newline="", encoding="utf-8")
+                reject_writer = csv.writer(reject_file)
+
+            for _ in islice(reader, skip):
+                pass
+            line = skip + 1
+            while True:
+                chunk = list(islice(reader, self.chunk_size))
+                if not chunk:
+                    break
+                batch = []
+                for row in chunk:
+                    line += 1
+                    if not row:
+                        continue
+                    try:
+                        values = convert(row)
+                    except (ValueError, IndexError) as e:
+                        if reject_writer is None:
+                            raise CsvImportError(f"{self.path.name}:{line}: {e}") from None
+                        reject_writer.writerow([line, str(e), *row])
+                        self.rejected += 1
+                        continue
+                    batch.append(values)
+                done += len(chunk)
+                self._write_chunk(batch, done)
+                self.imported += len(batch)
+                if self.progress:
+                    elapsed = time.perf_counter() - started
+                    self.progress(done, self.imported, self.rejected, elapsed)
+            with self.conn:
+                self.conn.execute(
+                    "UPDATE import_jobs SET finished = 1 WHERE path = ? AND target = ?",
+                    (str(self.path), self.target),
+                )
+        finally:
+            f.close()
+            if reject_file:
+                reject_file.close()
+        return self.imported
+
+    def _write_chunk(self, batch, done):
+        with self.conn:
+            if not self._action_started:
+                # One undoable action per run, however many chunks it commits.
+                start_action(self.conn, f"CSV içe aktarma: {self.path.name}")
+                self._action_started = True
+            if self.target == "ledger":
+                LedgerRepository(self.conn).add_many(batch, commit=False)
+            else:
+                CustomerRepository(self.conn).add_many(batch, commit=False)
+            self.conn.execute(
+                "UPDATE import_jobs SET rows_done = ? WHERE path = ? AND target = ?",
+                (done, str(self.path), self.target),
+            )
+
+    def _ledger_converter(self, mapping):
+        i_date, i_desc, i_amount = mapping["date"], mapping["description"], mapping["amount"]
+        i_type, i_customer = mapping.get("type"), mapping.get("customer")
+        forced = self.kind if self.kind in KINDS else None
+        customers = CustomerRepository(self.conn)
+        customer_ids = {}
+
+        def customer_id(name):
+            # Customers are matched by exact name; a file names few distinct ones.
+            if name not in customer_ids:
+                customer_ids[name] = customers.find(name)
+            if customer_ids[name] is None:
+                raise ValueError(f"bilinmeyen müşteri: {name!r}")
+            return customer_ids[name]
+
+        def convert(row):
+            amount = Money.parse(row[i_amount]).minor
+            if forced:
+                kind = forced
+            elif i_type is not None and row[i_type].strip():
+                kind = TYPE_VALUES.get(row[i_type].strip().lower())
+                if kind is None:
+                    raise ValueError(f"geçersiz tür: {row[i_type]!r}")
+            else:
+                kind = "expense" if amount < 0 else "income"
+            amount = abs(amount)
+            if amount == 0:
+                raise ValueError("tutar sıfır olamaz")
+            description = row[i_desc].strip()
+            if not description:
+                raise ValueError("açıklama boş")
+            customer = row[i_customer].strip() if i_customer is not None else ""
+            return (
+                normalize_date(row[i_date]), description, kind, amount,
+                customer_id(customer) if customer else None,
+            )
+
+        return convert
+
+    def _customer_converter(self, mapping):
+        i_name = mapping["name"]
+        i_contact, i_notes = mapping.get("contact"), mapping.get("notes")
+
+        def convert(row):
+            name = row[i_name].strip()
+            if not name:
+                raise ValueError("müşteri adı boş")
+            contact = row[i_contact].strip() if i_contact is not None else ""
+            notes = row[i_notes].strip() if i_notes is not None else ""
+            return name, contact, notes
+
+        return convert
@@ -0,0 +1,232 @@
+"""Undo/redo over the change journal, and database snapshots.
+
+Every write goes into the append-only ``journal`` table under a
+``journal_actions`` row (see ``db.start_action``). Undoing an action replays
+the inverse of its changes, newest first, as a new ``undo`` action; because
+that replay is journaled as well, redo is simply undoing the undo. Nothing in
+the journal is ever rewritten.
+
+Resets and very large deletes would journal every row, so they take a
+snapshot of the database with SQLite's online backup API instead, skip the
+per-row triggers, and are undone by restoring the snapshot into the open
+connection. That undo snapshots the state it replaces first, so redo
+restores that one in turn.
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from db import JOURNAL_COLUMNS, start_action, truncate
+
+
+# Snapshots kept per database besides those undo or redo can still restore;
+# older ones are deleted as new ones are taken.
+SNAPSHOT_KEEP = 5
+# Rows read from the journal per step while undoing.
+_REPLAY_BATCH = 10_000
+
+_UNDO_CANDIDATE_SQL = (
+    "SELECT id, label, snapshot FROM journal_actions "
+    "WHERE kind IN ('do', 'redo') AND undone = 0 ORDER BY id DESC LIMIT 1"
+)
+# A new action clears the redo stack: only undos after the last 'do' count.
+_REDO_CANDIDATE_SQL = """
+    SELECT id, label, snapshot FROM journal_actions
+    WHERE kind = 'undo' AND undone = 0
+      AND id > (SELECT IFNULL(MAX(id), 0) FROM journal_actions WHERE kind = 'do')
+    ORDER BY id DESC LIMIT 1
+"""
+# Snapshots behind the actions undo or redo can still reach (see _REDO_CANDIDATE_SQL).
+_LIVE_SNAPSHOTS_SQL = """
+    SELECT snapshot FROM journal_actions
+    WHERE snapshot IS NOT NULL AND undone = 0
+      AND (kind != 'undo' OR id > (SELECT IFNULL(MAX(id), 0) FROM journal_actions WHERE kind = 'do'))
+"""
+_HISTORY_SQL = "SELECT id, kind, label, undone, created FROM journal_actions ORDER BY id DESC LIMIT ?"
+
+
+def _inverse_sql(table, op, width):
+    # Entries logged before a column joined JOURNAL_COLUMNS hold only the first ``width`` values.
+    columns = JOURNAL_COLUMNS[table][:width]
+    if op == "insert":
+        return f"DELETE FROM {table} WHERE id = ?"
+    if op == "delete":
+        return f"INSERT INTO {table} (id, {', '.join(columns)}) VALUES (?{', ?' * len(columns)})"
+    return f"UPDATE {table} SET {', '.join(f'{c} = ?' for c in columns)} WHERE id = ?"
+
+
+def _inverse_params(op, row_id, data):
+    if op == "insert":
+        return (row_id,)
+    values = json.loads(data)
+    return (row_id, *values) if op == "delete" else (*values, row_id)
+
+
+def _replay_inverse(conn, action_id):
+    # Newest change first; runs of the same statement go through executemany.
+    before = None
+    while True:
+        sql = "SELECT id, tbl, op, row_id, data FROM journal WHERE action = ?"
+        params = [action_id]
+        if before is not None:
+            sql += " AND id < ?"
+            params.append(before)
+        rows = conn.execute(sql + " ORDER BY id DESC LIMIT ?", (*params, _REPLAY_BATCH)).fetchall()
+        if not rows:
+            return
+        run_key, run = None, []
+        for _id, table, op, row_id, data in rows:
+            inverse = _inverse_params(op, row_id, data)
+            key = (table, op, len(inverse) - 1)
+            if key != run_key and run:
+                conn.executemany(_inverse_sql(*run_key), run)
+                run = []
+            run_key = key
+            run.append(inverse)
+        conn.executemany(_inverse_sql(*run_key), run)
+        before = rows[-1][0]
+
+
+def _revert(conn, kind, candidate):
+    action_id, label, snapshot = candidate
+    if snapshot and kind == "undo":
+        # The snapshot predates the action, so restoring it drops the action too;
+        # the state it replaces is kept for redo.
+        after = take_snapshot(conn, "undo")
+        restore_snapshot(conn, snapshot, label=label, kind="undo", snapshot=str(after))
+        return label
+    if snapshot:
+        # Back to the state before the undo, whose journal still holds the action.
+        restore_snapshot(conn, snapshot, label=f"Yinelendi: {label}")
+        return label
+    with conn:
+        start_action(conn, label, kind, undo_of=action_id)
+        # A customer comes back before the transactions pointing at it.
+        conn.execute("PRAGMA defer_foreign_keys = ON")
+        _replay_inverse(conn, action_id)
+        conn.execute("UPDATE journal_actions SET undone = 1 WHERE id = ?", (action_id,))
+    return label
+
+
+def undo(conn):
+    """Undo the latest action; returns its label, or None if there is nothing to undo."""
+    candidate = conn.execute(_UNDO_CANDIDATE_SQL).fetchone()
+    return _revert(conn, "undo", candidate) if candidate else None
+
+
+def redo(conn):
+    """Redo the latest undone action; returns its label, or None if there is nothing to redo."""
+    candidate = conn.execute(_REDO_CANDIDATE_SQL).fetchone()
+    return _revert(conn, "redo", candidate) if candidate else None
+
+
+def history(conn, limit=50):
+    """Latest ``(id, kind, label, undone, created)`` journal actions, newest first."""
+    return conn.execute(_HISTORY_SQL, (limit,)).fetchall()
+
+
+def snapshot_dir(conn):
+    path = conn.execute("PRAGMA database_list").fetchone()[2]
+    if not path:
+        raise ValueError("bellekteki veritabanının anlık görüntüsü alınamaz")
+    path = Path(path)
+    return path.with_name(f"{path.stem}-snapshots")
+
+
+def list_snapshots(conn):
+    """Snapshot files of this database, newest first."""
+    folder = snapshot_dir(conn)
+    return sorted(folder.glob("*.db"), reverse=True) if folder.is_dir() else []
+
+
+def _live_snapshots(conn):
+    """Snapshot files undo or redo can still restore, from ``conn`` and, transitively, those files."""
+    live = set()
+    pending = [path for (path,) in conn.execute(_LIVE_SNAPSHOTS_SQL)]
+    while pending:
+        path = Path(pending.pop())
+        if path in live or not path.is_file():
+            continue
+        live.add(path)
+        # Restoring this file brings back its journal, and the snapshots that one refers to.
+        source = sqlite3.connect(f"file:{path.as_posix()}?mode=ro", uri=True)
+        try:
+            pending += [other for (other,) in source.execute(_LIVE_SNAPSHOTS_SQL)]
+        finally:
+            source.close()
+    return live
+
+
+def take_snapshot(conn, name="manual", keep=()):
+    """Copy the database with the online backup API; returns the snapshot path.
+
+    The copy is consistent even while the app keeps the database open. Call
+    outside a write transaction: uncommitted changes are not included.
+    Snapshots in ``keep`` are not pruned.
+    """
+    folder = snapshot_dir(conn)
+    folder.mkdir(exist_ok=True)
+    path = folder / f"{datetime.now():%Y%m%d-%H%M%S-%f}-{name}.db"
+    target = sqlite3.connect(path)
+    try:
+        conn.backup(target)
+        # The copy inherits WAL mode; a rollback journal keeps it a single file.
+        target.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        target.close()
+    live = _live_snapshots(conn) | {Path(other) for other in keep}
+    for old in [other for other in list_snapshots(conn) if other not in live][SNAPSHOT_KEEP:]:
+        old.unlink()
+    return path
+
+
+def restore_snapshot(conn, path, label=None, kind="restore", snapshot=None):
+    """Replace the database behind ``conn`` with a snapshot, in place.
+
+    The connection stays usable; the restore is recorded in the restored
+    journal as a ``kind`` action (by default a plain ``restore``), which undo
+    or redo reverses by restoring ``snapshot`` if given.
+    """
+    if not Path(path).is_file():
+        raise ValueError(f"anlık görüntü bulunamadı: {Path(path).name}")
+    source = sqlite3.connect(f"file:{Path(path).as_posix()}?mode=ro", uri=True)
+    try:
+        source.backup(conn)
+    finally:
+        source.close()
+    with conn:
+        start_action(conn, label or f"Anlık görüntü geri yüklendi: {Path(path).name}", kind, snapshot=snapshot)
+
+
+def restore_as_action(conn, path, label=None):
+    """Restore ``path`` as one undoable action; undo brings back the state it replaced.
+
+    That state is snapshotted first and kept while undo can reach it, so a
+    wrong restore loses nothing.
+    """
+    before = take_snapshot(conn, "pre-restore", keep=(path,))
+    restore_snapshot(conn, path, label=label, kind="do", snapshot=str(before))
+
+
+def snapshot_action(conn, label, name, change):
+    """Run ``change(conn)`` as one action that undo reverses by restoring a snapshot.
+
+    Deletes inside ``change`` should use db.journal_paused, since the snapshot
+    already holds the old rows. Returns what ``change`` returns.
+    """
+    path = take_snapshot(conn, name)
+    with conn:
+        start_action(conn, label, snapshot=str(path))
+        return change(conn)
+
+
+def reset_database(conn):
+    """Delete every transaction, customer, payment and recurring rule; undo restores the snapshot taken first."""
+    def clear(conn):
+        # Rules would otherwise write their occurrences straight back.
+        conn.execute("DELETE FROM recurring_rules")
+        return truncate(conn, "payments") + truncate(conn, "transactions") + truncate(conn, "customers")
+
+    return snapshot_action(conn, "Tüm veriler silindi", "reset", clear)
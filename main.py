@@ -1,558 +1,432 @@
-import sqlite3
+import argparse
+import os
+import sys
+import time
 from pathlib import Path
-from datetime import datetime
-import customtkinter as ctk
 
-
-DB_PATH = Path(__file__).parent / "data.db"
-
-
-def init_db(path: Path):
-    conn = sqlite3.connect(path)
-    cur = conn.cursor()
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS incomes(
-            id INTEGER PRIMARY KEY,
-            date TEXT,
-            description TEXT,
-            amount REAL
-        )
-        """
+STARTED = time.perf_counter()
+
+from db import (
+    DEFAULT_PROFILE,
+    PROFILES,
+    SYNCHRONOUS_LEVELS,
+    close_db,
+    init_db,
+    rebuild_customer_balances,
+    rebuild_totals,
+    verify_customer_balances,
+    verify_totals,
+)
+from companies import MAIN_COMPANY, Companies
+from money import format_amount
+from profiling import SLOW_QUERY_MS, Profiler
+
+
+# A frozen build runs from a temporary unpack directory; keep data next to the executable.
+APP_DIR = Path(sys.executable if getattr(sys, "frozen", False) else __file__).resolve().parent
+DB_PATH = APP_DIR / "data.db"
+# When set, the GUI writes its startup timings to this file and exits (see bench.py startup).
+STARTUP_PROBE_ENV = "MASTERACCOUNT_STARTUP_PROBE"
+# Password for encrypted backups when running unattended (e.g. from Task Scheduler); otherwise it is asked for.
+BACKUP_PASSWORD_ENV = "MASTERACCOUNT_BACKUP_PASSWORD"
+HISTORY_KINDS = {"do": "işlem", "undo": "geri al", "redo": "yinele", "restore": "geri yük"}
+
+
+def run_totals(conn, args):
+    if args.action == "rebuild":
+        rebuild_totals(conn)
+        rebuild_customer_balances(conn)
+        print("Toplamlar yeniden hesaplandı")
+        return 0
+    mismatches = verify_totals(conn)
+    for kind, grain, period, have, want in mismatches:
+        print(f"{kind} {grain} {period or '-'}: kayıtlı {format_amount(have)}, gerçek {format_amount(want)}")
+    customer_mismatches = verify_customer_balances(conn)
+    for customer_id, column, have, want in customer_mismatches:
+        print(f"müşteri {customer_id} {column}: kayıtlı {format_amount(have)}, gerçek {format_amount(want)}")
+    mismatches += customer_mismatches
+    if mismatches:
+        print("Toplamlar tutarsız; 'totals rebuild' ile düzeltin")
+        return 1
+    print("Toplamlar tutarlı")
+    return 0
+
+
+def run_history(conn, args):
+    import journal
+
+    if args.action == "list":
+        for action_id, kind, label, undone, created in reversed(journal.history(conn, args.limit)):
+            mark = " (geri alındı)" if undone else ""
+            print(f"{action_id:>6}  {created}  {HISTORY_KINDS[kind]:<8} {label}{mark}")
+        return 0
+    label = journal.undo(conn) if args.action == "undo" else journal.redo(conn)
+    if label is None:
+        print("Geri alınacak işlem yok" if args.action == "undo" else "Yinelenecek işlem yok")
+        return 1
+    print(f"{'Geri alındı' if args.action == 'undo' else 'Yinelendi'}: {label}")
+    return 0
+
+
+def run_companies(conn, args):
+    companies = Companies(args.db)
+    if args.action == "create":
+        if not args.name:
+            print("Şirket adı gerekli: companies create AD", file=sys.stderr)
+            return 2
+        try:
+            path = companies.create(args.name)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 1
+        print(f"Şirket oluşturuldu: {args.name.strip()} ({path})")
+        return 0
+    if args.action == "list":
+        for name, path in companies.list():
+            print(f"{name:<30} {path}")
+        return 0
+    totals = companies.totals(args.date_from, args.date_to)
+    for name, income, expense in totals:
+        if income is None:
+            print(f"{name:<30} henüz taşınmadı; şirketi bir kez açın: --company \"{name}\"")
+            continue
+        print(f"{name:<30} gelir {format_amount(income):>18}  gider {format_amount(expense):>18}  "
+              f"net {format_amount(income - expense):>18}")
+    totals = [t for t in totals if t[1] is not None]
+    income, expense = sum(t[1] for t in totals), sum(t[2] for t in totals)
+    print(f"{'TOPLAM':<30} gelir {format_amount(income):>18}  gider {format_amount(expense):>18}  "
+          f"net {format_amount(income - expense):>18}")
+    return 0
+
+
+def run_accounts(conn, args):
+    from money import Money
+    from repository import CustomerRepository, PaymentRepository
+    from statements import AGING_LABELS, accounts, statement
+
+    customers = CustomerRepository(conn)
+    if args.action == "list":
+        names = dict(customers.names(limit=-1))
+        rows = sorted(accounts(conn).items(), key=lambda item: item[1][1] - item[1][0])[:args.limit]
+        print(f"{'Müşteri':<30} {'Bakiye':>14}  " + "  ".join(f"{label:>12}" for label in AGING_LABELS))
+        for customer_id, (debit, credit, aging) in rows:
+            print(f"{names.get(customer_id, customer_id)!s:<30} {format_amount(debit - credit):>14}  "
+                  + "  ".join(f"{format_amount(amount):>12}" for amount in aging))
+        return 0
+    if not args.name:
+        print(f"Müşteri adı gerekli: accounts {args.action} AD", file=sys.stderr)
+        return 2
+    customer_id = customers.find(args.name)
+    if customer_id is None:
+        print(f"müşteri bulunamadı: {args.name}", file=sys.stderr)
+        return 1
+    try:
+        if args.action == "pay":
+            if not args.amount:
+                print("Tutar gerekli: accounts pay AD --amount …", file=sys.stderr)
+                return 2
+            day = args.date or time.strftime("%Y-%m-%d")
+            PaymentRepository(conn).add(customer_id, day, Money.parse(args.amount).minor, args.note or "")
+            print("Tahsilat eklendi")
+            return 0
+        opening, lines = statement(conn, customer_id, args.date_from, args.date_to)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    if args.date_from:
+        print(f"{'':<10}  {'Devir':<8} {'':<40} {'':>14} {'':>14} {format_amount(opening):>14}")
+    for day, doc, _row_id, desc, debit, credit, balance in lines:
+        print(f"{day:<10}  {doc:<8} {(desc or '')[:40]:<40} {format_amount(debit):>14} {format_amount(credit):>14} "
+              f"{format_amount(balance):>14}")
+    return 0
+
+
+def run_recurring(conn, args):
+    from money import Money
+    from recurring import materialize_due
+    from repository import CustomerRepository, RecurringRepository
+
+    rules = RecurringRepository(conn)
+    if args.action == "list":
+        for rule_id, desc, kind, amount, customer, frequency, interval, start, end, next_date, active in rules.all():
+            state = "" if active else " (durduruldu)"
+            print(f"{rule_id:>5}  {kind:<7} {format_amount(amount):>14}  her {interval} {frequency:<8} "
+                  f"sonraki {next_date}  bitiş {end or '-':<10}  {desc}{' / ' + customer if customer else ''}{state}")
+        return 0
+    if args.action == "run":
+        print(f"{materialize_due(conn):,} tekrarlayan kayıt eklendi")
+        return 0
+    if args.action == "add":
+        if not (args.description and args.amount and args.start):
+            print("Gerekli: recurring add --description … --amount … --start YYYY-AA-GG", file=sys.stderr)
+            return 2
+        try:
+            customer_id = None
+            if args.customer:
+                customer_id = CustomerRepository(conn).find(args.customer)
+                if customer_id is None:
+                    raise ValueError(f"müşteri bulunamadı: {args.customer}")
+            rule_id = rules.add(
+                args.kind, args.description, Money.parse(args.amount).minor, args.every, args.start,
+                interval=args.interval, end_date=args.end, customer_id=customer_id,
+            )
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 1
+        print(f"Kural eklendi: {rule_id}; {materialize_due(conn):,} kayıt yazıldı")
+        return 0
+    if args.rule is None:
+        print(f"Kural numarası gerekli: recurring {args.action} NO", file=sys.stderr)
+        return 2
+    if args.action == "delete":
+        rules.delete(args.rule)
+    else:
+        rules.set_active(args.rule, args.action == "resume")
+    print("Tamam")
+    return 0
+
+
+def _backup_password(args, confirm=False):
+    from getpass import getpass
+
+    password = os.environ.get(BACKUP_PASSWORD_ENV)
+    if password is None and args.encrypt:
+        password = getpass("Yedek şifresi: ")
+        if confirm and getpass("Şifre (tekrar): ") != password:
+            raise ValueError("şifreler eşleşmiyor")
+    return password or None
+
+
+def run_backup(conn, args):
+    import backup
+
+    folder = args.dir or backup.backup_dir(conn)
+    try:
+        if args.action == "create":
+            started = time.perf_counter()
+            path = backup.create_backup(conn, folder, incremental=not args.full,
+                                        password=_backup_password(args, confirm=True))
+            header = backup.read_header(path)
+            print(f"{'Tam' if header['kind'] == 'full' else 'Artımlı'} yedek alındı: {path} "
+                  f"({path.stat().st_size / 1e6:,.1f} MB, {time.perf_counter() - started:.1f} sn)")
+            return 0
+        archives = backup.list_backups(folder)
+        if args.action == "list":
+            for path in reversed(archives):
+                header = backup.read_header(path)
+                lock = " şifreli" if header["encrypted"] else ""
+                print(f"{path.name:<40} {header['kind']:<12} {path.stat().st_size / 1e6:>10,.1f} MB{lock}")
+            return 0
+        if args.name:
+            path = Path(folder) / args.name
+        elif archives:
+            path = archives[0]
+        else:
+            print("yedek bulunamadı", file=sys.stderr)
+            return 1
+        if backup.read_header(path)["encrypted"]:
+            args.encrypt = True
+        password = _backup_password(args)
+        if args.action == "verify":
+            backup.verify_backup(path, password)
+            print(f"Yedek sağlam: {path.name}")
+        elif args.to:
+            if args.to.exists():
+                raise ValueError(f"hedef dosya zaten var: {args.to}")
+            backup.rebuild(path, args.to, password)
+            print(f"Yedek geri yüklendi: {args.to}")
+        else:
+            backup.restore_backup(conn, path, password)
+            print(f"Yedek geri yüklendi: {path.name} (geri almak için: history undo)")
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+
+def run_import(conn, args):
+    from importer import CsvImportError, ImportJob
+
+    def progress(done, imported, rejected, elapsed):
+        rate = (imported + rejected) / elapsed if elapsed else 0
+        print(f"\r{done:,} satır işlendi, {imported:,} eklendi, {rejected:,} reddedildi ({rate:,.0f} satır/sn)",
+              end="", file=sys.stderr, flush=True)
+
+    job = ImportJob(
+        conn,
+        args.file,
+        target=args.target,
+        kind=args.kind,
+        chunk_size=args.chunk_size,
+        encoding=args.encoding,
+        delimiter=args.delimiter,
+        rejects=args.rejects,
+        progress=progress,
     )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS expenses(
-            id INTEGER PRIMARY KEY,
-            date TEXT,
-            description TEXT,
-            amount REAL
-        )
-        """
+    try:
+        job.run(restart=args.restart)
+    except CsvImportError as e:
+        print(f"\nİçe aktarma durdu: {e}", file=sys.stderr)
+        return 1
+    finally:
+        print(file=sys.stderr)
+    print(f"{job.imported:,} kayıt eklendi, {job.rejected:,} satır reddedildi")
+    return 0
+
+
+def run_export(conn, args):
+    import export
+
+    writers = {
+        "ledger": export.export_ledger,
+        "customers": export.export_customers,
+        "report": export.export_monthly_report,
+    }
+    count = writers[args.target](conn, args.file, args.format)
+    if str(args.file) != "-":
+        print(f"{count:,} satır yazıldı: {args.file}")
+    return 0
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="MasterAccount")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="veritabanı dosyası")
+    parser.add_argument("--profile", choices=tuple(PROFILES), default=DEFAULT_PROFILE,
+                        help="SQLite bağlantı profili (ağ klasörleri için 'safe')")
+    parser.add_argument("--synchronous", type=str.upper, choices=SYNCHRONOUS_LEVELS,
+                        help="profilin synchronous seviyesini geçersiz kıl")
+    parser.add_argument("--company", metavar="AD", default=MAIN_COMPANY,
+                        help="açılacak şirket (varsayılan: --db ile verilen ana şirket)")
+    parser.add_argument("--trace", type=Path, metavar="DOSYA",
+                        help="sorgu ve arayüz sürelerini baştan ölç; çıkışta rapor bu JSON dosyasına yazılır")
+    parser.add_argument("--slow-ms", type=float, default=SLOW_QUERY_MS,
+                        help="sorgu planı kaydedilecek yavaş sorgu eşiği (ms)")
+    commands = parser.add_subparsers(dest="command")
+
+    totals = commands.add_parser("totals", help="özet toplamları doğrula veya yeniden hesapla")
+    totals.add_argument("action", choices=("verify", "rebuild"))
+    totals.set_defaults(handler=run_totals)
+
+    history = commands.add_parser("history", help="değişiklik geçmişi, geri alma ve yineleme")
+    history.add_argument("action", choices=("list", "undo", "redo"))
+    history.add_argument("--limit", type=int, default=20, help="listelenecek işlem sayısı")
+    history.set_defaults(handler=run_history)
+
+    comp = commands.add_parser("companies", help="şirketleri listele, oluştur veya konsolide toplamları göster")
+    comp.add_argument("action", choices=("list", "create", "totals"))
+    comp.add_argument("name", nargs="?", help="oluşturulacak şirketin adı")
+    comp.add_argument("--from", dest="date_from", help="konsolide toplam başlangıç tarihi")
+    comp.add_argument("--to", dest="date_to", help="konsolide toplam bitiş tarihi")
+    comp.set_defaults(handler=run_companies)
+
+    acc = commands.add_parser("accounts", help="müşteri bakiyeleri, yaşlandırma, ekstre ve tahsilat")
+    acc.add_argument("action", choices=("list", "statement", "pay"))
+    acc.add_argument("name", nargs="?", help="müşteri adı (statement, pay)")
+    acc.add_argument("--limit", type=int, default=50, help="listelenecek müşteri sayısı (en yüksek bakiye önce)")
+    acc.add_argument("--from", dest="date_from", help="ekstre başlangıç tarihi")
+    acc.add_argument("--to", dest="date_to", help="ekstre bitiş tarihi")
+    acc.add_argument("--amount", help="tahsilat tutarı")
+    acc.add_argument("--date", help="tahsilat tarihi (varsayılan: bugün)")
+    acc.add_argument("--note", help="tahsilat notu")
+    acc.set_defaults(handler=run_accounts)
+
+    rec = commands.add_parser("recurring", help="tekrarlayan kuralları yönet ve zamanı gelen kayıtları yaz")
+    rec.add_argument("action", choices=("list", "add", "pause", "resume", "delete", "run"))
+    rec.add_argument("rule", nargs="?", type=int, help="kural numarası (pause, resume, delete)")
+    rec.add_argument("--kind", choices=("income", "expense"), default="expense")
+    rec.add_argument("--description")
+    rec.add_argument("--amount")
+    rec.add_argument("--every", choices=("daily", "weekly", "monthly", "yearly"), default="monthly")
+    rec.add_argument("--interval", type=int, default=1, help="kaç günde/haftada/ayda/yılda bir")
+    rec.add_argument("--start", help="ilk kaydın tarihi")
+    rec.add_argument("--end", help="son tarih (isteğe bağlı)")
+    rec.add_argument("--customer", help="müşteri adı")
+    rec.set_defaults(handler=run_recurring)
+
+    bak = commands.add_parser("backup", help="sıkıştırılmış (isteğe bağlı şifreli) yedek al, doğrula, geri yükle")
+    bak.add_argument("action", choices=("create", "list", "verify", "restore"))
+    bak.add_argument("name", nargs="?", help="yedek dosyası (verify, restore; varsayılan: en yenisi)")
+    bak.add_argument("--full", action="store_true", help="artımlı yerine tam yedek al")
+    bak.add_argument("--encrypt", action="store_true", help="yedeği şifrele (şifre sorulur)")
+    bak.add_argument("--dir", type=Path, help="yedek klasörü (varsayılan: veritabanının yanında)")
+    bak.add_argument("--to", type=Path, help="geri yüklemeyi açık veritabanı yerine bu yeni dosyaya yaz")
+    bak.set_defaults(handler=run_backup)
+
+    imp = commands.add_parser("import", help="CSV dosyasından toplu kayıt içe aktar")
+    imp.add_argument("target", choices=("ledger", "customers"))
+    imp.add_argument("file", type=Path)
+    imp.add_argument("--kind", choices=("auto", "income", "expense"), default="auto",
+                     help="kayıt türü; auto: tür sütunu veya tutarın işareti")
+    imp.add_argument("--chunk-size", type=int, default=50_000)
+    imp.add_argument("--encoding", default="utf-8-sig")
+    imp.add_argument("--delimiter", help="ayraç (varsayılan: otomatik algıla)")
+    imp.add_argument("--rejects", type=Path, help="geçersiz satırları bu dosyaya yaz ve atla")
+    imp.add_argument("--restart", action="store_true", help="yarım kalan işi sürdürmek yerine baştan başla")
+    imp.set_defaults(handler=run_import)
+
+    exp = commands.add_parser("export", help="kayıtları veya aylık kâr/zarar raporunu dışa aktar")
+    exp.add_argument("target", choices=("ledger", "customers", "report"))
+    exp.add_argument("file", type=Path, help="çıktı dosyası ('-' standart çıktı)")
+    exp.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    exp.set_defaults(handler=run_export)
+
+    return parser.parse_args(argv)
+
+
+def run_gui(args):
+    marks = {"start": STARTED}
+    # Tk and the page code load only now, so command-line runs never pay for them.
+    from app import MainApp
+    from backup import open_source
+    from worker import DbExecutor
+
+    marks["imports"] = time.perf_counter()
+    # Always attached so the settings page can switch measuring on; idle until then.
+    profiler = Profiler(enabled=args.trace is not None, slow_ms=args.slow_ms)
+
+    companies = Companies(args.db, connect=lambda path: init_db(path, args.profile, args.synchronous, profiler))
+
+    def close(conn):
+        if args.trace:
+            profiler.dump(args.trace, conn)
+        companies.close_all()
+
+    executor = DbExecutor(lambda: companies.open(args.company), close)
+    # Backups read the file on a connection of their own, so they never hold up the worker above.
+    backups = DbExecutor(
+        lambda: open_source(companies.path(args.company)), lambda conn: conn.close(), name="backup-worker"
     )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS customers(
-            id INTEGER PRIMARY KEY,
-            name TEXT,
-            contact TEXT,
-            notes TEXT
-        )
-        """
+    app = MainApp(
+        executor, startup_marks=marks, startup_probe=os.environ.get(STARTUP_PROBE_ENV), profiler=profiler,
+        companies=companies, company=args.company, backup_executor=backups,
     )
-    conn.commit()
-    return conn
-
-
-class MainApp(ctk.CTk):
-    def __init__(self, db_conn):
-        super().__init__()
-        self.conn = db_conn
-        self.title("MasterAccount — Masaüstü Muhasebe")
-        self.geometry("1200x700")
-        self.minsize(1000, 600)
-
-        ctk.set_appearance_mode("dark")
-        ctk.set_default_color_theme("dark-blue")
-
-        # Layout: sidebar + content
-        self.grid_columnconfigure(1, weight=1)
-        self.grid_rowconfigure(0, weight=1)
-
-        self.sidebar = ctk.CTkFrame(self, width=220, fg_color="#1a1a1a")
-        self.sidebar.grid(row=0, column=0, sticky="nswe")
-        self.sidebar.grid_propagate(False)
-
-        self.logo = ctk.CTkLabel(
-            self.sidebar,
-            text="MasterAccount",
-            font=ctk.CTkFont(size=18, weight="bold"),
-        )
-        self.logo.pack(pady=(20, 30))
-
-        self.btn_dashboard = ctk.CTkButton(
-            self.sidebar, text="📊 Dashboard", command=self.show_dashboard, height=40
-        )
-        self.btn_income_expense = ctk.CTkButton(
-            self.sidebar, text="💰 Gelir/Gider", command=self.show_income_expense, height=40
-        )
-        self.btn_customers = ctk.CTkButton(
-            self.sidebar, text="👥 Müşteriler", command=self.show_customers, height=40
-        )
-        self.btn_settings = ctk.CTkButton(
-            self.sidebar, text="⚙️ Ayarlar", command=self.show_settings, height=40
-        )
-
-        for w in (self.btn_dashboard, self.btn_income_expense, self.btn_customers, self.btn_settings):
-            w.pack(fill="x", padx=12, pady=8)
-
-        # Content frames
-        self.container = ctk.CTkFrame(self)
-        self.container.grid(row=0, column=1, sticky="nswe", padx=16, pady=16)
-        self.container.grid_rowconfigure(0, weight=1)
-        self.container.grid_columnconfigure(0, weight=1)
-
-        self.frames = {}
-        for F in (
-            self.DashboardFrame,
-            self.IncomeExpenseFrame,
-            self.CustomersFrame,
-            self.SettingsFrame,
-        ):
-            page_name = F.__name__
-            frame = F(parent=self.container, controller=self)
-            self.frames[page_name] = frame
-            frame.grid(row=0, column=0, sticky="nswe")
-
-        self.show_dashboard()
-
-    def show_frame(self, name: str):
-        frame = self.frames[name]
-        frame.tkraise()
-
-    def show_dashboard(self):
-        self.show_frame("DashboardFrame")
-        self.frames["DashboardFrame"].update_cards()
-
-    def show_income_expense(self):
-        self.show_frame("IncomeExpenseFrame")
-        self.frames["IncomeExpenseFrame"].refresh_table()
-
-    def show_customers(self):
-        self.show_frame("CustomersFrame")
-        self.frames["CustomersFrame"].refresh_table()
-
-    def show_settings(self):
-        self.show_frame("SettingsFrame")
-
-    class DashboardFrame(ctk.CTkFrame):
-        def __init__(self, parent, controller):
-            super().__init__(parent)
-            self.controller = controller
-            self.grid_columnconfigure((0, 1, 2), weight=1)
-
-            self.card_income = ctk.CTkFrame(self, corner_radius=12, fg_color="#2d3748")
-            self.card_balance = ctk.CTkFrame(self, corner_radius=12, fg_color="#2d3748")
-            self.card_expense = ctk.CTkFrame(self, corner_radius=12, fg_color="#2d3748")
-
-            self.card_income.grid(row=0, column=0, padx=12, pady=12, sticky="nwe")
-            self.card_balance.grid(row=0, column=1, padx=12, pady=12, sticky="nwe")
-            self.card_expense.grid(row=0, column=2, padx=12, pady=12, sticky="nwe")
-
-            self.lbl_income = ctk.CTkLabel(
-                self.card_income, text="Toplam Gelir", font=ctk.CTkFont(size=14, weight="bold")
-            )
-            self.val_income = ctk.CTkLabel(
-                self.card_income, text="0 ₺", font=ctk.CTkFont(size=28, weight="bold"), text_color="#4ade80"
-            )
-            self.lbl_income.pack(pady=(16, 4))
-            self.val_income.pack(pady=(0, 16))
-
-            self.lbl_balance = ctk.CTkLabel(
-                self.card_balance, text="Toplam Bakiye", font=ctk.CTkFont(size=14, weight="bold")
-            )
-            self.val_balance = ctk.CTkLabel(
-                self.card_balance, text="0 ₺", font=ctk.CTkFont(size=28, weight="bold"), text_color="#60a5fa"
-            )
-            self.lbl_balance.pack(pady=(16, 4))
-            self.val_balance.pack(pady=(0, 16))
-
-            self.lbl_expense = ctk.CTkLabel(
-                self.card_expense, text="Toplam Gider", font=ctk.CTkFont(size=14, weight="bold")
-            )
-            self.val_expense = ctk.CTkLabel(
-                self.card_expense, text="0 ₺", font=ctk.CTkFont(size=28, weight="bold"), text_color="#f87171"
-            )
-            self.lbl_expense.pack(pady=(16, 4))
-            self.val_expense.pack(pady=(0, 16))
-
-        def update_cards(self):
-            cur = self.controller.conn.cursor()
-            cur.execute("SELECT COALESCE(SUM(amount),0) FROM incomes")
-            total_income = cur.fetchone()[0] or 0
-            cur.execute("SELECT COALESCE(SUM(amount),0) FROM expenses")
-            total_expense = cur.fetchone()[0] or 0
-            balance = total_income - total_expense
-
-            self.val_income.configure(text=f"{total_income:,.2f} ₺")
-            self.val_expense.configure(text=f"{total_expense:,.2f} ₺")
-            color = "#4ade80" if balance >= 0 else "#f87171"
-            self.val_balance.configure(text=f"{balance:,.2f} ₺", text_color=color)
-
-    class IncomeExpenseFrame(ctk.CTkFrame):
-        def __init__(self, parent, controller):
-            super().__init__(parent)
-            self.controller = controller
-            self.grid_columnconfigure(0, weight=1)
-            self.grid_rowconfigure(1, weight=1)
-
-            # Form Frame
-            form_frame = ctk.CTkFrame(self, fg_color="#2d3748", corner_radius=12)
-            form_frame.grid(row=0, column=0, sticky="ew", padx=0, pady=(0, 16))
-            form_frame.grid_columnconfigure(1, weight=1)
-
-            ctk.CTkLabel(form_frame, text="Tür", font=ctk.CTkFont(size=12, weight="bold")).grid(
-                row=0, column=0, padx=12, pady=(12, 4), sticky="w"
-            )
-            self.var_type = ctk.StringVar(value="Gelir")
-            type_menu = ctk.CTkOptionMenu(
-                form_frame, values=["Gelir", "Gider"], variable=self.var_type
-            )
-            type_menu.grid(row=0, column=1, padx=12, pady=(12, 4), sticky="ew")
-
-            ctk.CTkLabel(form_frame, text="Tarih", font=ctk.CTkFont(size=12, weight="bold")).grid(
-                row=1, column=0, padx=12, pady=4, sticky="w"
-            )
-            self.date_entry = ctk.CTkEntry(form_frame)
-            self.date_entry.insert(0, datetime.now().strftime("%Y-%m-%d"))
-            self.date_entry.grid(row=1, column=1, padx=12, pady=4, sticky="ew")
-
-            ctk.CTkLabel(form_frame, text="Açıklama", font=ctk.CTkFont(size=12, weight="bold")).grid(
-                row=2, column=0, padx=12, pady=4, sticky="w"
-            )
-            self.desc_entry = ctk.CTkEntry(form_frame, placeholder_text="Örn: Danışmanlık hizmeti")
-            self.desc_entry.grid(row=2, column=1, padx=12, pady=4, sticky="ew")
-
-            ctk.CTkLabel(form_frame, text="Tutar (₺)", font=ctk.CTkFont(size=12, weight="bold")).grid(
-                row=3, column=0, padx=12, pady=4, sticky="w"
-            )
-            self.amount_entry = ctk.CTkEntry(form_frame, placeholder_text="0.00")
-            self.amount_entry.grid(row=3, column=1, padx=12, pady=4, sticky="ew")
-
-            btn_add = ctk.CTkButton(
-                form_frame, text="Kaydet", command=self.save_entry, height=36, fg_color="#10b981"
-            )
-            btn_add.grid(row=4, column=0, columnspan=2, padx=12, pady=12, sticky="ew")
-
-            # Table Frame
-            table_frame = ctk.CTkFrame(self, fg_color="#2d3748", corner_radius=12)
-            table_frame.grid(row=1, column=0, sticky="nsew", padx=0, pady=0)
-            table_frame.grid_rowconfigure(1, weight=1)
-            table_frame.grid_columnconfigure(0, weight=1)
-
-            ctk.CTkLabel(
-                table_frame, text="Gelir ve Gider Kayıtları", font=ctk.CTkFont(size=14, weight="bold")
-            ).grid(row=0, column=0, padx=12, pady=(12, 8), sticky="w")
-
-            from tkinter import ttk
-
-            style = ttk.Style()
-            style.theme_use("clam")
-            style.configure("Treeview", background="#1a1a1a", foreground="white", fieldbackground="#2d3748")
-            style.configure("Treeview.Heading", background="#3f3f3f", foreground="white")
-            style.map("Treeview", background=[("selected", "#10b981")])
-
-            self.tree = ttk.Treeview(
-                table_frame,
-                columns=("id", "date", "desc", "type", "amount"),
-                height=12,
-                show="headings",
-            )
-            self.tree.column("id", width=40, anchor="center")
-            self.tree.column("date", width=100, anchor="center")
-            self.tree.column("desc", width=250, anchor="w")
-            self.tree.column("type", width=80, anchor="center")
-            self.tree.column("amount", width=120, anchor="e")
-
-            self.tree.heading("id", text="ID")
-            self.tree.heading("date", text="Tarih")
-            self.tree.heading("desc", text="Açıklama")
-            self.tree.heading("type", text="Tür")
-            self.tree.heading("amount", text="Tutar (₺)")
-
-            scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
-            self.tree.configure(yscroll=scrollbar.set)
-
-            self.tree.grid(row=1, column=0, sticky="nsew", padx=12, pady=(0, 12))
-            scrollbar.grid(row=1, column=1, sticky="nse", padx=(0, 12), pady=(0, 12))
-
-            btn_delete = ctk.CTkButton(
-                table_frame,
-                text="Sil",
-                command=self.delete_selected,
-                height=32,
-                fg_color="#ef4444",
-                width=100,
-            )
-            btn_delete.grid(row=2, column=0, padx=12, pady=(0, 12), sticky="e")
-
-        def save_entry(self):
-            try:
-                date = self.date_entry.get()
-                desc = self.desc_entry.get()
-                amount = float(self.amount_entry.get())
-                entry_type = self.var_type.get()
-
-                if not desc:
-                    raise ValueError("Açıklama boş olamaz")
-                if amount <= 0:
-                    raise ValueError("Tutar sıfırdan büyük olmalı")
-
-                table = "incomes" if entry_type == "Gelir" else "expenses"
-                cur = self.controller.conn.cursor()
-                cur.execute(
-                    f"INSERT INTO {table} (date, description, amount) VALUES (?, ?, ?)",
-                    (date, desc, amount),
-                )
-                self.controller.conn.commit()
-
-                self.desc_entry.delete(0, "end")
-                self.amount_entry.delete(0, "end")
-                self.refresh_table()
-                self.controller.show_frame("DashboardFrame")
-                self.controller.frames["DashboardFrame"].update_cards()
-            except ValueError as e:
-                self._show_error(f"Hata: {e}")
-            except Exception as e:
-                self._show_error(f"Kayıt hatası: {e}")
-
-        def delete_selected(self):
-            selection = self.tree.selection()
-            if not selection:
-                self._show_error("Silmek için kayıt seçiniz")
-                return
-
-            item = selection[0]
-            record_id = self.tree.item(item)["values"][0]
-            entry_type = self.tree.item(item)["values"][3]
-
-            table = "incomes" if entry_type == "Gelir" else "expenses"
-            cur = self.controller.conn.cursor()
-            cur.execute(f"DELETE FROM {table} WHERE id = ?", (record_id,))
-            self.controller.conn.commit()
-            self.refresh_table()
-            self.controller.frames["DashboardFrame"].update_cards()
-
-        def refresh_table(self):
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-
-            cur = self.controller.conn.cursor()
-            cur.execute("SELECT * FROM incomes ORDER BY date DESC")
-            for row in cur.fetchall():
-                self.tree.insert("", "end", values=(row[0], row[1], row[2], "Gelir", f"{row[3]:,.2f}"))
-
-            cur.execute("SELECT * FROM expenses ORDER BY date DESC")
-            for row in cur.fetchall():
-                self.tree.insert("", "end", values=(row[0], row[1], row[2], "Gider", f"{row[3]:,.2f}"))
-
-        def _show_error(self, msg):
-            error_frame = ctk.CTkFrame(self)
-            error_frame.place(relx=0.5, rely=0.5, anchor="center")
-            ctk.CTkLabel(error_frame, text=msg, text_color="#f87171").pack(padx=20, pady=10)
-            error_frame.after(3000, error_frame.destroy)
-
-    class CustomersFrame(ctk.CTkFrame):
-        def __init__(self, parent, controller):
-            super().__init__(parent)
-            self.controller = controller
-            self.grid_columnconfigure(0, weight=1)
-            self.grid_rowconfigure(1, weight=1)
-
-            # Form Frame
-            form_frame = ctk.CTkFrame(self, fg_color="#2d3748", corner_radius=12)
-            form_frame.grid(row=0, column=0, sticky="ew", padx=0, pady=(0, 16))
-            form_frame.grid_columnconfigure(1, weight=1)
-
-            ctk.CTkLabel(form_frame, text="Müşteri Adı", font=ctk.CTkFont(size=12, weight="bold")).grid(
-                row=0, column=0, padx=12, pady=(12, 4), sticky="w"
-            )
-            self.name_entry = ctk.CTkEntry(form_frame, placeholder_text="Örn: Şirket Adı")
-            self.name_entry.grid(row=0, column=1, padx=12, pady=(12, 4), sticky="ew")
-
-            ctk.CTkLabel(form_frame, text="İletişim", font=ctk.CTkFont(size=12, weight="bold")).grid(
-                row=1, column=0, padx=12, pady=4, sticky="w"
-            )
-            self.contact_entry = ctk.CTkEntry(form_frame, placeholder_text="Örn: +90 555 123 4567 / email")
-            self.contact_entry.grid(row=1, column=1, padx=12, pady=4, sticky="ew")
-
-            ctk.CTkLabel(form_frame, text="Notlar", font=ctk.CTkFont(size=12, weight="bold")).grid(
-                row=2, column=0, padx=12, pady=4, sticky="w"
-            )
-            self.notes_entry = ctk.CTkEntry(form_frame, placeholder_text="Ek bilgiler")
-            self.notes_entry.grid(row=2, column=1, padx=12, pady=4, sticky="ew")
-
-            btn_add = ctk.CTkButton(
-                form_frame, text="Ekle", command=self.add_customer, height=36, fg_color="#10b981"
-            )
-            btn_add.grid(row=3, column=0, columnspan=2, padx=12, pady=12, sticky="ew")
-
-            # Table Frame
-            table_frame = ctk.CTkFrame(self, fg_color="#2d3748", corner_radius=12)
-            table_frame.grid(row=1, column=0, sticky="nsew", padx=0, pady=0)
-            table_frame.grid_rowconfigure(1, weight=1)
-            table_frame.grid_columnconfigure(0, weight=1)
-
-            ctk.CTkLabel(
-                table_frame, text="Müşteri Listesi", font=ctk.CTkFont(size=14, weight="bold")
-            ).grid(row=0, column=0, padx=12, pady=(12, 8), sticky="w")
-
-            from tkinter import ttk
-
-            style = ttk.Style()
-            style.theme_use("clam")
-            style.configure("Treeview", background="#1a1a1a", foreground="white", fieldbackground="#2d3748")
-            style.configure("Treeview.Heading", background="#3f3f3f", foreground="white")
-            style.map("Treeview", background=[("selected", "#10b981")])
-
-            self.tree = ttk.Treeview(
-                table_frame, columns=("id", "name", "contact", "notes"), height=12, show="headings"
-            )
-            self.tree.column("id", width=40, anchor="center")
-            self.tree.column("name", width=150, anchor="w")
-            self.tree.column("contact", width=200, anchor="w")
-            self.tree.column("notes", width=300, anchor="w")
-
-            self.tree.heading("id", text="ID")
-            self.tree.heading("name", text="Müşteri Adı")
-            self.tree.heading("contact", text="İletişim")
-            self.tree.heading("notes", text="Notlar")
-
-            scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
-            self.tree.configure(yscroll=scrollbar.set)
-
-            self.tree.grid(row=1, column=0, sticky="nsew", padx=12, pady=(0, 12))
-            scrollbar.grid(row=1, column=1, sticky="nse", padx=(0, 12), pady=(0, 12))
-
-            btn_delete = ctk.CTkButton(
-                table_frame,
-                text="Sil",
-                command=self.delete_customer,
-                height=32,
-                fg_color="#ef4444",
-                width=100,
-            )
-            btn_delete.grid(row=2, column=0, padx=12, pady=(0, 12), sticky="e")
-
-        def add_customer(self):
-            try:
-                name = self.name_entry.get()
-                contact = self.contact_entry.get()
-                notes = self.notes_entry.get()
-
-                if not name:
-                    raise ValueError("Müşteri adı boş olamaz")
-
-                cur = self.controller.conn.cursor()
-                cur.execute(
-                    "INSERT INTO customers (name, contact, notes) VALUES (?, ?, ?)",
-                    (name, contact, notes),
-                )
-                self.controller.conn.commit()
-
-                self.name_entry.delete(0, "end")
-                self.contact_entry.delete(0, "end")
-                self.notes_entry.delete(0, "end")
-                self.refresh_table()
-            except ValueError as e:
-                self._show_error(f"Hata: {e}")
-
-        def delete_customer(self):
-            selection = self.tree.selection()
-            if not selection:
-                self._show_error("Silmek için kayıt seçiniz")
-                return
-
-            item = selection[0]
-            customer_id = self.tree.item(item)["values"][0]
-            cur = self.controller.conn.cursor()
-            cur.execute("DELETE FROM customers WHERE id = ?", (customer_id,))
-            self.controller.conn.commit()
-            self.refresh_table()
-
-        def refresh_table(self):
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-
-            cur = self.controller.conn.cursor()
-            cur.execute("SELECT * FROM customers ORDER BY name")
-            for row in cur.fetchall():
-                self.tree.insert("", "end", values=row)
-
-        def _show_error(self, msg):
-            error_frame = ctk.CTkFrame(self)
-            error_frame.place(relx=0.5, rely=0.5, anchor="center")
-            ctk.CTkLabel(error_frame, text=msg, text_color="#f87171").pack(padx=20, pady=10)
-            error_frame.after(3000, error_frame.destroy)
-
-    class SettingsFrame(ctk.CTkFrame):
-        def __init__(self, parent, controller):
-            super().__init__(parent)
-            self.controller = controller
-            self.grid_columnconfigure(0, weight=1)
-            self.grid_rowconfigure(0, weight=1)
-
-            settings_frame = ctk.CTkFrame(self, fg_color="#2d3748", corner_radius=12)
-            settings_frame.pack(padx=20, pady=20, fill="both", expand=True)
-
-            ctk.CTkLabel(
-                settings_frame,
-                text="⚙️ Uygulamaya Ait Bilgiler",
-                font=ctk.CTkFont(size=18, weight="bold"),
-            ).pack(pady=(20, 10))
-
-            info_text = """
-            MasterAccount - Masaüstü Muhasebe Uygulaması
-            
-            Sürüm: 1.0.0
-            Python ile geliştirilmiştir.
-            
-            Özellikler:
-            • Dashboard: Anlık gelir, gider ve bakiye gösterme
-            • Gelir/Gider: Kayıt ekleme, listeleme ve silme
-            • Müşteriler: Müşteri bilgilerini yönetme
-            • Yerel Veritabanı: Veriler lokal olarak güvenli şekilde saklanır
-            
-            Veritabanı Dosyası:
-            data.db (uygulama dizininde)
-            
-            © 2026 - Tüm Hakları Saklıdır
-            """
-
-            ctk.CTkLabel(
-                settings_frame, text=info_text, justify="left", font=ctk.CTkFont(size=12)
-            ).pack(padx=20, pady=20, anchor="nw")
-
-            btn_reset = ctk.CTkButton(
-                settings_frame,
-                text="🗑️ Tüm Verileri Sil (Dikkat!)",
-                command=self.reset_database,
-                fg_color="#ef4444",
-                height=40,
-            )
-            btn_reset.pack(padx=20, pady=(20, 20), fill="x")
-
-        def reset_database(self):
-            try:
-                cur = self.controller.conn.cursor()
-                cur.execute("DELETE FROM incomes")
-                cur.execute("DELETE FROM expenses")
-                cur.execute("DELETE FROM customers")
-                self.controller.conn.commit()
-                self._show_message("Veritabanı sıfırlandı")
-                self.controller.show_dashboard()
-            except Exception as e:
-                self._show_error(f"Hata: {e}")
-
-        def _show_error(self, msg):
-            error_frame = ctk.CTkFrame(self)
-            error_frame.place(relx=0.5, rely=0.5, anchor="center")
-            ctk.CTkLabel(error_frame, text=msg, text_color="#f87171").pack(padx=20, pady=10)
-            error_frame.after(3000, error_frame.destroy)
-
-        def _show_message(self, msg):
-            msg_frame = ctk.CTkFrame(self)
-            msg_frame.place(relx=0.5, rely=0.5, anchor="center")
-            ctk.CTkLabel(msg_frame, text=msg, text_color="#4ade80").pack(padx=20, pady=10)
-            msg_frame.after(3000, msg_frame.destroy)
-
-
-def main():
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = init_db(DB_PATH)
-    app = MainApp(conn)
     app.mainloop()
+    return 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    args.db.parent.mkdir(parents=True, exist_ok=True)
+    if not args.command:
+        # The worker opens (and if needed migrates) the database while the window paints.
+        return run_gui(args)
+    profiler = Profiler(enabled=True, slow_ms=args.slow_ms) if args.trace else None
+    try:
+        path = Companies(args.db).path(args.company)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    if path != args.db and not path.is_file():
+        print(f"şirket bulunamadı: {args.company}", file=sys.stderr)
+        return 2
+    conn = init_db(path, args.profile, args.synchronous, profiler)
+    try:
+        return args.handler(conn, args)
+    finally:
+        if profiler is not None:
+            profiler.dump(args.trace, conn)
+        close_db(conn)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Exact money amounts as integer minor units (kuruş).
+
+Amounts are stored, summed and compared as ``int`` kuruş everywhere; text is
+only parsed on input and produced for display or export.
+"""
+
+import re
+from functools import total_ordering
+
+
+MINOR_PER_UNIT = 100
+CURRENCY = "₺"
+
+_AMOUNT = re.compile(r"([+-]?)(\d+)(?:\.(\d{1,2}))?$")
+
+
+@total_ordering
+class Money:
+    """An immutable amount of Turkish lira held as integer kuruş."""
+
+    __slots__ = ("minor",)
+
+    def __init__(self, minor=0):
+        if not isinstance(minor, int):
+            raise TypeError("Money is built from integer kuruş; use Money.parse for text")
+        object.__setattr__(self, "minor", minor)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Money is immutable")
+
+    @classmethod
+    def parse(cls, text):
+        """Parse ``1234.56``, ``1234,56``, ``1.234,56`` or ``1,234.56`` exactly.
+
+        Raises ValueError for anything else, including more than two decimals.
+        """
+        cleaned = text.strip().replace(" ", "").replace(CURRENCY, "").replace("TL", "")
+        if "," in cleaned and "." in cleaned:
+            if cleaned.rfind(",") > cleaned.rfind("."):
+                cleaned = cleaned.replace(".", "").replace(",", ".")
+            else:
+                cleaned = cleaned.replace(",", "")
+        elif "," in cleaned:
+            cleaned = cleaned.replace(",", ".")
+        match = _AMOUNT.match(cleaned)
+        if not match:
+            raise ValueError(f"geçersiz tutar: {text!r}")
+        sign, units, fraction = match.groups()
+        minor = int(units) * MINOR_PER_UNIT + int((fraction or "0").ljust(2, "0"))
+        return cls(-minor if sign == "-" else minor)
+
+    def __add__(self, other):
+        if isinstance(other, Money):
+            return Money(self.minor + other.minor)
+        return NotImplemented
+
+    def __sub__(self, other):
+        if isinstance(other, Money):
+            return Money(self.minor - other.minor)
+        return NotImplemented
+
+    def __neg__(self):
+        return Money(-self.minor)
+
+    def __abs__(self):
+        return Money(abs(self.minor))
+
+    def __bool__(self):
+        return self.minor != 0
+
+    def __eq__(self, other):
+        if isinstance(other, Money):
+            return self.minor == other.minor
+        return NotImplemented
+
+    def __lt__(self, other):
+        if isinstance(other, Money):
+            return self.minor < other.minor
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.minor)
+
+    def __repr__(self):
+        return f"Money({self.minor})"
+
+    def __str__(self):
+        return to_decimal_string(self.minor)
+
+
+def to_decimal_string(minor):
+    """Plain ``-1234.56`` form for CSV and other machine-readable output."""
+    units, fraction = divmod(abs(minor), MINOR_PER_UNIT)
+    return f"{'-' if minor < 0 else ''}{units}.{fraction:02d}"
+
+
+def format_amount(minor, currency=False):
+    """Display form with thousands separators, e.g. ``1,234.56`` or ``1,234.56 ₺``."""
+    units, fraction = divmod(abs(minor), MINOR_PER_UNIT)
+    text = f"{'-' if minor < 0 else ''}{units:,}.{fraction:02d}"
+    return f"{text} {CURRENCY}" if currency else text
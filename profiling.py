@@ -0,0 +1,296 @@
+"""Query and UI timings for finding out why a screen is slow.
+
+init_db wraps its connection only when given a :class:`Profiler`. While the
+profiler is disabled a statement costs one extra attribute check; enabled,
+every statement's time (including fetching its rows) and row count are
+summed per SQL text, and statements slower than ``slow_ms`` are kept with
+their EXPLAIN QUERY PLAN. The UI records page switches and the round trip
+of its database jobs through :meth:`Profiler.record_ui`.
+
+Query figures are written on the connection's thread, so :meth:`Profiler.snapshot`
+and :meth:`Profiler.reset` must be called there as well (a worker job in the
+GUI); UI figures may be recorded from any thread.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+
+
+SLOW_QUERY_MS = 50
+# Slow statements kept for the report; older ones are dropped.
+SLOW_KEEP = 100
+_PARAMS_REPR = 200
+
+_IN_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(sql):
+    """``sql`` with whitespace collapsed and ``?, ?, …`` lists folded, so IN batches share one entry."""
+    return _IN_LIST.sub("?, …", _SPACE.sub(" ", sql).strip())
+
+
+class _Stats:
+    __slots__ = ("count", "seconds", "max_seconds", "rows")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+
+
+class _Execution:
+    # One run of a statement; fetching adds to it until the cursor is drained.
+    __slots__ = ("profiler", "stats", "sql", "params", "at", "seconds", "rows", "slow", "plan")
+
+    def __init__(self, profiler, stats, sql, params):
+        self.profiler = profiler
+        self.stats = stats
+        self.sql = sql
+        self.params = params
+        self.at = time.time()
+        self.seconds = 0.0
+        self.rows = 0
+        self.slow = False
+        self.plan = None
+
+    def add(self, seconds, rows):
+        self.seconds += seconds
+        self.rows += rows
+        stats = self.stats
+        stats.seconds += seconds
+        stats.rows += rows
+        if self.seconds > stats.max_seconds:
+            stats.max_seconds = self.seconds
+        if not self.slow and self.seconds >= self.profiler.slow_seconds:
+            self.slow = True
+            self.profiler.slow.append(self)
+
+
+def _query_plan(conn, sql, params):
+    # A plain cursor, so explaining is not itself recorded.
+    try:
+        rows = sqlite3.Cursor(conn).execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    except sqlite3.Error as e:
+        return f"(plan alınamadı: {e})"
+    depth = {0: -1}
+    lines = []
+    for node, parent, _unused, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node] + detail)
+    return "\n".join(lines)
+
+
+class Profiler:
+    """Collects query and UI timings while :attr:`enabled` is set."""
+
+    def __init__(self, enabled=False, slow_ms=SLOW_QUERY_MS, keep=SLOW_KEEP):
+        self.enabled = enabled
+        self.slow_seconds = slow_ms / 1000
+        self.queries = {}
+        self.slow = deque(maxlen=keep)
+        self.ui = {}
+        self._ui_lock = threading.Lock()
+
+    def start(self, sql, params):
+        key = fingerprint(sql)
+        stats = self.queries.get(key)
+        if stats is None:
+            stats = self.queries[key] = _Stats()
+        stats.count += 1
+        return _Execution(self, stats, sql, params)
+
+    def record_ui(self, name, seconds):
+        """Add one timing of a UI step (page switch, refresh) named ``name``."""
+        if not self.enabled:
+            return
+        with self._ui_lock:
+            stats = self.ui.get(name)
+            if stats is None:
+                stats = self.ui[name] = _Stats()
+            stats.count += 1
+            stats.seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            # For UI steps "rows" holds the latest timing.
+            stats.rows = seconds
+
+    def reset(self):
+        self.queries.clear()
+        self.slow.clear()
+        with self._ui_lock:
+            self.ui.clear()
+
+    def snapshot(self, conn=None):
+        """Everything recorded so far as plain data; with ``conn``, plans of slow queries are filled in."""
+        for execution in self.slow:
+            if execution.plan is None and conn is not None and execution.params is not None:
+                execution.plan = _query_plan(conn, execution.sql, execution.params)
+        queries = sorted(self.queries.items(), key=lambda item: item[1].seconds, reverse=True)
+        with self._ui_lock:
+            ui = sorted(self.ui.items(), key=lambda item: item[1].max_seconds, reverse=True)
+        return {
+            "enabled": self.enabled,
+            "slow_ms": self.slow_seconds * 1000,
+            "queries": [
+                {
+                    "sql": sql,
+                    "count": s.count,
+                    "total_ms": s.seconds * 1000,
+                    "max_ms": s.max_seconds * 1000,
+                    "rows": s.rows,
+                }
+                for sql, s in queries
+            ],
+            "slow": [
+                {
+                    "at": datetime.fromtimestamp(e.at).isoformat(timespec="seconds"),
+                    "sql": fingerprint(e.sql),
+                    "params": repr(e.params)[:_PARAMS_REPR],
+                    "ms": e.seconds * 1000,
+                    "rows": e.rows,
+                    "plan": e.plan,
+                }
+                for e in reversed(self.slow)
+            ],
+            "ui": [
+                {
+                    "name": name,
+                    "count": s.count,
+                    "total_ms": s.seconds * 1000,
+                    "max_ms": s.max_seconds * 1000,
+                    "last_ms": s.rows * 1000,
+                }
+                for name, s in ui
+            ],
+        }
+
+    def dump(self, path, conn=None):
+        """Write :meth:`snapshot` to ``path`` as JSON; returns the snapshot."""
+        snapshot = self.snapshot(conn)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=2)
+        return snapshot
+
+
+def _short(sql, width=110):
+    return sql if len(sql) <= width else sql[:width - 1] + "…"
+
+
+def format_report(snapshot, limit=10):
+    """Readable summary of a :meth:`Profiler.snapshot` for the settings page and the console."""
+    lines = [f"En çok süre alan sorgular (ilk {limit}):"]
+    for q in snapshot["queries"][:limit]:
+        lines.append(
+            f"  {q['total_ms']:10,.1f} ms  x{q['count']:<6,} en uzun {q['max_ms']:8,.1f} ms  "
+            f"{q['rows']:>10,} satır  {_short(q['sql'])}"
+        )
+    lines.append("")
+    lines.append(f"Yavaş sorgular (≥ {snapshot['slow_ms']:.0f} ms, en yeni önce):")
+    for s in snapshot["slow"][:limit]:
+        lines.append(f"  {s['at']}  {s['ms']:8,.1f} ms  {s['rows']:>8,} satır  {_short(s['sql'])}")
+        lines.append(f"      parametreler: {s['params']}")
+        for plan_line in (s["plan"] or "").splitlines():
+            lines.append(f"      {plan_line}")
+    lines.append("")
+    lines.append("Arayüz süreleri (en uzun önce):")
+    for u in snapshot["ui"][:limit * 2]:
+        lines.append(
+            f"  {u['name']:<48} x{u['count']:<5,} son {u['last_ms']:8,.1f} ms  en uzun {u['max_ms']:8,.1f} ms"
+        )
+    return "\n".join(lines)
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Cursor that adds its statement's execution and fetch time to the profiler."""
+
+    _execution = None
+
+    def execute(self, sql, parameters=()):
+        execution = self._execution = self.connection.profiler.start(sql, parameters)
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            # Writes report their row count now; queries count rows as they are fetched.
+            execution.add(time.perf_counter() - started, 0 if self.description else max(self.rowcount, 0))
+
+    def executemany(self, sql, seq_of_parameters):
+        # No single parameter set to explain the plan with.
+        execution = self._execution = self.connection.profiler.start(sql, None)
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            execution.add(time.perf_counter() - started, max(self.rowcount, 0))
+
+    def executescript(self, sql_script):
+        execution = self._execution = self.connection.profiler.start(sql_script, None)
+        started = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            execution.add(time.perf_counter() - started, 0)
+
+    def _fetched(self, started, rows):
+        if self._execution is not None:
+            self._execution.add(time.perf_counter() - started, rows)
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(started, 0)
+            raise
+        self._fetched(started, 1)
+        return row
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(started, row is not None)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(started, len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, len(rows))
+        return rows
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """sqlite3 connection that reports to :attr:`profiler` while it is enabled."""
+
+    profiler = None
+
+    def execute(self, sql, parameters=()):
+        profiler = self.profiler
+        if profiler is None or not profiler.enabled:
+            return super().execute(sql, parameters)
+        return ProfiledCursor(self).execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        profiler = self.profiler
+        if profiler is None or not profiler.enabled:
+            return super().executemany(sql, seq_of_parameters)
+        return ProfiledCursor(self).executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        profiler = self.profiler
+        if profiler is None or not profiler.enabled:
+            return super().executescript(sql_script)
+        return ProfiledCursor(self).executescript(sql_script)
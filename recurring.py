@@ -0,0 +1,78 @@
+"""Recurring transactions: occurrence dates and batched materialization.
+
+A rule in ``recurring_rules`` repeats every ``interval`` days, weeks, months
+or years from its start date; monthly and yearly rules keep the start's day
+of month, clamped to shorter months. ``next_index``/``next_date`` point at
+the first occurrence not yet written.
+
+:func:`materialize_due` writes every due occurrence of every rule in one
+transaction, as one undoable action, going through db.bulk_insert so a long
+catch-up costs one executemany. Each row carries the key
+``r<rule id>:<date>`` in ``transactions.source_key``; with the unique index
+on it and INSERT OR IGNORE, a run repeated after a crash, or by a second copy
+of the app on the same file, never writes an occurrence twice.
+"""
+
+from calendar import monthrange
+from datetime import date, timedelta
+
+from db import bulk_insert, start_action
+
+
+FREQUENCIES = ("daily", "weekly", "monthly", "yearly")
+
+_DUE_RULES_SQL = """
+    SELECT id, description, kind, amount, customer_id, frequency, interval, start_date, end_date, next_index
+    FROM recurring_rules
+    WHERE active = 1 AND next_date <= ? AND (end_date IS NULL OR next_date <= end_date)
+"""
+_INSERT_OCCURRENCE_SQL = (
+    "INSERT OR IGNORE INTO transactions (date, description, kind, amount, customer_id, source_key) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+_ADVANCE_SQL = "UPDATE recurring_rules SET next_index = ?, next_date = ? WHERE id = ?"
+
+
+def occurrence_date(start, frequency, interval, index):
+    """Date of occurrence ``index`` of a rule starting on ``start`` (index 0 is ``start``)."""
+    if frequency == "daily":
+        return start + timedelta(days=interval * index)
+    if frequency == "weekly":
+        return start + timedelta(weeks=interval * index)
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"bilinmeyen tekrar sıklığı: {frequency!r}")
+    # Counted from the start, so a rule on the 31st returns to the 31st after February.
+    months = start.month - 1 + interval * index * (12 if frequency == "yearly" else 1)
+    year, month = start.year + months // 12, months % 12 + 1
+    return date(year, month, min(start.day, monthrange(year, month)[1]))
+
+
+def _due(rule, today):
+    rule_id, description, kind, amount, customer_id, frequency, interval, start, end, index = rule
+    start = date.fromisoformat(start)
+    last = min(today, date.fromisoformat(end)) if end else today
+    rows = []
+    day = occurrence_date(start, frequency, interval, index)
+    while day <= last:
+        rows.append((day.isoformat(), description, kind, amount, customer_id, f"r{rule_id}:{day.isoformat()}"))
+        index += 1
+        day = occurrence_date(start, frequency, interval, index)
+    return rows, (index, day.isoformat(), rule_id)
+
+
+def materialize_due(conn, today=None):
+    """Write every occurrence due by ``today`` (default: today); returns the number of new rows."""
+    today = today or date.today()
+    rules = conn.execute(_DUE_RULES_SQL, (today.isoformat(),)).fetchall()
+    if not rules:
+        return 0
+    rows, advances = [], []
+    for rule in rules:
+        due, advance = _due(rule, today)
+        rows += due
+        advances.append(advance)
+    with conn:
+        start_action(conn, "Tekrarlayan kayıtlar eklendi")
+        count = bulk_insert(conn, "transactions", _INSERT_OCCURRENCE_SQL, rows)
+        conn.executemany(_ADVANCE_SQL, advances)
+    return count
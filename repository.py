@@ -0,0 +1,511 @@
+"""Headless data-access API over the MasterAccount database.
+
+Repositories wrap a ``sqlite3`` connection from :func:`db.init_db`. Each
+public write method runs in its own transaction; the ``*_many`` variants push
+a whole batch through ``executemany`` so bulk jobs commit once instead of once
+per row, and ledger bulk inserts maintain the summary tables set-based
+instead of through per-row triggers. SQL strings are module constants so sqlite3's statement cache reuses
+the prepared statements across calls.
+"""
+
+from datetime import date
+from itertools import islice
+
+from db import (
+    KINDS,
+    bulk_insert,
+    journal_paused,
+    normalize_date,
+    read_range_totals,
+    read_series,
+    read_totals,
+    start_action,
+)
+from journal import snapshot_action
+from money import format_amount
+from recurring import FREQUENCIES, occurrence_date
+
+
+LEDGER_PAGE_SIZE = 200
+CUSTOMER_PAGE_SIZE = 200
+FETCH_BATCH_SIZE = 1000
+
+# The ledger is ordered by (date, kind, id), which is exactly the
+# transactions_date index (date, kind) plus its rowid, so pages are keyset
+# range scans of that index instead of OFFSET scans. Rows carry the linked
+# customer's name for display.
+_LEDGER_COLUMNS = "t.id, t.date, t.description, t.kind, t.amount, c.name"
+_LEDGER_FROM = "transactions t LEFT JOIN customers c ON c.id = t.customer_id"
+_PAGE_SQL = f"""
+    SELECT {_LEDGER_COLUMNS} FROM {_LEDGER_FROM}
+    WHERE (t.date, t.kind, t.id) < (?, ?, ?){{where}}
+    ORDER BY t.date DESC, t.kind DESC, t.id DESC
+    LIMIT ?
+"""
+LEDGER_PAGE_SQL = _PAGE_SQL.format(where="")
+_INSERT_ENTRY_SQL = (
+    "INSERT INTO transactions (date, description, kind, amount, customer_id) VALUES (?, ?, ?, ?, ?)"
+)
+_DELETE_ENTRY_SQL = "DELETE FROM transactions WHERE id = ?"
+_SELECT_ENTRIES_SQL = f"SELECT {_LEDGER_COLUMNS} FROM {_LEDGER_FROM} ORDER BY t.date, t.kind, t.id"
+_SELECT_ENTRIES_BY_ID_SQL = f"SELECT {_LEDGER_COLUMNS} FROM {_LEDGER_FROM} WHERE t.id IN ({{marks}})"
+_ENTRY_FIELDS = ("date", "description", "kind", "amount", "customer_id")
+_CUSTOMER_FIELDS = ("name", "contact", "notes")
+_INSERT_RULE_SQL = (
+    "INSERT INTO recurring_rules "
+    "(description, kind, amount, customer_id, frequency, interval, start_date, end_date, next_date) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_SELECT_RULES_SQL = """
+    SELECT r.id, r.description, r.kind, r.amount, c.name, r.frequency, r.interval,
+           r.start_date, r.end_date, r.next_date, r.active
+    FROM recurring_rules r LEFT JOIN customers c ON c.id = r.customer_id
+    ORDER BY r.active DESC, r.next_date, r.id
+"""
+_INSERT_CUSTOMER_SQL = "INSERT INTO customers (name, contact, notes) VALUES (?, ?, ?)"
+_DELETE_CUSTOMER_SQL = "DELETE FROM customers WHERE id = ?"
+_SELECT_CUSTOMERS_SQL = "SELECT id, name, contact, notes FROM customers ORDER BY name"
+# Keyset pages over the customers_name index, whose entries end in the rowid.
+_CUSTOMER_PAGE_SQL = (
+    "SELECT id, name, contact, notes FROM customers WHERE (name, id) > (?, ?) ORDER BY name, id LIMIT ?"
+)
+_SELECT_CUSTOMER_NAMES_SQL = "SELECT id, name FROM customers ORDER BY name LIMIT ?"
+_FIND_CUSTOMER_SQL = "SELECT id FROM customers WHERE name = ? ORDER BY id LIMIT 1"
+# Both read the trigger-maintained per-customer sums (see statements.py).
+_CUSTOMER_BALANCE_SQL = "SELECT invoiced, credited + paid FROM customer_balances WHERE customer_id = ?"
+_CUSTOMER_BALANCES_SQL = "SELECT customer_id, invoiced, credited + paid FROM customer_balances"
+_INSERT_PAYMENT_SQL = "INSERT INTO payments (date, customer_id, amount, note) VALUES (?, ?, ?, ?)"
+_DELETE_PAYMENT_SQL = "DELETE FROM payments WHERE id = ?"
+
+# Sorts after any date string, so the first page needs no special query.
+_DATE_MAX = "\uffff"
+_ID_MAX = 2**63 - 1
+# Most ids bound into one IN (...) list; well under SQLite's variable limit.
+_IN_BATCH = 500
+# Deletes at least this large are made undoable with a snapshot instead of
+# journaling every row.
+SNAPSHOT_DELETE_ROWS = 1_000_000
+
+
+def iter_cursor(cur, batch_size=FETCH_BATCH_SIZE):
+    """Yield rows from an executed cursor, fetching ``batch_size`` at a time."""
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+
+def _batches(iterable, size):
+    it = iter(iterable)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _update_many(conn, table, editable, ids, changes, label):
+    unknown = set(changes) - set(editable)
+    if unknown:
+        raise ValueError(f"düzenlenemeyen alan(lar): {', '.join(sorted(unknown))}")
+    if not changes:
+        return 0
+    assignments = ", ".join(f"{column} = ?" for column in changes)
+    values = list(changes.values())
+    count = 0
+    with conn:
+        start_action(conn, label)
+        for batch in _batches(ids, _IN_BATCH):
+            sql = f"UPDATE {table} SET {assignments} WHERE id IN ({','.join('?' * len(batch))})"
+            count += conn.execute(sql, (*values, *batch)).rowcount
+    return count
+
+
+def _delete_many(conn, table, sql, ids, label):
+    ids = [(i,) for i in ids]
+    if len(ids) < SNAPSHOT_DELETE_ROWS:
+        with conn:
+            start_action(conn, label)
+            return conn.executemany(sql, ids).rowcount
+
+    def delete(conn):
+        with journal_paused(conn, table):
+            return conn.executemany(sql, ids).rowcount
+
+    return snapshot_action(conn, label, "bulk-delete", delete)
+
+
+class LedgerFilter:
+    """Optional constraints on ledger rows; fields left as ``None`` do not filter.
+
+    Dates are inclusive and normalized like entered dates, amounts are
+    inclusive kuruş, ``kind`` is ``"income"`` or ``"expense"``.
+    """
+
+    __slots__ = ("date_from", "date_to", "kind", "amount_min", "amount_max", "customer_id")
+
+    def __init__(self, date_from=None, date_to=None, kind=None, amount_min=None, amount_max=None,
+                 customer_id=None):
+        if kind is not None and kind not in KINDS:
+            raise ValueError(f"bilinmeyen kayıt türü: {kind!r}")
+        self.date_from = normalize_date(date_from) if date_from else None
+        self.date_to = normalize_date(date_to) if date_to else None
+        self.kind = kind
+        self.amount_min = amount_min
+        self.amount_max = amount_max
+        self.customer_id = customer_id
+
+    @property
+    def kinds(self):
+        return (self.kind,) if self.kind else KINDS
+
+    @property
+    def dates_only(self):
+        """True when the filter can be answered from ledger_totals alone."""
+        return self.amount_min is None and self.amount_max is None and self.customer_id is None
+
+    def where(self, alias="t."):
+        """Return ``(sql, params)``: `` AND ...`` conditions on the transactions table."""
+        clauses, params = [], []
+        for sql, value in (
+            ("date >= ?", self.date_from),
+            ("date <= ?", self.date_to),
+            ("kind = ?", self.kind),
+            ("amount >= ?", self.amount_min),
+            ("amount <= ?", self.amount_max),
+            ("customer_id = ?", self.customer_id),
+        ):
+            if value is not None:
+                clauses.append(alias + sql)
+                params.append(value)
+        return "".join(f" AND {clause}" for clause in clauses), params
+
+    def __bool__(self):
+        return any(getattr(self, name) is not None for name in self.__slots__)
+
+
+class LedgerPager:
+    """Keyset-paged, date-ordered view over the transactions."""
+
+    def __init__(self, conn, page_size=LEDGER_PAGE_SIZE, filters=None):
+        self.conn = conn
+        self.page_size = page_size
+        self._start = _DATE_MAX
+        if filters:
+            where, self._params = filters.where()
+            self._sql = _PAGE_SQL.format(where=where)
+            if filters.date_to:
+                # Start the keyset just after date_to: SQLite uses only one
+                # upper bound on the index and would otherwise pick the keyset's.
+                self._start = filters.date_to + _DATE_MAX
+        else:
+            self._params, self._sql = [], LEDGER_PAGE_SQL
+        self.reset()
+
+    def reset(self):
+        self._last = (self._start, "", _ID_MAX)
+        self.exhausted = False
+
+    def next_page(self):
+        """Return the next ``(id, date, description, kind, amount, customer)`` rows."""
+        if self.exhausted:
+            return []
+        limit = self.page_size
+        rows = self.conn.execute(self._sql, (*self._last, *self._params, limit)).fetchall()
+        if len(rows) < limit:
+            self.exhausted = True
+        if rows:
+            last = rows[-1]
+            self._last = (last[1], last[3], last[0])
+        return rows
+
+
+class CustomerPager:
+    """Keyset-paged, name-ordered view over the customers."""
+
+    def __init__(self, conn, page_size=CUSTOMER_PAGE_SIZE):
+        self.conn = conn
+        self.page_size = page_size
+        self.reset()
+
+    def reset(self):
+        self._last = ("", 0)
+        self.exhausted = False
+
+    def next_page(self):
+        """Return the next ``(id, name, contact, notes)`` rows."""
+        if self.exhausted:
+            return []
+        limit = self.page_size
+        rows = self.conn.execute(_CUSTOMER_PAGE_SQL, (*self._last, limit)).fetchall()
+        if len(rows) < limit:
+            self.exhausted = True
+        if rows:
+            self._last = (rows[-1][1], rows[-1][0])
+        return rows
+
+
+class LedgerRepository:
+    """Income and expense transactions.
+
+    ``kind`` is ``"income"`` or ``"expense"``; amounts are integer kuruş
+    (see money.py) on the way in and out. ``customer_id`` optionally links a
+    transaction to a customer.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def add(self, kind, date, description, amount, customer_id=None):
+        date = normalize_date(date)
+        with self.conn:
+            start_action(self.conn, f"Kayıt eklendi: {description}")
+            cur = self.conn.execute(_INSERT_ENTRY_SQL, (date, description, kind, amount, customer_id))
+        return cur.lastrowid
+
+    def add_many(self, rows, batch_size=None, commit=True):
+        """Insert ``(date, description, kind, amount, customer_id)`` rows; returns the row count.
+
+        Without ``batch_size`` everything goes in one transaction, otherwise
+        one transaction is committed per batch; either way the rows are one
+        undoable action. With ``commit=False`` the rows join the caller's
+        transaction and action instead. Dates are validated and normalized to
+        ISO form on the way in.
+        """
+        rows = (
+            (normalize_date(date), desc, kind, amount, customer_id)
+            for date, desc, kind, amount, customer_id in rows
+        )
+        if not commit:
+            return bulk_insert(self.conn, "transactions", _INSERT_ENTRY_SQL, rows)
+        if batch_size is None:
+            with self.conn:
+                start_action(self.conn, "Toplu kayıt eklendi")
+                return bulk_insert(self.conn, "transactions", _INSERT_ENTRY_SQL, rows)
+        count = 0
+        for batch in _batches(rows, batch_size):
+            with self.conn:
+                if not count:
+                    start_action(self.conn, "Toplu kayıt eklendi")
+                count += bulk_insert(self.conn, "transactions", _INSERT_ENTRY_SQL, batch)
+        return count
+
+    def delete(self, entry_id):
+        with self.conn:
+            start_action(self.conn, "Kayıt silindi")
+            self.conn.execute(_DELETE_ENTRY_SQL, (entry_id,))
+
+    def delete_many(self, ids):
+        """Delete entries by id as one undoable action; returns the row count."""
+        ids = list(ids)
+        return _delete_many(self.conn, "transactions", _DELETE_ENTRY_SQL, ids, f"{len(ids):,} kayıt silindi")
+
+    def update_many(self, ids, **changes):
+        """Set the same fields on every entry in ``ids`` as one undoable action.
+
+        Fields are ``date``, ``description``, ``kind``, ``amount`` (kuruş) and
+        ``customer_id`` (None unlinks). Returns the number of rows changed.
+        """
+        if "date" in changes:
+            changes["date"] = normalize_date(changes["date"])
+        if changes.get("kind", KINDS[0]) not in KINDS:
+            raise ValueError(f"bilinmeyen kayıt türü: {changes['kind']!r}")
+        ids = list(ids)
+        return _update_many(
+            self.conn, "transactions", _ENTRY_FIELDS, ids, changes, f"{len(ids):,} kayıt düzenlendi"
+        )
+
+    def get_many(self, ids):
+        """Ledger rows for ``ids`` (in no particular order), looked up in batches."""
+        rows = []
+        for batch in _batches(ids, _IN_BATCH):
+            sql = _SELECT_ENTRIES_BY_ID_SQL.format(marks=",".join("?" * len(batch)))
+            rows += self.conn.execute(sql, batch).fetchall()
+        return rows
+
+    def iter_entries(self, batch_size=FETCH_BATCH_SIZE):
+        """Yield ``(id, date, description, kind, amount, customer)`` in ledger order, streaming."""
+        return iter_cursor(self.conn.execute(_SELECT_ENTRIES_SQL), batch_size)
+
+    def pager(self, page_size=LEDGER_PAGE_SIZE, filters=None):
+        return LedgerPager(self.conn, page_size, filters)
+
+    def totals(self, grain="all", period=""):
+        return read_totals(self.conn, grain, period)
+
+    def totals_between(self, date_from=None, date_to=None):
+        """(income, expense) for an inclusive date range, from the summary table."""
+        return read_range_totals(self.conn, date_from, date_to)
+
+    def series(self, grain="month", date_from=None, date_to=None):
+        """``(opening balance, [(period, income, expense), ...])`` for charts; see db.read_series."""
+        return read_series(self.conn, grain, date_from, date_to)
+
+    def filtered_totals(self, filters):
+        """(income, expense) of the rows matching ``filters``.
+
+        Date and kind filters are answered from ledger_totals; amount or
+        customer conditions need a SUM over the matching rows, which uses the
+        date, amount or customer index.
+        """
+        if filters.dates_only:
+            income, expense = read_range_totals(self.conn, filters.date_from, filters.date_to)
+            totals = {"income": income, "expense": expense}
+        else:
+            where, params = filters.where(alias="")
+            totals = dict(
+                self.conn.execute(
+                    f"SELECT kind, IFNULL(SUM(amount), 0) FROM transactions WHERE true{where} GROUP BY kind",
+                    params,
+                )
+            )
+        return tuple(totals.get(kind, 0) if kind in filters.kinds else 0 for kind in KINDS)
+
+    def clear(self):
+        with self.conn:
+            start_action(self.conn, "Tüm gelir/gider kayıtları silindi")
+            self.conn.execute("DELETE FROM transactions")
+
+
+class CustomerRepository:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def add(self, name, contact, notes):
+        with self.conn:
+            start_action(self.conn, f"Müşteri eklendi: {name}")
+            cur = self.conn.execute(_INSERT_CUSTOMER_SQL, (name, contact, notes))
+        return cur.lastrowid
+
+    def add_many(self, rows, commit=True):
+        """Insert ``(name, contact, notes)`` rows in one transaction."""
+        if not commit:
+            return bulk_insert(self.conn, "customers", _INSERT_CUSTOMER_SQL, rows)
+        with self.conn:
+            start_action(self.conn, "Toplu müşteri eklendi")
+            return bulk_insert(self.conn, "customers", _INSERT_CUSTOMER_SQL, rows)
+
+    def delete(self, customer_id):
+        """Delete a customer; their transactions are kept and unlinked."""
+        with self.conn:
+            start_action(self.conn, "Müşteri silindi")
+            self.conn.execute(_DELETE_CUSTOMER_SQL, (customer_id,))
+
+    def delete_many(self, ids):
+        """Delete customers as one undoable action; their transactions are unlinked."""
+        ids = list(ids)
+        return _delete_many(self.conn, "customers", _DELETE_CUSTOMER_SQL, ids, f"{len(ids):,} müşteri silindi")
+
+    def update_many(self, ids, **changes):
+        """Set ``name``, ``contact`` and/or ``notes`` on every customer in ``ids``; returns the row count."""
+        ids = list(ids)
+        return _update_many(
+            self.conn, "customers", _CUSTOMER_FIELDS, ids, changes, f"{len(ids):,} müşteri düzenlendi"
+        )
+
+    def iter_all(self, batch_size=FETCH_BATCH_SIZE):
+        """Yield ``(id, name, contact, notes)`` ordered by name."""
+        return iter_cursor(self.conn.execute(_SELECT_CUSTOMERS_SQL), batch_size)
+
+    def pager(self, page_size=CUSTOMER_PAGE_SIZE):
+        return CustomerPager(self.conn, page_size)
+
+    def names(self, limit=1000):
+        """``(id, name)`` pairs ordered by name, for pickers."""
+        return self.conn.execute(_SELECT_CUSTOMER_NAMES_SQL, (limit,)).fetchall()
+
+    def find(self, name):
+        """Id of the customer called exactly ``name``, or None."""
+        row = self.conn.execute(_FIND_CUSTOMER_SQL, (name,)).fetchone()
+        return row[0] if row else None
+
+    def balance(self, customer_id):
+        """(debit, credit) in kuruş: the customer's income, and their expenses plus payments."""
+        row = self.conn.execute(_CUSTOMER_BALANCE_SQL, (customer_id,)).fetchone()
+        return row or (0, 0)
+
+    def balances(self):
+        """``{customer_id: (debit, credit)}`` for every customer with entries or payments."""
+        rows = self.conn.execute(_CUSTOMER_BALANCES_SQL)
+        return {customer_id: (debit, credit) for customer_id, debit, credit in rows}
+
+    def clear(self):
+        with self.conn:
+            start_action(self.conn, "Tüm müşteriler silindi")
+            self.conn.execute("DELETE FROM customers")
+
+
+class PaymentRepository:
+    """Payments received from customers; they settle invoices without being ledger income."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def add(self, customer_id, date, amount, note=""):
+        """Record a payment of ``amount`` kuruş; returns its id."""
+        if amount <= 0:
+            raise ValueError("tutar sıfırdan büyük olmalı")
+        date = normalize_date(date)
+        with self.conn:
+            start_action(self.conn, f"Tahsilat eklendi: {format_amount(amount, currency=True)}")
+            return self.conn.execute(_INSERT_PAYMENT_SQL, (date, customer_id, amount, note)).lastrowid
+
+    def delete_many(self, ids):
+        """Delete payments as one undoable action; returns the row count."""
+        ids = list(ids)
+        return _delete_many(self.conn, "payments", _DELETE_PAYMENT_SQL, ids, f"{len(ids):,} tahsilat silindi")
+
+
+class RecurringRepository:
+    """Recurring rules; recurring.materialize_due turns them into ledger entries."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def add(self, kind, description, amount, frequency, start_date, interval=1, end_date=None, customer_id=None):
+        """Store a rule whose first occurrence is ``start_date``; returns its id."""
+        if kind not in KINDS:
+            raise ValueError(f"bilinmeyen kayıt türü: {kind!r}")
+        if frequency not in FREQUENCIES:
+            raise ValueError(f"bilinmeyen tekrar sıklığı: {frequency!r}")
+        if interval < 1:
+            raise ValueError("tekrar aralığı en az 1 olmalı")
+        if amount <= 0:
+            raise ValueError("tutar sıfırdan büyük olmalı")
+        start_date = normalize_date(start_date)
+        end_date = normalize_date(end_date) if end_date else None
+        if end_date and end_date < start_date:
+            raise ValueError("bitiş tarihi başlangıçtan önce olamaz")
+        with self.conn:
+            return self.conn.execute(
+                _INSERT_RULE_SQL,
+                (description, kind, amount, customer_id, frequency, interval, start_date, end_date, start_date),
+            ).lastrowid
+
+    def all(self):
+        """``(id, description, kind, amount, customer, frequency, interval, start, end, next, active)`` rows."""
+        return self.conn.execute(_SELECT_RULES_SQL).fetchall()
+
+    def set_active(self, rule_id, active, today=None):
+        """Pause or resume a rule; resuming skips the occurrences that fell due while it was paused."""
+        with self.conn:
+            row = self.conn.execute(
+                "SELECT start_date, frequency, interval, next_index FROM recurring_rules WHERE id = ? AND active = 0",
+                (rule_id,),
+            ).fetchone()
+            if active and row:
+                start, frequency, interval, index = row
+                start, today = date.fromisoformat(start), today or date.today()
+                while occurrence_date(start, frequency, interval, index) < today:
+                    index += 1
+                self.conn.execute(
+                    "UPDATE recurring_rules SET next_index = ?, next_date = ? WHERE id = ?",
+                    (index, occurrence_date(start, frequency, interval, index).isoformat(), rule_id),
+                )
+            self.conn.execute("UPDATE recurring_rules SET active = ? WHERE id = ?", (int(active), rule_id))
+
+    def delete(self, rule_id):
+        """Delete a rule; the entries it already wrote are kept."""
+        with self.conn:
+            self.conn.execute("DELETE FROM recurring_rules WHERE id = ?", (rule_id,))
@@ -0,0 +1,150 @@
+"""Ranked full-text search over ledger descriptions and customers.
+
+Queries go to the ``ledger_fts`` / ``customers_fts`` indexes kept in sync by
+triggers (see ``db._migrate_full_text_search``). Every search term is matched
+as a prefix, all terms must match, and Turkish text is folded the same way as
+the index so "cagri" finds "Çağrı" and "isik" finds "IŞIK".
+"""
+
+import re
+
+from repository import LedgerRepository
+
+
+SEARCH_PAGE_SIZE = 200
+# bm25 has to score every match before the first row comes back, so queries
+# matching more rows than this are returned newest first instead of ranked.
+RANK_LIMIT = 5000
+
+_TERM = re.compile(r"\w+")
+
+_LEDGER_HITS_SQL = {
+    "fts5": "SELECT rowid FROM ledger_fts WHERE ledger_fts MATCH ?{filtered} ORDER BY {order} LIMIT ? OFFSET ?",
+    "like": "SELECT rowid FROM ledger_fts WHERE {where}{filtered} ORDER BY rowid DESC LIMIT ? OFFSET ?",
+}
+_CUSTOMER_SEARCH_SQL = {
+    "fts5": """
+        SELECT c.id, c.name, c.contact, c.notes
+        FROM customers_fts f JOIN customers c ON c.id = f.rowid
+        WHERE customers_fts MATCH ? ORDER BY {order} LIMIT ? OFFSET ?
+    """,
+    "like": """
+        SELECT c.id, c.name, c.contact, c.notes
+        FROM customers_fts f JOIN customers c ON c.id = f.rowid
+        WHERE {where} ORDER BY c.name LIMIT ? OFFSET ?
+    """,
+}
+
+
+def fold(text):
+    """Case- and dotless-i-fold Turkish text the way the index does."""
+    return text.replace("I", "ı").replace("İ", "i").lower().replace("ı", "i")
+
+
+def terms(text):
+    return _TERM.findall(fold(text))
+
+
+def match_query(text):
+    """Build an FTS5 MATCH expression: every term as a quoted prefix, AND-ed."""
+    return " ".join(f'"{term}"*' for term in terms(text))
+
+
+def _engine(conn, table):
+    sql = conn.execute("SELECT sql FROM sqlite_master WHERE name = ?", (table,)).fetchone()
+    return "fts5" if sql and "fts5" in sql[0].lower() else "like"
+
+
+def _order(conn, table, query, filtered="", filter_params=()):
+    # Counted with the page's filters: only the rows they let through are ranked.
+    count = conn.execute(
+        f"SELECT COUNT(*) FROM (SELECT 1 FROM {table} WHERE {table} MATCH ?{filtered} LIMIT ?)",
+        (query, *filter_params, RANK_LIMIT),
+    ).fetchone()[0]
+    if count >= RANK_LIMIT:
+        return "rowid DESC"
+    # "rank" is sorted inside FTS5 and scores every match, filtered out or not;
+    # bm25() (the same score) is computed only for the rows left after filtering.
+    return f"bm25({table})" if filtered else "rank"
+
+
+def _like_clause(columns, words):
+    # Fallback without FTS5: every word must appear in one of the columns.
+    any_column = "(" + " OR ".join(f"{column} LIKE ?" for column in columns) + ")"
+    where = " AND ".join([any_column] * len(words))
+    params = [f"%{word}%" for word in words for _ in columns]
+    return where, params
+
+
+def _filter_clause(filters):
+    # Restrict hits to the transactions matching a LedgerFilter (the FTS rowid
+    # is the transaction id). "+rowid" keeps the list out of FTS5's query
+    # plan; otherwise it would run the MATCH once per listed rowid.
+    if not filters:
+        return "", []
+    where, params = filters.where(alias="")
+    return f" AND +rowid IN (SELECT id FROM transactions WHERE true{where})", params
+
+
+def search_ledger(conn, text, limit=SEARCH_PAGE_SIZE, offset=0, filters=None):
+    """Return ``(id, date, description, kind, amount, customer)`` rows, best match first.
+
+    ``filters`` is an optional repository.LedgerFilter applied before paging.
+    """
+    words = terms(text)
+    if not words:
+        return []
+    engine = _engine(conn, "ledger_fts")
+    filtered, filter_params = _filter_clause(filters)
+    if engine == "fts5":
+        query = match_query(text)
+        order = _order(conn, "ledger_fts", query, filtered, filter_params)
+        sql = _LEDGER_HITS_SQL["fts5"].format(filtered=filtered, order=order)
+        hits = conn.execute(sql, (query, *filter_params, limit, offset)).fetchall()
+    else:
+        where, params = _like_clause(("description",), words)
+        sql = _LEDGER_HITS_SQL["like"].format(where=where, filtered=filtered)
+        hits = conn.execute(sql, (*params, *filter_params, limit, offset)).fetchall()
+
+    ids = [rowid for (rowid,) in hits]
+    rows = {row[0]: row for row in LedgerRepository(conn).get_many(ids)}
+    return [rows[entry_id] for entry_id in ids if entry_id in rows]
+
+
+def search_customers(conn, text, limit=SEARCH_PAGE_SIZE, offset=0):
+    """Return ``(id, name, contact, notes)`` rows, best match first."""
+    words = terms(text)
+    if not words:
+        return []
+    engine = _engine(conn, "customers_fts")
+    if engine == "fts5":
+        query = match_query(text)
+        order = "f." + _order(conn, "customers_fts", query)
+        return conn.execute(_CUSTOMER_SEARCH_SQL["fts5"].format(order=order), (query, limit, offset)).fetchall()
+    where, params = _like_clause(("f.name", "f.contact", "f.notes"), words)
+    return conn.execute(_CUSTOMER_SEARCH_SQL["like"].format(where=where), (*params, limit, offset)).fetchall()
+
+
+class SearchPager:
+    """Pages through ranked search results with the same interface as LedgerPager."""
+
+    def __init__(self, conn, text, search=search_ledger, page_size=SEARCH_PAGE_SIZE, **options):
+        self.conn = conn
+        self.text = text
+        self.search = search
+        self.page_size = page_size
+        self.options = options
+        self.reset()
+
+    def reset(self):
+        self.offset = 0
+        self.exhausted = False
+
+    def next_page(self):
+        if self.exhausted:
+            return []
+        rows = self.search(self.conn, self.text, self.page_size, self.offset, **self.options)
+        self.offset += self.page_size
+        if len(rows) < self.page_size:
+            self.exhausted = True
+        return rows
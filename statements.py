@@ -0,0 +1,147 @@
+"""Customer accounts: statements, outstanding balances and aging.
+
+A customer's income entries are what they were charged (invoices); their
+expense entries and the payments received from them are credits. Triggers
+keep these sums per customer in ``customer_balances`` (see db.py), so the
+customer list reads every balance in one query, however long the ledger.
+
+Aging splits what is still open by the age of the invoice: credits settle the
+oldest invoices first, and what remains of each invoice falls into the 0–30,
+31–60, 61–90 or 90+ day bucket. The buckets are cached next to the sums with
+the date they were computed for; any write to a customer's entries clears
+that date, and :func:`refresh_aging` recomputes only such customers (or all
+of them once a day), set-based. Pages of the customer list ask for their own
+customers only, so a refresh never costs more than the rows on screen.
+"""
+
+from datetime import date
+
+from db import normalize_date
+
+
+AGING_LABELS = ("0–30 gün", "31–60 gün", "61–90 gün", "90+ gün")
+
+_STALE_SQL = "SELECT 1 FROM customer_balances WHERE aged_on IS NOT :today {only} LIMIT 1"
+# Running invoice total minus all credits is what the credits left unpaid, up to the invoice's amount.
+_AGING_SQL = """
+    WITH open AS (
+        SELECT t.customer_id, julianday(:today) - julianday(t.date) AS age,
+               MAX(0, MIN(t.amount, SUM(t.amount) OVER (PARTITION BY t.customer_id ORDER BY t.date, t.id)
+                                    - b.credited - b.paid)) AS open
+        FROM (SELECT * FROM customer_balances WHERE aged_on IS NOT :today {only}) b
+        JOIN transactions t ON t.customer_id = b.customer_id AND t.kind = 'income'
+    )
+    SELECT SUM(CASE WHEN age > 30 THEN 0 ELSE open END),
+           SUM(CASE WHEN age > 30 AND age <= 60 THEN open ELSE 0 END),
+           SUM(CASE WHEN age > 60 AND age <= 90 THEN open ELSE 0 END),
+           SUM(CASE WHEN age > 90 THEN open ELSE 0 END),
+           customer_id
+    FROM open GROUP BY customer_id
+"""
+_CLEAR_AGING_SQL = """
+    UPDATE customer_balances SET age_0_30 = 0, age_31_60 = 0, age_61_90 = 0, age_90 = 0, aged_on = :today
+    WHERE aged_on IS NOT :today {only}
+"""
+_SET_AGING_SQL = (
+    "UPDATE customer_balances SET age_0_30 = ?, age_31_60 = ?, age_61_90 = ?, age_90 = ? WHERE customer_id = ?"
+)
+_ACCOUNTS_SQL = (
+    "SELECT customer_id, invoiced, credited + paid, age_0_30, age_31_60, age_61_90, age_90 "
+    "FROM customer_balances WHERE 1 {only}"
+)
+_ACCOUNT_SQL = (
+    "SELECT invoiced, credited + paid, age_0_30, age_31_60, age_61_90, age_90 "
+    "FROM customer_balances WHERE customer_id = ?"
+)
+# Both halves read one customer's rows off an index in date order.
+_STATEMENT_SQL = """
+    SELECT date, doc, id, description, debit, credit FROM (
+        SELECT date, CASE kind WHEN 'income' THEN 'invoice' ELSE 'expense' END AS doc, id, description,
+               CASE kind WHEN 'income' THEN amount ELSE 0 END AS debit,
+               CASE kind WHEN 'expense' THEN amount ELSE 0 END AS credit
+        FROM transactions
+        WHERE customer_id = :customer AND kind IN ('income', 'expense') AND date BETWEEN :first AND :last
+        UNION ALL
+        SELECT date, 'payment', id, note, 0, amount
+        FROM payments WHERE customer_id = :customer AND date BETWEEN :first AND :last
+    )
+    ORDER BY date, doc = 'payment', id
+"""
+_OPENING_SQL = """
+    SELECT IFNULL((SELECT SUM(CASE kind WHEN 'income' THEN amount ELSE -amount END) FROM transactions
+                   WHERE customer_id = :customer AND kind IN ('income', 'expense') AND date < :first), 0)
+         - IFNULL((SELECT SUM(amount) FROM payments WHERE customer_id = :customer AND date < :first), 0)
+"""
+# Sorts after any date string.
+_DATE_MAX = "\uffff"
+
+
+def _only(customer_ids, params):
+    """Condition limiting customer_balances to ``customer_ids``, bound into ``params``; all rows for None."""
+    if customer_ids is None:
+        return ""
+    marks = []
+    for i, customer_id in enumerate(customer_ids):
+        params[f"c{i}"] = customer_id
+        marks.append(f":c{i}")
+    return f"AND customer_id IN ({', '.join(marks)})"
+
+
+def refresh_aging(conn, today=None, customer_ids=None):
+    """Recompute the aging buckets that are out of date for ``today``; returns True if any were.
+
+    With ``customer_ids`` only those customers are refreshed.
+    """
+    params = {"today": (today or date.today()).isoformat()}
+    only = _only(customer_ids, params)
+    if conn.execute(_STALE_SQL.format(only=only), params).fetchone() is None:
+        return False
+    with conn:
+        # Nothing can change the entries between reading and storing the buckets.
+        conn.execute("BEGIN IMMEDIATE")
+        buckets = conn.execute(_AGING_SQL.format(only=only), params).fetchall()
+        conn.execute(_CLEAR_AGING_SQL.format(only=only), params)
+        conn.executemany(_SET_AGING_SQL, buckets)
+    return True
+
+
+def accounts(conn, today=None, customer_ids=None):
+    """``{customer id: (debit, credit, (0–30, 31–60, 61–90, 90+))}`` in kuruş for every customer with entries.
+
+    With ``customer_ids`` only those customers are aged and returned.
+    """
+    refresh_aging(conn, today, customer_ids)
+    params = {}
+    rows = conn.execute(_ACCOUNTS_SQL.format(only=_only(customer_ids, params)), params)
+    return {customer_id: (debit, credit, tuple(aging)) for customer_id, debit, credit, *aging in rows}
+
+
+def account(conn, customer_id, today=None):
+    """``(debit, credit, (0–30, 31–60, 61–90, 90+))`` in kuruş for one customer."""
+    refresh_aging(conn, today, (customer_id,))
+    row = conn.execute(_ACCOUNT_SQL, (customer_id,)).fetchone()
+    if row is None:
+        return 0, 0, (0, 0, 0, 0)
+    debit, credit, *aging = row
+    return debit, credit, tuple(aging)
+
+
+def statement(conn, customer_id, date_from=None, date_to=None):
+    """``(opening balance, lines)`` of a customer's account for dates in ``[date_from, date_to]``.
+
+    Lines are ``(date, doc, id, description, debit, credit, balance)`` in date
+    order, ``doc`` being ``invoice``, ``expense`` or ``payment`` (``id`` is a
+    payment id for the last, a transaction id otherwise) and ``balance`` the
+    running balance after the line.
+    """
+    params = {
+        "customer": customer_id,
+        "first": normalize_date(date_from) if date_from else "",
+        "last": normalize_date(date_to) if date_to else _DATE_MAX,
+    }
+    balance = opening = conn.execute(_OPENING_SQL, params).fetchone()[0] if date_from else 0
+    lines = []
+    for day, doc, row_id, description, debit, credit in conn.execute(_STATEMENT_SQL, params):
+        balance += debit - credit
+        lines.append((day, doc, row_id, description, debit, credit, balance))
+    return opening, lines
@@ -0,0 +1,32 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The modules live at the top of the repository, not in a package.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from db import close_db, init_db  # noqa: E402
+from repository import CustomerRepository, LedgerRepository  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "muhasebe.db"
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = init_db(db_path)
+    yield conn
+    close_db(conn)
+
+
+@pytest.fixture
+def ledger(conn):
+    return LedgerRepository(conn)
+
+
+@pytest.fixture
+def customers(conn):
+    return CustomerRepository(conn)
@@ -0,0 +1,116 @@
+import sqlite3
+
+import pytest
+
+import backup
+from backup import BackupError, create_backup, list_backups, read_header, rebuild, restore_backup, verify_backup
+from db import verify_totals
+from journal import redo, undo
+
+
+def _rows(conn):
+    return conn.execute("SELECT id, date, description, kind, amount FROM transactions ORDER BY id").fetchall()
+
+
+def _fill(ledger, count, start=0):
+    ledger.add_many([("2024-03-01", f"kayıt {i}", "income", i + 1, None) for i in range(start, start + count)])
+
+
+def _rebuilt_rows(tmp_path, archive, password=None):
+    target = tmp_path / "rebuilt.db"
+    rebuild(archive, target, password)
+    check = sqlite3.connect(target)
+    try:
+        return _rows(check)
+    finally:
+        check.close()
+
+
+def test_full_and_incremental_round_trip(tmp_path, conn, ledger):
+    folder = tmp_path / "yedekler"
+    _fill(ledger, 2000)
+    full = create_backup(conn, folder)
+    first = _rows(conn)
+    _fill(ledger, 10, start=2000)
+    incremental = create_backup(conn, folder)
+    second = _rows(conn)
+
+    assert read_header(full)["kind"] == "full"
+    header = read_header(incremental)
+    assert header["kind"] == "incremental" and header["base"] == full.name
+    # Only the changed pages are stored.
+    assert incremental.stat().st_size < full.stat().st_size / 5
+    assert list_backups(folder) == [incremental, full]
+    assert _rebuilt_rows(tmp_path, full) == first
+    assert _rebuilt_rows(tmp_path, incremental) == second
+    assert verify_backup(incremental)["page_count"] > 0
+
+
+def test_restore_is_undoable(tmp_path, conn, ledger):
+    _fill(ledger, 100)
+    archive = create_backup(conn, tmp_path / "yedekler")
+    saved = _rows(conn)
+    ledger.delete_many([row[0] for row in saved[:50]])
+    _fill(ledger, 5, start=100)
+    changed = _rows(conn)
+
+    restore_backup(conn, archive)
+    assert _rows(conn) == saved
+    assert verify_totals(conn) == []
+    undo(conn)
+    assert _rows(conn) == changed
+    redo(conn)
+    assert _rows(conn) == saved
+    # Nothing is left behind next to the archives.
+    assert sorted(p.suffix for p in archive.parent.iterdir()) == [".mab", ".pages"]
+
+
+def test_corrupt_archive_is_rejected(tmp_path, conn, ledger):
+    _fill(ledger, 500)
+    archive = create_backup(conn, tmp_path / "yedekler")
+    data = bytearray(archive.read_bytes())
+    data[-100] ^= 0xFF
+    archive.write_bytes(bytes(data))
+    with pytest.raises(BackupError):
+        verify_backup(archive)
+    before = _rows(conn)
+    with pytest.raises(BackupError):
+        restore_backup(conn, archive)
+    assert _rows(conn) == before
+
+
+def test_missing_base_is_reported(tmp_path, conn, ledger):
+    folder = tmp_path / "yedekler"
+    _fill(ledger, 100)
+    full = create_backup(conn, folder)
+    _fill(ledger, 1, start=100)
+    incremental = create_backup(conn, folder)
+    full.unlink()
+    with pytest.raises(BackupError, match="zinciri eksik"):
+        verify_backup(incremental)
+
+
+@pytest.mark.skipif(backup.AESGCM is not None, reason="cryptography kurulu")
+def test_encryption_needs_cryptography(tmp_path, conn):
+    with pytest.raises(BackupError, match="cryptography"):
+        create_backup(conn, tmp_path / "yedekler", password="gizli")
+
+
+def test_encrypted_round_trip(tmp_path, conn, ledger):
+    pytest.importorskip("cryptography")
+    folder = tmp_path / "yedekler"
+    _fill(ledger, 1000)
+    full = create_backup(conn, folder, password="gizli")
+    _fill(ledger, 10, start=1000)
+    incremental = create_backup(conn, folder, password="gizli")
+    expected = _rows(conn)
+
+    assert read_header(incremental)["encrypted"] and read_header(incremental)["base"] == full.name
+    assert _rebuilt_rows(tmp_path, incremental, "gizli") == expected
+    with pytest.raises(BackupError):
+        verify_backup(incremental)
+    with pytest.raises(BackupError):
+        verify_backup(incremental, "yanlış")
+    # A different password starts a new chain instead of extending this one.
+    other = create_backup(conn, folder, password="başka")
+    assert read_header(other)["kind"] == "full"
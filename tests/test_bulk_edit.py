@@ -0,0 +1,40 @@
+import pytest
+
+from db import read_totals, verify_customer_balances, verify_totals
+
+
+def _rows(count, customer=None):
+    return [
+        (f"2024-01-{i % 28 + 1:02d}", f"kayıt {i}", ("income", "expense")[i % 2], i + 1, customer)
+        for i in range(count)
+    ]
+
+
+def test_bulk_edit(conn, ledger, customers):
+    customer = customers.add("Acme", "", "")
+    ledger.add_many(_rows(20))
+    ids = [row_id for (row_id,) in conn.execute("SELECT id FROM transactions LIMIT 5")]
+    assert ledger.update_many(ids, kind="income", customer_id=customer) == 5
+    assert {(row[3], row[5]) for row in ledger.get_many(ids)} == {("income", "Acme")}
+    assert verify_totals(conn) == [] and verify_customer_balances(conn) == []
+    with pytest.raises(ValueError):
+        ledger.update_many(ids, id=1)
+
+
+def test_bulk_delete_spans_batches(conn, ledger):
+    # More ids than one IN (...) batch holds.
+    ledger.add_many(_rows(1200))
+    ids = [row_id for (row_id,) in conn.execute("SELECT id FROM transactions WHERE kind = 'income'")]
+    assert ledger.delete_many(ids) == 600
+    assert conn.execute("SELECT COUNT(*) FROM transactions WHERE kind = 'income'").fetchone()[0] == 0
+    assert read_totals(conn)[0] == 0
+    assert verify_totals(conn) == []
+
+
+def test_deleting_customers_keeps_their_entries(conn, ledger, customers):
+    ids = [customers.add(f"müşteri {i}", "", "") for i in range(3)]
+    ledger.add_many(_rows(9, ids[0]))
+    assert customers.delete_many(ids[:2]) == 2
+    assert conn.execute("SELECT name FROM customers").fetchall() == [("müşteri 2",)]
+    assert conn.execute("SELECT COUNT(*) FROM transactions WHERE customer_id IS NULL").fetchone()[0] == 9
+    assert verify_customer_balances(conn) == []
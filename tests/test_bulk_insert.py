@@ -0,0 +1,57 @@
+import random
+from datetime import date, timedelta
+
+from db import bulk_insert, read_totals, verify_customer_balances, verify_totals
+
+_INSERT_SQL = "INSERT INTO transactions (date, description, kind, amount, customer_id) VALUES (?, ?, ?, ?, ?)"
+
+
+def _rows(count, customer=None, seed=3):
+    rnd = random.Random(seed)
+    return [
+        (
+            (date(2022, 1, 1) + timedelta(days=rnd.randrange(1100))).isoformat(),
+            f"kayıt {i}",
+            rnd.choice(("income", "expense")),
+            rnd.randrange(1, 100_000),
+            customer,
+        )
+        for i in range(count)
+    ]
+
+
+def _triggers(conn):
+    return {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+
+
+def test_catch_up_matches_triggers(conn, ledger, customers):
+    # Rows written by the triggers and by the set-based catch-up must agree.
+    customer = customers.add("Acme", "", "")
+    ledger.add("income", "2024-01-01", "tek tek", 1_000, customer)
+    triggers = _triggers(conn)
+    with conn:
+        assert bulk_insert(conn, "transactions", _INSERT_SQL, _rows(500, customer)) == 500
+    assert verify_totals(conn) == []
+    assert verify_customer_balances(conn) == []
+    assert conn.execute("SELECT COUNT(*) FROM ledger_fts").fetchone()[0] == 501
+    journaled = conn.execute("SELECT COUNT(*) FROM journal WHERE tbl = 'transactions' AND op = 'insert'")
+    assert journaled.fetchone()[0] == 501
+    assert _triggers(conn) == triggers
+    # The triggers are back: a plain insert is counted again.
+    ledger.add("expense", "2024-01-02", "sonra", 1)
+    assert verify_totals(conn) == []
+
+
+def test_rollback_restores_triggers(conn):
+    triggers = _triggers(conn)
+    bulk_insert(conn, "transactions", _INSERT_SQL, _rows(10))
+    conn.rollback()
+    assert _triggers(conn) == triggers
+    assert read_totals(conn) == (0, 0)
+
+
+def test_add_many_in_batches(conn, ledger):
+    assert ledger.add_many(_rows(1000), batch_size=300) == 1000
+    assert verify_totals(conn) == []
+    # However many batches, the rows are one action.
+    assert conn.execute("SELECT COUNT(DISTINCT action) FROM journal").fetchone()[0] == 1
@@ -0,0 +1,40 @@
+import sqlite3
+
+import db
+from companies import Companies, company_dir
+from db import MIGRATIONS, close_db, init_db, schema_version
+from repository import LedgerRepository
+
+
+def test_consolidated_company_totals(db_path, conn, ledger):
+    ledger.add("income", "2024-01-05", "ana", 1_000)
+    companies = Companies(db_path)
+    try:
+        companies.create("Şube")
+        branch = LedgerRepository(companies.open("Şube"))
+        branch.add("expense", "2024-01-06", "şube", 300)
+        branch.add("income", "2023-12-31", "eski", 50)
+        totals = companies.totals(date_from="2024-01-01")
+    finally:
+        companies.close_all()
+    assert [total[1:] for total in totals] == [(1_000, 0), (0, 300)]
+    assert totals[1][0] == "Şube"
+
+
+def test_outdated_company_is_not_migrated_by_totals(db_path, conn, monkeypatch):
+    old = company_dir(db_path) / "Eski.db"
+    old.parent.mkdir()
+    monkeypatch.setattr(db, "MIGRATIONS", MIGRATIONS[:10])
+    close_db(init_db(old))
+    monkeypatch.undo()
+    companies = Companies(db_path)
+    try:
+        assert companies.totals() == [("Ana şirket", 0, 0), ("Eski", None, None)]
+        reader = sqlite3.connect(old)
+        assert schema_version(reader) == 10
+        reader.close()
+        # Opening the company migrates it; from then on it is summed.
+        assert schema_version(companies.open("Eski")) == len(MIGRATIONS)
+        assert companies.totals() == [("Ana şirket", 0, 0), ("Eski", 0, 0)]
+    finally:
+        companies.close_all()
@@ -0,0 +1,19 @@
+def _all_pages(pager):
+    rows = []
+    while not pager.exhausted:
+        rows += pager.next_page()
+    return rows
+
+
+def test_customer_pages_by_name(conn, customers):
+    names = [f"müşteri {i % 37:02d}" for i in range(500)]
+    customers.add_many([(name, "", "") for name in names])
+    rows = _all_pages(customers.pager(page_size=30))
+    # Equal names are split across pages by id without losing or repeating any.
+    assert [row[1] for row in rows] == sorted(names)
+    assert len({row[0] for row in rows}) == 500
+
+
+def test_empty_customer_table_is_one_empty_page(conn, customers):
+    pager = customers.pager(page_size=30)
+    assert pager.next_page() == [] and pager.exhausted
@@ -0,0 +1,40 @@
+import csv
+import json
+
+from export import export_customers, export_ledger, export_monthly_report
+
+
+def test_ledger_csv_is_exact(tmp_path, conn, ledger):
+    ledger.add_many([
+        ("2024-01-02", "b", "expense", 10, None),
+        ("2024-01-01", "a", "income", 123456789, None),
+    ])
+    path = tmp_path / "defter.csv"
+    assert export_ledger(conn, path) == 2
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert [row[1:5] for row in rows[1:]] == [
+        ["2024-01-01", "a", "income", "1234567.89"],
+        ["2024-01-02", "b", "expense", "0.10"],
+    ]
+
+
+def test_monthly_report_jsonl(tmp_path, conn, ledger):
+    ledger.add_many([
+        ("2024-01-05", "a", "income", 1_000, None),
+        ("2024-01-20", "b", "expense", 250, None),
+        ("2024-03-01", "c", "expense", 1_000, None),
+    ])
+    path = tmp_path / "rapor.jsonl"
+    assert export_monthly_report(conn, path, fmt="jsonl") == 2
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [list(line.values()) for line in lines] == [
+        ["2024-01", 10.0, 2.5, 7.5, 7.5],
+        ["2024-03", 0.0, 10.0, -10.0, -2.5],
+    ]
+
+
+def test_customers_to_stdout(conn, customers, capsys):
+    customers.add_many([("Beta", "", "not"), ("Acme", "0555", "")])
+    assert export_customers(conn, "-") == 2
+    assert capsys.readouterr().out.splitlines()[1:] == ["2,Acme,0555,", "1,Beta,,not"]
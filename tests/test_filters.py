@@ -0,0 +1,120 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from db import _range_buckets, read_range_totals
+from repository import LedgerFilter
+
+
+def _days(buckets):
+    """Every date the buckets cover, expanded."""
+    covered = []
+    for grain, lo, hi in buckets:
+        if grain == "day":
+            first, last = date.fromisoformat(lo), date.fromisoformat(hi)
+        elif grain == "month":
+            first = date.fromisoformat(f"{lo}-01")
+            end = date.fromisoformat(f"{hi}-01")
+            last = (end.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+        else:
+            first, last = date(int(lo), 1, 1), date(int(hi), 12, 31)
+        covered += [first + timedelta(days=i) for i in range((last - first).days + 1)]
+    return covered
+
+
+@pytest.mark.parametrize(
+    "first, last",
+    [
+        (date(2024, 1, 1), date(2024, 12, 31)),
+        (date(2024, 2, 1), date(2024, 2, 29)),
+        (date(2024, 2, 10), date(2024, 2, 20)),
+        (date(2023, 11, 15), date(2024, 2, 3)),
+        (date(2020, 3, 31), date(2026, 1, 1)),
+        (date(2021, 1, 1), date(2021, 1, 1)),
+    ],
+)
+def test_range_buckets_cover_range_exactly(first, last):
+    buckets = _range_buckets(first, last)
+    days = _days(buckets)
+    assert len(days) == len(set(days))
+    assert sorted(days) == [first + timedelta(days=i) for i in range((last - first).days + 1)]
+    assert len(buckets) <= 5
+
+
+def test_range_buckets_prefer_coarse_grains():
+    assert _range_buckets(date(2020, 1, 1), date(2023, 12, 31)) == [("year", "2020", "2023")]
+    assert _range_buckets(date(2024, 3, 1), date(2024, 5, 31)) == [("month", "2024-03", "2024-05")]
+    assert _range_buckets(date(2023, 12, 30), date(2025, 1, 2)) == [
+        ("day", "2023-12-30", "2023-12-31"),
+        ("day", "2025-01-01", "2025-01-02"),
+        ("year", "2024", "2024"),
+    ]
+
+
+def _random_rows(count, customer=None, seed=1):
+    rnd = random.Random(seed)
+    start = date(2022, 1, 1)
+    return [
+        (
+            (start + timedelta(days=rnd.randrange(1100))).isoformat(),
+            f"kayıt {i}",
+            rnd.choice(("income", "expense")),
+            rnd.randrange(1, 100_000),
+            customer if i % 3 == 0 else None,
+        )
+        for i in range(count)
+    ]
+
+
+def test_range_totals_match_sums(conn, ledger):
+    ledger.add_many(_random_rows(2000))
+    for date_from, date_to in [
+        (None, None),
+        ("2022-02-14", "2023-07-03"),
+        ("2023-01-01", None),
+        (None, "2022-12-31"),
+        ("15.03.2024", "15.03.2024"),
+        ("2024-01-01", "2023-01-01"),
+    ]:
+        where, params = LedgerFilter(date_from, date_to).where("")
+        expected = [
+            conn.execute(
+                f"SELECT IFNULL(SUM(amount), 0) FROM transactions WHERE kind = ?{where}", (kind, *params)
+            ).fetchone()[0]
+            for kind in ("income", "expense")
+        ]
+        assert list(read_range_totals(conn, date_from, date_to)) == expected
+
+
+def _all_pages(pager):
+    rows = []
+    while not pager.exhausted:
+        rows += pager.next_page()
+    return rows
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        LedgerFilter(date_from="2024-01-10", date_to="2024-01-20"),
+        LedgerFilter(kind="expense", amount_min=50_000),
+        LedgerFilter(date_to="31.01.2023", amount_max=10_000),
+    ],
+)
+def test_filtered_pages_and_totals(conn, ledger, filters):
+    ledger.add_many(_random_rows(1000))
+    where, params = filters.where("")
+    expected = conn.execute(
+        f"SELECT id FROM transactions WHERE 1{where} ORDER BY date DESC, kind DESC, id DESC", params
+    ).fetchall()
+    assert [(row[0],) for row in _all_pages(ledger.pager(page_size=50, filters=filters))] == expected
+    sums = dict(conn.execute(f"SELECT kind, SUM(amount) FROM transactions WHERE 1{where} GROUP BY kind", params))
+    assert ledger.filtered_totals(filters) == (sums.get("income", 0), sums.get("expense", 0))
+
+
+def test_customer_filter(conn, ledger, customers):
+    customer = customers.add("Acme", "", "")
+    ledger.add_many(_random_rows(300, customer))
+    rows = _all_pages(ledger.pager(filters=LedgerFilter(customer_id=customer)))
+    assert len(rows) == 100 and {row[5] for row in rows} == {"Acme"}
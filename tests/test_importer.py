@@ -0,0 +1,108 @@
+import pytest
+
+from db import verify_totals
+from importer import CsvImportError, ImportJob, _fingerprint
+from journal import undo
+
+
+def _write_ledger(path, count, extra=""):
+    lines = ["tarih;açıklama;tutar;tür"]
+    lines += [f"{1 + i % 28:02d}.01.2024;kayıt {i};{i + 1},50;gelir" for i in range(count)]
+    path.write_text("\n".join(lines) + "\n" + extra, encoding="utf-8")
+
+
+def _count(conn):
+    return conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+
+def test_ledger_import(tmp_path, conn):
+    path = tmp_path / "defter.csv"
+    path.write_text(
+        "Date,Description,Amount\n2024-01-05,satış,\"1.234,56\"\n05.02.2024,kira,-500\n",
+        encoding="utf-8",
+    )
+    assert ImportJob(conn, path).run() == 2
+    rows = conn.execute("SELECT date, description, kind, amount FROM transactions ORDER BY date").fetchall()
+    assert rows == [("2024-01-05", "satış", "income", 123456), ("2024-02-05", "kira", "expense", 50000)]
+    assert verify_totals(conn) == []
+    # The whole run is one undoable action.
+    undo(conn)
+    assert _count(conn) == 0
+
+
+def test_bad_rows_go_to_rejects(tmp_path, conn):
+    path = tmp_path / "defter.csv"
+    _write_ledger(path, 3, extra="32.01.2024;hatalı;1;gelir\n01.01.2024;;1;gelir\n")
+    rejects = tmp_path / "red.csv"
+    job = ImportJob(conn, path, rejects=rejects)
+    assert job.run() == 3
+    assert job.rejected == 2
+    assert len(rejects.read_text(encoding="utf-8").splitlines()) == 2
+    # Without a rejects file the first bad row stops the import.
+    with pytest.raises(CsvImportError, match="defter.csv:5"):
+        ImportJob(conn, path).run(restart=True)
+
+
+def test_interrupted_import_resumes(tmp_path, conn):
+    path = tmp_path / "defter.csv"
+    _write_ledger(path, 10)
+
+    def stop(done, imported, rejected, elapsed):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        ImportJob(conn, path, chunk_size=4, progress=stop).run()
+    assert _count(conn) == 4
+    assert ImportJob(conn, path, chunk_size=4).run() == 6
+    descriptions = [d for (d,) in conn.execute("SELECT description FROM transactions ORDER BY id")]
+    assert sorted(descriptions) == sorted(f"kayıt {i}" for i in range(10))
+
+
+def test_changed_file_is_not_resumed(tmp_path, conn):
+    # A run stopped by a bad row, whose row is then fixed in the file.
+    path = tmp_path / "defter.csv"
+    _write_ledger(path, 7, extra="99.01.2024;hatalı;1;gelir\n01.01.2024;son;1;gelir\n")
+    with pytest.raises(CsvImportError):
+        ImportJob(conn, path, chunk_size=3).run()
+    assert _count(conn) == 6
+    _write_ledger(path, 7, extra="08.01.2024;düzeltildi;1;gelir\n01.01.2024;son;1;gelir\n")
+    with pytest.raises(CsvImportError, match="--restart"):
+        ImportJob(conn, path, chunk_size=3).run()
+    assert _count(conn) == 6
+    # Restarting is explicit and writes the whole file again.
+    assert ImportJob(conn, path, chunk_size=3).run(restart=True) == 9
+    assert _count(conn) == 15
+
+
+def test_finished_file_can_change(tmp_path, conn):
+    path = tmp_path / "defter.csv"
+    _write_ledger(path, 3)
+    assert ImportJob(conn, path).run() == 3
+    assert ImportJob(conn, path).run() == 0
+    _write_ledger(path, 4)
+    assert ImportJob(conn, path).run() == 4
+
+
+def test_fingerprint_sees_edits_past_first_block(tmp_path):
+    path = tmp_path / "büyük.csv"
+    body = b"x" * (3 << 20)
+    path.write_bytes(body + b"a")
+    before = _fingerprint(path)
+    path.write_bytes(body + b"b")
+    assert _fingerprint(path) != before
+
+
+def test_customer_import_and_linking(tmp_path, conn, customers):
+    people = tmp_path / "musteriler.csv"
+    people.write_text("Ad,İletişim,Notlar\nAcme,0555,\nBeta,,vip\n", encoding="utf-8")
+    assert ImportJob(conn, people, target="customers").run() == 2
+    entries = tmp_path / "defter.csv"
+    entries.write_text("tarih,açıklama,tutar,müşteri\n2024-01-05,fatura,100,Beta\n", encoding="utf-8")
+    assert ImportJob(conn, entries).run() == 1
+    assert conn.execute(
+        "SELECT c.name FROM transactions t JOIN customers c ON c.id = t.customer_id"
+    ).fetchall() == [("Beta",)]
+    unknown = tmp_path / "bilinmeyen.csv"
+    unknown.write_text("tarih,açıklama,tutar,müşteri\n2024-01-05,fatura,100,Gamma\n", encoding="utf-8")
+    with pytest.raises(CsvImportError, match="bilinmeyen müşteri"):
+        ImportJob(conn, unknown).run()
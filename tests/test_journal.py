@@ -0,0 +1,141 @@
+import journal
+import repository
+import db
+from db import close_db, init_db, read_totals, verify_customer_balances, verify_totals
+from journal import history, list_snapshots, redo, reset_database, restore_as_action, take_snapshot, undo
+from repository import PaymentRepository
+
+
+def _state(conn):
+    return (
+        conn.execute(
+            "SELECT id, date, description, kind, amount, customer_id FROM transactions ORDER BY id"
+        ).fetchall(),
+        conn.execute("SELECT id, name, contact, notes FROM customers ORDER BY id").fetchall(),
+        conn.execute("SELECT id, date, customer_id, amount, note FROM payments ORDER BY id").fetchall(),
+    )
+
+
+def _consistent(conn):
+    return verify_totals(conn) == [] and verify_customer_balances(conn) == []
+
+
+def test_undo_redo_add_edit_delete(conn, ledger, customers):
+    states = [_state(conn)]
+    customer = customers.add("Acme", "0555", "")
+    states.append(_state(conn))
+    entry = ledger.add("income", "2024-01-05", "fatura", 10_000, customer)
+    states.append(_state(conn))
+    ledger.update_many([entry], amount=12_000, description="fatura (düzeltme)")
+    states.append(_state(conn))
+    PaymentRepository(conn).add(customer, "2024-01-20", 4_000)
+    states.append(_state(conn))
+    customers.delete_many([customer])
+    states.append(_state(conn))
+
+    for expected in reversed(states[:-1]):
+        assert undo(conn) is not None
+        assert _state(conn) == expected
+        assert _consistent(conn)
+    assert undo(conn) is None
+    for expected in states[1:]:
+        assert redo(conn) is not None
+        assert _state(conn) == expected
+        assert _consistent(conn)
+    assert redo(conn) is None
+
+
+def test_new_action_clears_redo(conn, ledger):
+    ledger.add("income", "2024-01-05", "a", 1)
+    undo(conn)
+    ledger.add("income", "2024-01-06", "b", 2)
+    assert redo(conn) is None
+    assert [kind for _id, kind, *_ in history(conn)][:3] == ["do", "undo", "do"]
+
+
+def test_bulk_delete_above_threshold_uses_snapshot(conn, ledger, monkeypatch):
+    monkeypatch.setattr(repository, "SNAPSHOT_DELETE_ROWS", 50)
+    rows = [("2024-02-01", f"k{i}", "expense", i + 1, None) for i in range(50)]
+    ledger.add_many(rows)
+    before = _state(conn)
+    ids = [row_id for (row_id,) in conn.execute("SELECT id FROM transactions")]
+    assert ledger.delete_many(ids) == len(ids)
+    # Deletes backed by the snapshot are not journaled row by row.
+    assert conn.execute("SELECT COUNT(*) FROM journal WHERE op = 'delete'").fetchone()[0] == 0
+    assert read_totals(conn) == (0, 0)
+    undo(conn)
+    assert _state(conn) == before
+    redo(conn)
+    assert _state(conn)[0] == []
+    undo(conn)
+    assert _state(conn) == before
+    assert _consistent(conn)
+
+
+def test_reset_undo_redo_several_levels(conn, ledger, customers):
+    customers.add("Acme", "", "")
+    ledger.add("income", "2024-01-05", "birinci", 100)
+    first = _state(conn)
+    reset_database(conn)
+    ledger.add("income", "2024-02-05", "ikinci", 200)
+    second = _state(conn)
+    reset_database(conn)
+    empty = _state(conn)
+
+    undo(conn)
+    assert _state(conn) == second
+    undo(conn)
+    undo(conn)
+    assert _state(conn) == first
+    redo(conn)
+    redo(conn)
+    assert _state(conn) == second
+    redo(conn)
+    assert _state(conn) == empty
+    assert _consistent(conn)
+
+
+def test_pruning_keeps_reachable_snapshots(conn, ledger, monkeypatch):
+    monkeypatch.setattr(journal, "SNAPSHOT_KEEP", 1)
+    ledger.add("income", "2024-01-05", "ilk", 100)
+    first = _state(conn)
+    reset_database(conn)
+    for _ in range(3):
+        take_snapshot(conn)
+    # The reset's snapshot is still reachable by undo, so it outlives the limit.
+    assert len(list_snapshots(conn)) == 2
+    undo(conn)
+    assert _state(conn) == first
+
+
+def test_snapshot_restore_can_be_undone(conn, ledger, monkeypatch):
+    monkeypatch.setattr(journal, "SNAPSHOT_KEEP", 2)
+    ledger.add("income", "2024-01-05", "ilk", 100)
+    first = _state(conn)
+    snapshot = take_snapshot(conn)
+    take_snapshot(conn)
+    ledger.add("income", "2024-01-06", "ikinci", 200)
+    second = _state(conn)
+    # The restored snapshot is the oldest; taking the pre-restore one must not prune it first.
+    restore_as_action(conn, snapshot)
+    assert _state(conn) == first
+    undo(conn)
+    assert _state(conn) == second
+    redo(conn)
+    assert _state(conn) == first
+    assert _consistent(conn)
+
+
+def test_journal_migration_keeps_its_own_columns(db_path, monkeypatch):
+    def trigger_sql(conn):
+        return conn.execute("SELECT sql FROM sqlite_master WHERE name = 'transactions_journal_au'").fetchone()[0]
+
+    # source_key arrives in a later migration; version 8 must not reference it.
+    monkeypatch.setattr(db, "MIGRATIONS", db.MIGRATIONS[:8])
+    conn = init_db(db_path)
+    assert "source_key" not in trigger_sql(conn)
+    close_db(conn)
+    monkeypatch.undo()
+    conn = init_db(db_path)
+    assert "OLD.source_key" in trigger_sql(conn)
+    close_db(conn)
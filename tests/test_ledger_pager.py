@@ -0,0 +1,55 @@
+import random
+from datetime import date, timedelta
+
+
+def _fill(ledger, count, seed=1):
+    rnd = random.Random(seed)
+    ledger.add_many([
+        (
+            (date(2024, 1, 1) + timedelta(days=rnd.randrange(60))).isoformat(),
+            f"kayıt {i}",
+            rnd.choice(("income", "expense")),
+            rnd.randrange(1, 10_000),
+            None,
+        )
+        for i in range(count)
+    ])
+
+
+def _all_pages(pager):
+    rows = []
+    while not pager.exhausted:
+        rows += pager.next_page()
+    return rows
+
+
+def test_pages_cover_ledger_in_order(conn, ledger):
+    _fill(ledger, 1000)
+    rows = _all_pages(ledger.pager(page_size=64))
+    expected = conn.execute(
+        "SELECT id, date, kind FROM transactions ORDER BY date DESC, kind DESC, id DESC"
+    ).fetchall()
+    assert [(row[0], row[1], row[3]) for row in rows] == expected
+
+
+def test_last_page_exhausts(ledger):
+    _fill(ledger, 128)
+    pager = ledger.pager(page_size=64)
+    assert len(pager.next_page()) == 64
+    assert len(pager.next_page()) == 64
+    assert not pager.exhausted
+    assert pager.next_page() == []
+    assert pager.exhausted
+    pager.reset()
+    assert len(pager.next_page()) == 64
+
+
+def test_rows_added_between_pages_do_not_shift_them(ledger):
+    # A keyset page starts after the last row shown, whatever was inserted before it.
+    _fill(ledger, 100)
+    pager = ledger.pager(page_size=50)
+    first = pager.next_page()
+    ledger.add("income", "2030-01-01", "yeni", 1)
+    second = pager.next_page()
+    assert not {row[0] for row in first} & {row[0] for row in second}
+    assert len(first) + len(second) == 100
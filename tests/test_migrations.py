@@ -0,0 +1,82 @@
+import sqlite3
+
+import pytest
+
+from db import MIGRATIONS, close_db, init_db, read_totals, schema_version, verify_totals
+from repository import LEDGER_PAGE_SQL
+
+
+def test_new_database_is_current(conn):
+    assert schema_version(conn) == len(MIGRATIONS)
+    indexes = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"transactions_date", "transactions_amount", "customers_name"} <= indexes
+
+
+def test_reopening_changes_nothing(db_path, conn, ledger):
+    ledger.add("income", "2024-01-01", "a", 1)
+    schema = conn.execute("SELECT sql FROM sqlite_master ORDER BY name").fetchall()
+    again = init_db(db_path)
+    try:
+        assert schema_version(again) == len(MIGRATIONS)
+        assert again.execute("SELECT sql FROM sqlite_master ORDER BY name").fetchall() == schema
+    finally:
+        close_db(again)
+
+
+def test_ledger_pages_use_the_index(conn):
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {LEDGER_PAGE_SQL}", ("9", "", 0, 200)).fetchall()
+    details = " ".join(row[-1] for row in plan)
+    assert "transactions_date" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_newer_database_is_refused(db_path):
+    newer = sqlite3.connect(db_path)
+    newer.execute(f"PRAGMA user_version = {len(MIGRATIONS) + 1}")
+    newer.close()
+    with pytest.raises(RuntimeError):
+        init_db(db_path)
+
+
+def test_migrates_legacy_split_tables(db_path):
+    # The original schema: REAL lira amounts, mixed date formats, no version.
+    legacy = sqlite3.connect(db_path)
+    legacy.executescript(
+        """
+        CREATE TABLE incomes(id INTEGER PRIMARY KEY, date TEXT, description TEXT, amount REAL);
+        CREATE TABLE expenses(id INTEGER PRIMARY KEY, date TEXT, description TEXT, amount REAL);
+        CREATE TABLE customers(id INTEGER PRIMARY KEY, name TEXT, contact TEXT, notes TEXT);
+        INSERT INTO incomes (date, description, amount) VALUES ('05.03.2024', 'satış', 1234.56);
+        INSERT INTO incomes (date, description, amount) VALUES ('2024-01-10', 'danışmanlık', 0.1);
+        INSERT INTO expenses (date, description, amount) VALUES ('2024-02-01', 'kira', 500.2);
+        INSERT INTO customers (name, contact, notes) VALUES ('Acme', '', '');
+        """
+    )
+    legacy.commit()
+    legacy.close()
+
+    conn = init_db(db_path)
+    try:
+        assert schema_version(conn) == len(MIGRATIONS)
+        rows = conn.execute("SELECT date, description, kind, amount FROM transactions ORDER BY id").fetchall()
+        assert rows == [
+            ("2024-01-10", "danışmanlık", "income", 10),
+            ("2024-02-01", "kira", "expense", 50020),
+            ("2024-03-05", "satış", "income", 123456),
+        ]
+        assert read_totals(conn) == (123466, 50020)
+        assert verify_totals(conn) == []
+        tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        assert "incomes" not in tables and "expenses" not in tables
+    finally:
+        close_db(conn)
+    # Opening again is a no-op.
+    close_db(init_db(db_path))
+
+
+def test_deleting_a_customer_unlinks_entries(conn, ledger, customers):
+    customer = customers.add("Acme", "", "")
+    entry = ledger.add("income", "2024-01-05", "fatura", 100, customer)
+    customers.delete(customer)
+    assert ledger.get_many([entry]) == [(entry, "2024-01-05", "fatura", "income", 100, None)]
+    assert conn.execute("SELECT customer_id FROM transactions").fetchall() == [(None,)]
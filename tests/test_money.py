@@ -0,0 +1,58 @@
+import pytest
+
+from money import Money, format_amount, to_decimal_string
+
+
+@pytest.mark.parametrize(
+    "text, minor",
+    [
+        ("1234.56", 123456),
+        ("1234,56", 123456),
+        ("1.234,56", 123456),
+        ("1,234.56", 123456),
+        ("1.234.567,8", 123456780),
+        ("  12 ₺", 1200),
+        ("12,5 TL", 1250),
+        ("-0.01", -1),
+        ("+7", 700),
+        ("0.10", 10),
+    ],
+)
+def test_parse(text, minor):
+    assert Money.parse(text) == Money(minor)
+
+
+@pytest.mark.parametrize("text", ["", "abc", "1.234", "1,2,3", "12.345", "1.2.3,4,5", "--1", "1e3"])
+def test_parse_rejects(text):
+    with pytest.raises(ValueError):
+        Money.parse(text)
+
+
+def test_parse_is_exact():
+    # 0.1 + 0.2 is not 0.3 in floats; in kuruş it is.
+    assert Money.parse("0.1") + Money.parse("0.2") == Money.parse("0.3")
+
+
+def test_only_integers():
+    with pytest.raises(TypeError):
+        Money(1.5)
+
+
+@pytest.mark.parametrize(
+    "minor, text, display",
+    [
+        (0, "0.00", "0.00"),
+        (5, "0.05", "0.05"),
+        (-5, "-0.05", "-0.05"),
+        (123456789, "1234567.89", "1,234,567.89"),
+        (-100000, "-1000.00", "-1,000.00"),
+    ],
+)
+def test_format(minor, text, display):
+    assert to_decimal_string(minor) == text
+    assert format_amount(minor) == display
+    assert Money.parse(text).minor == minor
+
+
+def test_format_currency():
+    assert format_amount(150050, currency=True) == "1,500.50 ₺"
@@ -0,0 +1,42 @@
+import pytest
+
+from db import PROFILES, close_db, init_db
+
+_SYNCHRONOUS = {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"}
+
+
+@pytest.mark.parametrize("profile", sorted(PROFILES))
+def test_profile_is_applied(db_path, profile):
+    conn = init_db(db_path, profile=profile)
+    try:
+        settings = PROFILES[profile]
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0].upper() == settings["journal_mode"]
+        assert _SYNCHRONOUS[conn.execute("PRAGMA synchronous").fetchone()[0]] == settings["synchronous"]
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == settings["cache_size"]
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    finally:
+        close_db(conn)
+
+
+def test_synchronous_override(db_path):
+    conn = init_db(db_path, synchronous="full")
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2
+    finally:
+        close_db(conn)
+    with pytest.raises(ValueError):
+        init_db(db_path, synchronous="sometimes")
+
+
+def test_readers_see_writes_without_blocking(db_path, conn, ledger):
+    # In WAL mode a second connection reads while the first holds a write transaction.
+    ledger.add("income", "2024-01-01", "a", 1)
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("INSERT INTO transactions (date, description, kind, amount) VALUES ('2024-01-02', 'b', 'income', 2)")
+    reader = init_db(db_path)
+    try:
+        assert reader.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == 1
+    finally:
+        reader.close()
+    conn.commit()
@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from db import close_db, init_db
+from profiling import Profiler, fingerprint, format_report
+
+
+@pytest.fixture
+def profiled(db_path):
+    profiler = Profiler()
+    conn = init_db(db_path, profiler=profiler)
+    yield conn, profiler
+    close_db(conn)
+
+
+def test_in_lists_share_a_fingerprint():
+    assert fingerprint("SELECT *\n  FROM t WHERE id IN (?, ?,?)") == "SELECT * FROM t WHERE id IN (?, …)"
+    assert fingerprint("SELECT * FROM t WHERE id IN (?)") == "SELECT * FROM t WHERE id IN (?)"
+
+
+def test_disabled_profiler_records_nothing(profiled):
+    conn, profiler = profiled
+    conn.execute("SELECT COUNT(*) FROM transactions").fetchone()
+    profiler.record_ui("sayfa", 0.1)
+    assert profiler.queries == {} and profiler.ui == {}
+
+
+def test_queries_are_summed_with_their_rows(profiled):
+    conn, profiler = profiled
+    conn.executemany(
+        "INSERT INTO transactions (date, description, kind, amount) VALUES (?, ?, 'income', ?)",
+        [("2024-01-05", f"k{i}", i + 1) for i in range(10)],
+    )
+    conn.commit()
+    profiler.enabled = True
+    sql = "SELECT id FROM transactions WHERE amount > ?"
+    for _ in range(3):
+        assert len(conn.execute(sql, (5,)).fetchall()) == 5
+    stats = {q["sql"]: q for q in profiler.snapshot(conn)["queries"]}[sql]
+    assert (stats["count"], stats["rows"]) == (3, 15)
+
+
+def test_slow_queries_keep_their_plan(db_path, tmp_path):
+    profiler = Profiler(enabled=True, slow_ms=0)
+    conn = init_db(db_path, profiler=profiler)
+    try:
+        conn.execute("SELECT id FROM transactions WHERE date >= ?", ("2024-01-01",)).fetchall()
+        profiler.record_ui("sayfa: Gelir/Gider", 0.25)
+        snapshot = profiler.dump(tmp_path / "profil.json", conn)
+    finally:
+        close_db(conn)
+    slow = [s for s in snapshot["slow"] if s["sql"].startswith("SELECT id FROM transactions")]
+    assert slow and "transactions" in slow[0]["plan"]
+    assert snapshot["ui"][0]["last_ms"] == 250
+    assert json.loads((tmp_path / "profil.json").read_text(encoding="utf-8")) == snapshot
+    assert "Gelir/Gider" in format_report(snapshot)
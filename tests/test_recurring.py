@@ -0,0 +1,71 @@
+from datetime import date
+
+import pytest
+
+from journal import undo
+from recurring import materialize_due, occurrence_date
+from repository import RecurringRepository
+
+
+@pytest.mark.parametrize(
+    "start, frequency, interval, index, expected",
+    [
+        (date(2024, 1, 31), "monthly", 1, 1, date(2024, 2, 29)),
+        (date(2023, 1, 31), "monthly", 1, 1, date(2023, 2, 28)),
+        (date(2024, 1, 31), "monthly", 1, 2, date(2024, 3, 31)),
+        (date(2024, 1, 31), "monthly", 1, 3, date(2024, 4, 30)),
+        (date(2024, 8, 31), "monthly", 3, 2, date(2025, 2, 28)),
+        (date(2024, 2, 29), "yearly", 1, 1, date(2025, 2, 28)),
+        (date(2024, 2, 29), "yearly", 1, 4, date(2028, 2, 29)),
+        (date(2024, 12, 15), "monthly", 1, 1, date(2025, 1, 15)),
+        (date(2024, 1, 1), "weekly", 2, 3, date(2024, 2, 12)),
+        (date(2024, 2, 28), "daily", 1, 2, date(2024, 3, 1)),
+        (date(2024, 5, 5), "monthly", 1, 0, date(2024, 5, 5)),
+    ],
+)
+def test_occurrence_date(start, frequency, interval, index, expected):
+    assert occurrence_date(start, frequency, interval, index) == expected
+
+
+def test_occurrence_date_rejects_unknown_frequency():
+    with pytest.raises(ValueError):
+        occurrence_date(date(2024, 1, 1), "hourly", 1, 1)
+
+
+def _occurrences(conn):
+    return conn.execute("SELECT date, source_key FROM transactions ORDER BY date").fetchall()
+
+
+def test_materialize_catches_up_once(conn):
+    rules = RecurringRepository(conn)
+    rule = rules.add("expense", "kira", 5_000, "monthly", "2024-01-31", end_date="2024-05-31")
+    assert materialize_due(conn, date(2024, 4, 15)) == 3
+    assert materialize_due(conn, date(2024, 4, 15)) == 0
+    assert materialize_due(conn, date(2024, 12, 31)) == 2
+    assert [day for day, _key in _occurrences(conn)] == [
+        "2024-01-31", "2024-02-29", "2024-03-31", "2024-04-30", "2024-05-31",
+    ]
+    assert _occurrences(conn)[1][1] == f"r{rule}:2024-02-29"
+
+
+def test_repeated_run_writes_nothing_twice(conn):
+    RecurringRepository(conn).add("income", "abonelik", 100, "weekly", "2024-01-01")
+    materialize_due(conn, date(2024, 1, 31))
+    # As if a second copy of the app ran the same rules from the old position.
+    conn.execute("UPDATE recurring_rules SET next_index = 0, next_date = start_date")
+    conn.commit()
+    assert materialize_due(conn, date(2024, 1, 31)) == 0
+    assert len(_occurrences(conn)) == 5
+
+
+def test_undone_delete_keeps_source_key(conn, ledger):
+    RecurringRepository(conn).add("income", "abonelik", 100, "monthly", "2024-01-01")
+    materialize_due(conn, date(2024, 3, 1))
+    before = _occurrences(conn)
+    ids = [row_id for (row_id,) in conn.execute("SELECT id FROM transactions")]
+    ledger.delete_many(ids)
+    undo(conn)
+    assert _occurrences(conn) == before
+    conn.execute("UPDATE recurring_rules SET next_index = 0, next_date = start_date")
+    conn.commit()
+    assert materialize_due(conn, date(2024, 3, 1)) == 0
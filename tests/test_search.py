@@ -0,0 +1,66 @@
+import pytest
+
+import search
+from repository import LedgerFilter
+from search import SearchPager, search_customers, search_ledger
+
+
+@pytest.fixture
+def entries(ledger):
+    ledger.add_many([
+        ("2024-01-01", "Işık faturası", "expense", 300, None),
+        ("2024-01-02", "ışık ve su", "expense", 200, None),
+        ("2024-01-03", "Kira ödemesi", "expense", 5_000, None),
+        ("2024-02-01", "Danışmanlık ücreti", "income", 9_000, None),
+        ("2024-02-02", "İstanbul şube kira", "expense", 4_000, None),
+    ])
+    return ledger
+
+
+def _descriptions(rows):
+    return sorted(row[2] for row in rows)
+
+
+def test_turkish_folding(conn, entries):
+    assert _descriptions(search_ledger(conn, "ışık")) == ["Işık faturası", "ışık ve su"]
+    assert _descriptions(search_ledger(conn, "ISIK")) == ["Işık faturası", "ışık ve su"]
+    assert _descriptions(search_ledger(conn, "istanbul")) == ["İstanbul şube kira"]
+    assert _descriptions(search_ledger(conn, "danis")) == ["Danışmanlık ücreti"]
+    assert search_ledger(conn, "   ") == []
+
+
+def test_every_term_must_match(conn, entries):
+    assert _descriptions(search_ledger(conn, "kira şube")) == ["İstanbul şube kira"]
+
+
+def test_filters_apply_before_paging(conn, entries):
+    filters = LedgerFilter(date_from="2024-02-01")
+    assert _descriptions(search_ledger(conn, "kira", filters=filters)) == ["İstanbul şube kira"]
+    assert _descriptions(search_ledger(conn, "kira", filters=LedgerFilter(amount_min=4_500))) == ["Kira ödemesi"]
+
+
+def test_filtered_count_decides_ranking(conn, ledger, monkeypatch):
+    # Many matches overall but few inside the filters: still ranked, not newest first.
+    monkeypatch.setattr(search, "RANK_LIMIT", 10)
+    ledger.add_many([("2023-01-01", f"kira {i}", "expense", 1, None) for i in range(50)])
+    ledger.add_many([
+        ("2024-05-01", "kira kira kira", "expense", 2, None),
+        ("2024-05-02", "kira ve aidat ve su ve elektrik", "expense", 3, None),
+    ])
+    rows = search_ledger(conn, "kira", filters=LedgerFilter(date_from="2024-01-01"))
+    assert [row[2] for row in rows] == ["kira kira kira", "kira ve aidat ve su ve elektrik"]
+
+
+def test_pager(conn, ledger):
+    ledger.add_many([("2024-01-01", f"ortak {i}", "income", 1, None) for i in range(25)])
+    pager = SearchPager(conn, "ortak", page_size=10)
+    seen = []
+    while not pager.exhausted:
+        seen += pager.next_page()
+    assert len({row[0] for row in seen}) == 25
+
+
+def test_customer_search(conn, customers):
+    customers.add_many([("Çelik Yapı", "0555", ""), ("Öz Gıda", "", "çelik tedarikçisi"), ("Beta", "", "")])
+    assert sorted(row[1] for row in search_customers(conn, "celik")) == ["Çelik Yapı", "Öz Gıda"]
+    assert search_customers(conn, "gida")[0][1] == "Öz Gıda"
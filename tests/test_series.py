@@ -0,0 +1,33 @@
+from charts import dense_series, merge_buckets
+from db import read_series
+
+
+def test_series_buckets(conn, ledger):
+    ledger.add_many([
+        ("2024-01-05", "a", "income", 100, None),
+        ("2024-01-20", "b", "expense", 30, None),
+        ("2024-03-01", "c", "income", 50, None),
+    ])
+    opening, rows = read_series(conn, "month", "2024-02-01", "2024-12-31")
+    assert opening == 70
+    assert rows == [("2024-03", 50, 0)]
+    opening, rows = read_series(conn, "week", "2024-01-01", "2024-01-31")
+    assert opening == 0
+    assert rows == [("2024-01-01", 100, 0), ("2024-01-15", 0, 30)]
+
+
+def test_dense_series_fills_gaps(conn, ledger):
+    ledger.add_many([("2024-01-05", "a", "income", 100, None), ("2024-04-01", "b", "expense", 30, None)])
+    _opening, rows = read_series(conn, "month")
+    assert dense_series("month", rows) == [
+        ("2024-01", 100, 0), ("2024-02", 0, 0), ("2024-03", 0, 0), ("2024-04", 0, 30),
+    ]
+
+
+def test_merge_buckets_keeps_totals():
+    rows = [(f"2024-{m:02d}", m, 1) for m in range(1, 13)]
+    merged = merge_buckets(rows, 5)
+    assert len(merged) <= 5
+    assert merged[0][0] == "2024-01"
+    assert sum(r[1] for r in merged) == sum(r[1] for r in rows)
+    assert sum(r[2] for r in merged) == 12
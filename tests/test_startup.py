@@ -0,0 +1,26 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+_GUI_MODULES = ("app", "customtkinter", "tkinter", "charts")
+
+
+def _loaded_after(code):
+    """Modules of interest loaded by a fresh interpreter after running ``code``."""
+    probe = f"{code}\nimport sys\nprint(*(m for m in _GUI_MODULES if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", f"_GUI_MODULES = {_GUI_MODULES!r}\n{probe}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    # The command's own output comes first; the module list is the last line.
+    return result.stdout.splitlines()[-1].split()
+
+
+def test_command_line_does_not_load_the_gui():
+    assert _loaded_after("import main") == []
+
+
+def test_cli_command_runs_without_the_gui(tmp_path):
+    db = tmp_path / "cli.db"
+    assert _loaded_after(f"import main; main.main(['--db', {str(db)!r}, 'totals', 'verify'])") == []
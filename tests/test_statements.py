@@ -0,0 +1,78 @@
+from datetime import date
+
+from db import rebuild_customer_balances, verify_customer_balances
+from repository import PaymentRepository
+from statements import account, accounts, statement
+
+TODAY = date(2024, 6, 30)
+
+
+def _invoices(ledger, customer):
+    # 10 days (0–30), 45 days (31–60), 75 days (61–90) and 200 days (90+) old on TODAY.
+    for day, amount in (("2023-12-13", 4_000), ("2024-04-16", 3_000), ("2024-05-16", 2_000), ("2024-06-20", 1_000)):
+        ledger.add("income", day, f"fatura {day}", amount, customer)
+
+
+def test_aging_buckets(conn, ledger, customers):
+    customer = customers.add("Acme", "", "")
+    _invoices(ledger, customer)
+    assert account(conn, customer, TODAY) == (10_000, 0, (1_000, 2_000, 3_000, 4_000))
+
+
+def test_credits_settle_oldest_invoices_first(conn, ledger, customers):
+    customer = customers.add("Acme", "", "")
+    _invoices(ledger, customer)
+    PaymentRepository(conn).add(customer, "2024-06-25", 5_000)
+    ledger.add("expense", "2024-06-26", "iade", 500, customer)
+    # 5,500 clears the 90+ invoice and 1,500 of the 61–90 one.
+    assert account(conn, customer, TODAY) == (10_000, 5_500, (1_000, 2_000, 1_500, 0))
+
+
+def test_aging_follows_writes_and_day(conn, ledger, customers):
+    customer = customers.add("Acme", "", "")
+    entry = ledger.add("income", "2024-06-20", "fatura", 1_000, customer)
+    assert account(conn, customer, TODAY)[2] == (1_000, 0, 0, 0)
+    assert account(conn, customer, date(2024, 8, 1))[2] == (0, 1_000, 0, 0)
+    ledger.update_many([entry], amount=1_500)
+    assert account(conn, customer, date(2024, 8, 1))[2] == (0, 1_500, 0, 0)
+
+
+def test_accounts_for_some_customers(conn, ledger, customers):
+    ids = [customers.add(f"m{i}", "", "") for i in range(3)]
+    for i, customer in enumerate(ids):
+        ledger.add("income", "2024-06-01", "fatura", 100 * (i + 1), customer)
+    everyone = accounts(conn, TODAY)
+    assert set(everyone) == set(ids)
+    assert accounts(conn, TODAY, customer_ids=ids[1:2]) == {ids[1]: everyone[ids[1]]}
+    assert accounts(conn, TODAY, customer_ids=[]) == {}
+    # Only the requested customers are aged.
+    conn.execute("UPDATE customer_balances SET aged_on = NULL")
+    conn.commit()
+    accounts(conn, TODAY, customer_ids=ids[:1])
+    aged = conn.execute("SELECT customer_id FROM customer_balances WHERE aged_on IS NOT NULL").fetchall()
+    assert aged == [(ids[0],)]
+
+
+def test_statement_running_balance(conn, ledger, customers):
+    customer = customers.add("Acme", "", "")
+    ledger.add("income", "2024-01-10", "eski fatura", 2_000, customer)
+    ledger.add("income", "2024-02-01", "fatura", 1_000, customer)
+    PaymentRepository(conn).add(customer, "2024-02-01", 2_500, "havale")
+    ledger.add("expense", "2024-02-15", "iade", 100, customer)
+    opening, lines = statement(conn, customer, "2024-02-01", "2024-02-28")
+    assert opening == 2_000
+    assert [(doc, debit, credit, balance) for _d, doc, _id, _desc, debit, credit, balance in lines] == [
+        ("invoice", 1_000, 0, 3_000),
+        ("payment", 0, 2_500, 500),
+        ("expense", 0, 100, 400),
+    ]
+
+
+def test_balances_survive_rebuild(conn, ledger, customers):
+    customer = customers.add("Acme", "", "")
+    ledger.add("income", "2024-01-10", "fatura", 2_000, customer)
+    PaymentRepository(conn).add(customer, "2024-01-11", 500)
+    before = account(conn, customer, TODAY)
+    rebuild_customer_balances(conn)
+    assert verify_customer_balances(conn) == []
+    assert account(conn, customer, TODAY) == before
@@ -0,0 +1,33 @@
+from db import read_totals, rebuild_totals, verify_totals
+
+
+def test_totals_follow_adds_edits_and_deletes(conn, ledger):
+    first = ledger.add("income", "2024-05-01", "satış", 10_000)
+    ledger.add("expense", "2024-05-02", "kira", 4_000)
+    ledger.update_many([first], amount=12_500, date="2024-06-01")
+    ledger.add("income", "2024-06-03", "satış", 500)
+    assert read_totals(conn) == (13_000, 4_000)
+    assert read_totals(conn, "month", "2024-05") == (0, 4_000)
+    assert read_totals(conn, "year", "2024") == (13_000, 4_000)
+    ledger.delete_many([first])
+    assert read_totals(conn) == (500, 4_000)
+    assert read_totals(conn, "month", "2024-06") == (500, 0)
+    assert read_totals(conn, "day", "2024-06-01") == (0, 0)
+    assert verify_totals(conn) == []
+
+
+def test_kind_change_moves_amount(conn, ledger):
+    entry = ledger.add("income", "2024-05-01", "yanlış tür", 700)
+    ledger.update_many([entry], kind="expense")
+    assert read_totals(conn) == (0, 700)
+    assert verify_totals(conn) == []
+
+
+def test_rebuild_repairs_drift(conn, ledger):
+    ledger.add("income", "2024-05-01", "satış", 1_000)
+    with conn:
+        conn.execute("UPDATE ledger_totals SET total = total + 1 WHERE grain = 'month'")
+    assert verify_totals(conn) != []
+    rebuild_totals(conn)
+    assert verify_totals(conn) == []
+    assert read_totals(conn, "month", "2024-05") == (1_000, 0)
@@ -0,0 +1,70 @@
+import sqlite3
+import threading
+
+import pytest
+
+from db import close_db, init_db
+from worker import DbExecutor
+
+
+@pytest.fixture
+def executor(db_path):
+    executor = DbExecutor(lambda: init_db(db_path), close_db)
+    yield executor
+    executor.shutdown()
+
+
+def _block(executor):
+    """Hold the worker until the returned event is set."""
+    release = threading.Event()
+    executor.submit(lambda _conn: release.wait(5))
+    return release
+
+
+def test_jobs_run_on_worker_connection(executor):
+    thread = executor.submit(lambda _conn: threading.current_thread().name).result(5)
+    assert thread == "db-worker"
+    assert executor.submit(lambda conn, x: conn.execute("SELECT ?", (x,)).fetchone()[0], 7).result(5) == 7
+
+
+def test_jobs_run_in_order(executor):
+    release = _block(executor)
+    order = []
+    futures = [executor.submit(lambda _conn, i: order.append(i), i) for i in range(20)]
+    release.set()
+    for future in futures:
+        future.result(5)
+    assert order == list(range(20))
+
+
+def test_keyed_jobs_coalesce(executor):
+    release = _block(executor)
+    first = executor.submit(lambda _conn: 1, key="yenile")
+    second = executor.submit(lambda _conn: 2, key="yenile")
+    release.set()
+    assert second.result(5) == 2
+    assert first.cancelled()
+
+
+def test_cancel_group(executor):
+    release = _block(executor)
+    dropped = executor.submit(lambda _conn: 1, group="sayfa")
+    kept = executor.submit(lambda _conn: 2, group="diğer")
+    executor.cancel_group("sayfa")
+    release.set()
+    assert dropped.cancelled()
+    assert kept.result(5) == 2
+
+
+def test_errors_reach_the_caller(executor):
+    with pytest.raises(sqlite3.OperationalError):
+        executor.submit(lambda conn: conn.execute("SELECT * FROM yok")).result(5)
+    assert executor.submit(lambda _conn: "devam").result(5) == "devam"
+
+
+def test_switch_replaces_connection(tmp_path, executor):
+    other = tmp_path / "diger.db"
+    # The old connection is left to whoever opened it, here the test.
+    executor.submit(lambda conn: (close_db(conn), init_db(other))[1], switch=True).result(5)
+    path = executor.submit(lambda conn: conn.execute("PRAGMA database_list").fetchone()[2]).result(5)
+    assert path == str(other)
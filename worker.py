@@ -0,0 +1,225 @@
+"""Background database worker and its bridge into the Tk event loop.
+
+All SQL runs on one worker thread that owns its own sqlite3 connection, so
+the Tk mainloop never waits on the disk. Jobs are plain callables taking the
+connection as their first argument.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+
+class _Job:
+    __slots__ = ("fn", "args", "key", "group", "interruptible", "switch", "future")
+
+    def __init__(self, fn, args, key, group, interruptible, switch=False):
+        self.fn = fn
+        self.args = args
+        self.key = key
+        self.group = group
+        self.interruptible = interruptible
+        self.switch = switch
+        self.future = Future()
+
+
+class DbExecutor:
+    """Single-threaded executor that owns a database connection.
+
+    ``connect`` is called on the worker thread to open the connection and
+    ``close`` (if given) is called there with it on shutdown.
+
+    Jobs submitted with a ``key`` coalesce: a new job replaces a pending one
+    with the same key, which is cancelled. Jobs can be tagged with a ``group``
+    so :meth:`cancel_group` can drop everything queued for a page; a running
+    job of that group is interrupted if it was submitted as ``interruptible``.
+
+    A job submitted with ``switch=True`` returns a connection that replaces
+    the current one for every later job (its future resolves to None); the
+    old connection is left to whoever opened it, e.g. a pool.
+    """
+
+    def __init__(self, connect, close=None, name="db-worker"):
+        self._connect = connect
+        self._close = close
+        self._pending = deque()
+        self._by_key = {}
+        self._running = None
+        self._stopping = False
+        self._conn = None
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args, key=None, group=None, interruptible=False, switch=False):
+        job = _Job(fn, args, key, group, interruptible, switch)
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError("DbExecutor is shut down")
+            old = self._by_key.get(key) if key is not None else None
+            if old is not None:
+                self._pending[self._pending.index(old)] = job
+                old.future.cancel()
+            else:
+                self._pending.append(job)
+            if key is not None:
+                self._by_key[key] = job
+            self._cond.notify()
+        return job.future
+
+    def cancel_group(self, group):
+        with self._cond:
+            keep = deque()
+            for job in self._pending:
+                if job.group == group:
+                    self._forget(job)
+                    job.future.cancel()
+                else:
+                    keep.append(job)
+            self._pending = keep
+            running = self._running
+            if running is not None and running.group == group and running.interruptible:
+                self._conn.interrupt()
+
+    def shutdown(self, wait=True):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if wait:
+            self._thread.join()
+
+    def _forget(self, job):
+        if job.key is not None and self._by_key.get(job.key) is job:
+            del self._by_key[job.key]
+
+    def _next_job(self):
+        with self._cond:
+            while True:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if not self._pending:
+                    return None
+                job = self._pending.popleft()
+                self._forget(job)
+                if job.future.set_running_or_notify_cancel():
+                    self._running = job
+                    return job
+
+    def _loop(self):
+        try:
+            self._conn = self._connect()
+        except BaseException as e:
+            self._fail_pending(e)
+            return
+        try:
+            while True:
+                job = self._next_job()
+                if job is None:
+                    break
+                try:
+                    result = job.fn(self._conn, *job.args)
+                    if job.switch:
+                        self._conn, result = result, None
+                except BaseException as e:
+                    job.future.set_exception(e)
+                else:
+                    job.future.set_result(result)
+                finally:
+                    with self._cond:
+                        self._running = None
+        finally:
+            if self._close is not None:
+                self._close(self._conn)
+
+    def _fail_pending(self, error):
+        with self._cond:
+            self._stopping = True
+            while self._pending:
+                job = self._pending.popleft()
+                if job.future.set_running_or_notify_cancel():
+                    job.future.set_exception(error)
+            self._by_key.clear()
+
+
+def _job_name(fn):
+    # "IncomeExpenseFrame._on_tree_scroll.<lambda>" rather than just "<lambda>".
+    return getattr(fn, "__qualname__", repr(fn)).replace(".<locals>", "").replace("MainApp.", "")
+
+
+class TkBridge:
+    """Runs jobs on a :class:`DbExecutor` and delivers results on the Tk thread.
+
+    Worker threads must not touch Tk, so completed futures are queued and
+    drained by an ``after()`` poll that only runs while jobs are outstanding.
+    Results for a group are dropped once :meth:`cancel_group` has been called
+    for it, even if the job had already started. With an enabled ``profiler``
+    (see profiling.py) each job's round trip, from submission to the end of
+    its callback, is recorded as a UI timing.
+    """
+
+    POLL_MS = 15
+
+    def __init__(self, widget, executor, profiler=None):
+        self.widget = widget
+        self.executor = executor
+        self.profiler = profiler
+        self._done = queue.SimpleQueue()
+        self._outstanding = 0
+        self._polling = False
+        self._generations = {}
+
+    def run(self, fn, *args, on_done=None, on_error=None, key=None, group=None, interruptible=False,
+            switch=False):
+        generation = self._generations.get(group, 0)
+        if self.profiler is not None and self.profiler.enabled:
+            name = f"iş: {key or _job_name(fn)}"
+            on_done = self._timed(name, on_done)
+            if on_error is not None:
+                on_error = self._timed(name, on_error)
+        future = self.executor.submit(fn, *args, key=key, group=group, interruptible=interruptible, switch=switch)
+        self._outstanding += 1
+        future.add_done_callback(
+            lambda f: self._done.put((f, on_done, on_error, group, generation))
+        )
+        if not self._polling:
+            self._polling = True
+            self.widget.after(self.POLL_MS, self._poll)
+        return future
+
+    def cancel_group(self, group):
+        self._generations[group] = self._generations.get(group, 0) + 1
+        self.executor.cancel_group(group)
+
+    def _timed(self, name, callback):
+        started = time.perf_counter()
+
+        def timed(value):
+            if callback is not None:
+                callback(value)
+            self.profiler.record_ui(name, time.perf_counter() - started)
+
+        return timed
+
+    def _poll(self):
+        while True:
+            try:
+                future, on_done, on_error, group, generation = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._outstanding -= 1
+            if future.cancelled() or generation != self._generations.get(group, 0):
+                continue
+            error = future.exception()
+            if error is None:
+                if on_done is not None:
+                    on_done(future.result())
+            elif on_error is not None:
+                on_error(error)
+            else:
+                self.widget.report_callback_exception(type(error), error, error.__traceback__)
+        if self._outstanding:
+            self.widget.after(self.POLL_MS, self._poll)
+        else:
+            self._polling = False